@@ -16,14 +16,15 @@ import streamlit as st
 import pandas as pd
 from PIL import Image
 import io
+import os
 import time
 from pathlib import Path
 import json
 
 # Importar extractor maestro
 try:
-    from extractor_maestro import extraer_documento, exportar_comparacion_excel, ExtractorMaestro
-    from app import cargar_memoria, guardar_memoria
+    from extractor_maestro import extraer_documento, extraer_lote, exportar_comparacion_excel, ExtractorMaestro, precalentar_motores
+    from app import cargar_memoria, resetear_memoria
 except ImportError as e:
     st.error(f"❌ Error importando módulos: {e}")
     st.stop()
@@ -1475,8 +1476,37 @@ st.markdown("""
 if 'memoria' not in st.session_state:
     st.session_state.memoria = cargar_memoria()
 
+# Precalentar PaddleOCR/EasyOCR en segundo plano (una vez por proceso, no bloquea la UI)
+@st.cache_resource(show_spinner=False)
+def _iniciar_precalentamiento():
+    import threading
+    hilo = threading.Thread(target=precalentar_motores, daemon=True)
+    hilo.start()
+    return hilo
+
+# Servidor de extracción con los modelos ya cargados (servidor_extraccion.py),
+# p.ej. EXTRACTOR_SERVIDOR=http://127.0.0.1:8765; sin él se extrae en este proceso
+@st.cache_resource(show_spinner=False)
+def _obtener_cliente_servidor():
+    url = os.environ.get('EXTRACTOR_SERVIDOR')
+    if not url:
+        return None
+    from servidor_extraccion import ClienteExtraccion
+    cliente = ClienteExtraccion(url)
+    if not cliente.disponible():
+        print(f"⚠️  Servidor de extracción no responde en {url}: se extrae localmente")
+        return None
+    return cliente
+
+cliente_servidor = _obtener_cliente_servidor()
+
+if cliente_servidor is None:
+    _iniciar_precalentamiento()
+
 if 'resultados_comparacion' not in st.session_state:
     st.session_state.resultados_comparacion = None
+if 'tiempo_total_comparacion' not in st.session_state:
+    st.session_state.tiempo_total_comparacion = None
 
 if 'ultimo_documento' not in st.session_state:
     st.session_state.ultimo_documento = None
@@ -1641,8 +1671,7 @@ with st.sidebar:
     # Botón de limpiar con diseño moderno
     st.markdown("<div style='margin-top: 1rem;'></div>", unsafe_allow_html=True)
     if st.button("🗑️ Resetear Memoria", use_container_width=True, help="Elimina todo el conocimiento aprendido"):
-        st.session_state.memoria = {'nombres_completos': {}}
-        guardar_memoria(st.session_state.memoria)
+        st.session_state.memoria = resetear_memoria()
         st.success("✅ Memoria reseteada exitosamente")
         st.rerun()
     
@@ -1968,26 +1997,44 @@ with tab1:
                     progress_bar = st.progress(0)
                     status_text = st.empty()
                 
-                # Procesar cada archivo
-                for idx, archivo in enumerate(archivos_cargados, 1):
-                    try:
-                        # Actualizar progreso
-                        if total_archivos > 1:
-                            progreso = idx / total_archivos
-                            progress_bar.progress(progreso)
-                            status_text.markdown(f"""
-                            <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
-                                        border-radius: 12px; padding: 1.5rem; text-align: center; margin: 1rem 0;
-                                        box-shadow: 0 8px 20px rgba(102, 126, 234, 0.3);">
-                                <div style="color: white; font-size: 1.1rem; font-weight: 700; margin-bottom: 0.5rem;">
-                                    ⚙️ Procesando: {archivo.name}
-                                </div>
-                                <div style="color: rgba(255,255,255,0.9); font-size: 0.9rem;">
-                                    Archivo {idx} de {total_archivos} | Estrategia: <strong>{estrategia}</strong>
-                                </div>
-                            </div>
-                            """, unsafe_allow_html=True)
+                if total_archivos > 1:
+                    # Lote: los archivos se reparten en un pool de procesos y el
+                    # progreso avanza a medida que cada uno termina
+                    por_indice = {}
+                    archivos_lote = ((archivo.name, archivo.getvalue()) for archivo in archivos_cargados)
+                    if cliente_servidor is not None:
+                        resultados_lote = cliente_servidor.extraer_lote(
+                            archivos_lote, estrategia=estrategia, comparar=(estrategia == "COMPARAR")
+                        )
+                    else:
+                        resultados_lote = extraer_lote(archivos_lote, estrategia=estrategia, comparar=(estrategia == "COMPARAR"))
+                    for completados, (idx, resultado) in enumerate(resultados_lote, 1):
+                        por_indice[idx] = resultado
+                        if resultado['tipo'] == 'error':
+                            total_errores += 1
                         else:
+                            total_procesados += 1
+                        
+                        progress_bar.progress(completados / total_archivos)
+                        status_text.markdown(f"""
+                        <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
+                                    border-radius: 12px; padding: 1.5rem; text-align: center; margin: 1rem 0;
+                                    box-shadow: 0 8px 20px rgba(102, 126, 234, 0.3);">
+                            <div style="color: white; font-size: 1.1rem; font-weight: 700; margin-bottom: 0.5rem;">
+                                ⚙️ Terminado: {resultado['nombre']}
+                            </div>
+                            <div style="color: rgba(255,255,255,0.9); font-size: 0.9rem;">
+                                Archivo {completados} de {total_archivos} | Estrategia: <strong>{estrategia}</strong>
+                            </div>
+                        </div>
+                        """, unsafe_allow_html=True)
+                    
+                    # Mismo orden que los archivos cargados
+                    resultados_batch = [por_indice[i] for i in sorted(por_indice)]
+                else:
+                    # Procesar cada archivo
+                    for idx, archivo in enumerate(archivos_cargados, 1):
+                        try:
                             # Mensaje para archivo único
                             st.markdown(f"""
                             <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
@@ -2004,51 +2051,81 @@ with tab1:
                             </div>
                             """, unsafe_allow_html=True)
                         
-                        inicio_archivo = time.time()
-                        
-                        # Procesar según tipo
-                        if tipo_archivo == "Imagen (JPG, PNG)":
-                            imagen = Image.open(archivo)
-                        else:
-                            # Convertir PDF a imagen
-                            from pdf2image import convert_from_bytes
-                            imagenes = convert_from_bytes(
-                                archivo.read(),
-                                dpi=200,
-                                first_page=1,
-                                last_page=1
-                            )
-                            imagen = imagenes[0]
-                        
-                        # Extraer datos
-                        if estrategia == "COMPARAR":
-                            resultado_comparacion = extraer_documento(imagen, comparar=True)
+                            inicio_archivo = time.time()
+                            
+                            # Procesar según tipo
+                            if tipo_archivo == "Imagen (JPG, PNG)":
+                                documento = Image.open(archivo)
+                            else:
+                                # PDF: se pasan los bytes y el extractor procesa TODAS las páginas
+                                documento = archivo.read()
+                            
+                            # Carga individual: variantes de Tesseract en paralelo (menor latencia)
+                            modo_ocr = "paralelo"
+                            
+                            # Extraer datos
+                            if estrategia == "COMPARAR":
+                                # Los motores corren en paralelo; cada uno aparece apenas termina
+                                panel_motores = st.empty()
+                                motores_listos = []
+                                
+                                def _mostrar_motor(motor, datos_motor, tiempo_motor):
+                                    motores_listos.append({
+                                        'Método': motor.upper(),
+                                        'Tiempo (seg)': round(tiempo_motor, 2),
+                                        'Campos Extraídos': len([k for k in datos_motor if not k.startswith('_')]),
+                                        'Estado': datos_motor.get('_error', '✅')
+                                    })
+                                    panel_motores.dataframe(pd.DataFrame(motores_listos), use_container_width=True, hide_index=True)
+                                
+                                if cliente_servidor is not None:
+                                    resultado = cliente_servidor.extraer(
+                                        archivo.name, archivo.getvalue(), comparar=True, modo_ocr=modo_ocr,
+                                        al_terminar_motor=_mostrar_motor
+                                    )
+                                    if resultado['tipo'] == 'error':
+                                        raise RuntimeError(resultado['error'])
+                                    resultado_comparacion = resultado['datos']
+                                else:
+                                    resultado_comparacion = extraer_documento(
+                                        documento, comparar=True, modo_ocr=modo_ocr, al_terminar_motor=_mostrar_motor,
+                                        nombre=archivo.name
+                                    )
+                                resultados_batch.append({
+                                    'nombre': archivo.name,
+                                    'tipo': 'comparacion',
+                                    'datos': resultado_comparacion,
+                                    'tiempo': time.time() - inicio_archivo
+                                })
+                            else:
+                                if cliente_servidor is not None:
+                                    resultado = cliente_servidor.extraer(
+                                        archivo.name, archivo.getvalue(), estrategia=estrategia, modo_ocr=modo_ocr
+                                    )
+                                    if resultado['tipo'] == 'error':
+                                        raise RuntimeError(resultado['error'])
+                                    datos, tiempo = resultado['datos'], resultado['tiempo']
+                                else:
+                                    datos, tiempo = extraer_documento(documento, estrategia=estrategia, modo_ocr=modo_ocr,
+                                                                      nombre=archivo.name)
+                                resultados_batch.append({
+                                    'nombre': archivo.name,
+                                    'tipo': 'extraccion',
+                                    'datos': datos,
+                                    'tiempo': tiempo
+                                })
+                            
+                            total_procesados += 1
+                            
+                        except Exception as e:
+                            total_errores += 1
                             resultados_batch.append({
                                 'nombre': archivo.name,
-                                'tipo': 'comparacion',
-                                'datos': resultado_comparacion,
+                                'tipo': 'error',
+                                'error': str(e),
                                 'tiempo': time.time() - inicio_archivo
                             })
-                        else:
-                            datos, tiempo = extraer_documento(imagen, estrategia=estrategia)
-                            resultados_batch.append({
-                                'nombre': archivo.name,
-                                'tipo': 'extraccion',
-                                'datos': datos,
-                                'tiempo': tiempo
-                            })
-                        
-                        total_procesados += 1
-                        
-                    except Exception as e:
-                        total_errores += 1
-                        resultados_batch.append({
-                            'nombre': archivo.name,
-                            'tipo': 'error',
-                            'error': str(e),
-                            'tiempo': time.time() - inicio_archivo
-                        })
-                
+                    
                 # Limpiar progreso
                 if total_archivos > 1:
                     progress_bar.empty()
@@ -2063,6 +2140,7 @@ with tab1:
                     st.session_state.resultados_comparacion = None
                 elif total_archivos == 1 and resultados_batch[0]['tipo'] == 'comparacion':
                     st.session_state.resultados_comparacion = resultados_batch[0]['datos']
+                    st.session_state.tiempo_total_comparacion = resultados_batch[0]['tiempo']
                     st.session_state.ultimo_documento = None
                 else:
                     # Modo batch: guardar todos los resultados
@@ -2394,6 +2472,14 @@ with tab2:
             hide_index=True
         )
         
+        # Los motores corren en paralelo: el tiempo total es el del más lento, no la suma
+        if st.session_state.tiempo_total_comparacion:
+            col_total, col_suma = st.columns(2)
+            with col_total:
+                st.metric("⏱️ Tiempo total (reloj)", f"{st.session_state.tiempo_total_comparacion:.2f}s")
+            with col_suma:
+                st.metric("Σ Suma de motores", f"{df_resumen['Tiempo (seg)'].sum():.2f}s")
+        
         # Gráfico de barras
         st.subheader("📈 Visualización")
         
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+📐 AGRUPACIÓN DE CAJAS OCR EN FILAS Y COLUMNAS (VECTORIZADA)
+=============================================================
+Reconstrucción de tablas por coordenadas, compartida por PaddleOCR, EasyOCR y
+la capa de texto nativa de PDFs.
+
+La versión anterior comparaba cada caja contra todas las demás (O(n²)); en
+páginas de cartera con miles de cajas eso dominaba el tiempo de la tabla.
+Aquí se ordenan los centros Y una vez (O(n log n)) y las filas se recorren en
+una sola pasada usando searchsorted.
+
+El resultado es idéntico al algoritmo original: la primera caja libre (en
+orden Y) abre una fila que toma todas las cajas con |y - y_inicial| <= tolerancia.
+Como las Y están ordenadas, esas cajas son un tramo contiguo del arreglo.
+
+Uso:
+    from agrupacion_filas import agrupar_filas, construir_filas
+
+    filas = construir_filas(elementos)  # [[elem, elem, ...], ...] ordenadas por X
+"""
+
+import numpy as np
+
+# Fracción de la altura promedio de caja usada como tolerancia vertical
+FACTOR_TOLERANCIA_Y = 0.6
+# Tolerancia cuando no hay cajas para promediar
+TOLERANCIA_Y_DEFECTO = 15
+
+
+def calcular_tolerancia_y(elementos):
+    """Tolerancia vertical: 60% de la altura promedio de las cajas"""
+    if not elementos:
+        return TOLERANCIA_Y_DEFECTO
+    altura_promedio = sum(elem['altura'] for elem in elementos) / len(elementos)
+    return altura_promedio * FACTOR_TOLERANCIA_Y
+
+
+def agrupar_filas(ys, tolerancia):
+    """
+    Agrupa las coordenadas Y en filas (barrido único sobre las Y ordenadas).
+
+    Args:
+        ys: centros Y de las cajas (cualquier orden)
+        tolerancia: distancia vertical máxima a la primera caja de la fila
+
+    Returns:
+        (orden, inicios): `orden` son los índices de las cajas ordenadas por Y
+        (orden estable) y `inicios` las posiciones en `orden` donde empieza cada
+        fila; la fila k es orden[inicios[k]:inicios[k+1]].
+    """
+    ys = np.asarray(ys, dtype=float)
+    n = len(ys)
+    if n == 0:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+
+    orden = np.argsort(ys, kind='stable')
+    ys_ordenadas = ys[orden]
+
+    # Fin de la fila que abriría cada caja (todas de una vez)
+    fines = np.searchsorted(ys_ordenadas, ys_ordenadas + tolerancia, side='right')
+
+    inicios = []
+    i = 0
+    while i < n:
+        inicios.append(i)
+        fin = int(fines[i])
+        # ys[j] - ys[i] <= tol y ys[j] <= ys[i] + tol pueden diferir en el último bit;
+        # se ajusta el borde a la comparación exacta del algoritmo original
+        while fin < n and ys_ordenadas[fin] - ys_ordenadas[i] <= tolerancia:
+            fin += 1
+        while fin > i + 1 and ys_ordenadas[fin - 1] - ys_ordenadas[i] > tolerancia:
+            fin -= 1
+        i = fin
+
+    return orden, np.asarray(inicios, dtype=np.intp)
+
+
+def ordenar_columnas(xs, orden, inicios):
+    """
+    Ordena cada fila de izquierda a derecha.
+
+    Returns:
+        Lista de arreglos de índices (una por fila), ordenados por X; los empates
+        conservan el orden Y, igual que sorted() sobre la fila original.
+    """
+    n = len(orden)
+    if n == 0:
+        return []
+    xs = np.asarray(xs, dtype=float)
+
+    # Número de fila de cada posición del orden Y
+    fila_de = np.zeros(n, dtype=np.intp)
+    fila_de[inicios[1:]] = 1
+    fila_de = np.cumsum(fila_de)
+
+    # lexsort es estable: por fila, luego por X, y los empates quedan en orden Y
+    posiciones = np.lexsort((xs[orden], fila_de))
+    indices = orden[posiciones]
+    limites = np.append(inicios, n)
+    return [indices[limites[k]:limites[k + 1]] for k in range(len(inicios))]
+
+
+def construir_filas(elementos, tolerancia=None):
+    """
+    Agrupa cajas {'texto','x','y','altura',...} en filas ordenadas por X.
+
+    Args:
+        elementos: lista de dicts con coordenadas
+        tolerancia: tolerancia vertical (por defecto calcular_tolerancia_y(elementos))
+
+    Returns:
+        List[List[dict]]: filas de arriba a abajo, cada una de izquierda a derecha
+    """
+    if not elementos:
+        return []
+    if tolerancia is None:
+        tolerancia = calcular_tolerancia_y(elementos)
+
+    ys = np.fromiter((e['y'] for e in elementos), dtype=float, count=len(elementos))
+    xs = np.fromiter((e['x'] for e in elementos), dtype=float, count=len(elementos))
+
+    orden, inicios = agrupar_filas(ys, tolerancia)
+    return [[elementos[i] for i in fila] for fila in ordenar_columnas(xs, orden, inicios)]
@@ -1,69 +1,161 @@
 # -*- coding: utf-8 -*-
-import streamlit as st
-import pytesseract
-from PIL import Image
-from pdf2image import convert_from_bytes
-import pandas as pd
 import re
 import io
 import os
-import zipfile
+import sys
 import tempfile
+import importlib.util
 from pathlib import Path
 import json
+import atexit
+import threading
+
+# Módulos pesados: se importan al primer uso (ver importacion_perezosa.py), así
+# los procesos del pool y el CLI no cargan streamlit ni pandas al importar app.py
+from importacion_perezosa import ModuloPerezoso
+
+def _configurar_tesseract(modulo):
+    modulo.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+
+st = ModuloPerezoso('streamlit')
+pytesseract = ModuloPerezoso('pytesseract', al_cargar=_configurar_tesseract)
+Image = ModuloPerezoso('PIL.Image')
+pd = ModuloPerezoso('pandas')
+
+from motores_ocr import obtener_paddleocr, obtener_easyocr, bloqueo_motor
+from cache_ocr import cache_ocr, clave_ocr, huella_contenido
+from pdf_texto import extraer_capa_texto
+from procesamiento_lotes import ejecutar_en_procesos, procesar_archivo_lote
+from agrupacion_filas import construir_filas, calcular_tolerancia_y
+from servicio_ner import extraer_entidades
+from patrones import PATRONES_GENERICOS, PATRONES_HERINCO, PATRONES_VISION, PATRONES_PARES, escanear_campos
+from clasificador_documentos import clasificador_documentos
+from indice_difuso import IndiceDifuso, DIFUSO_DISPONIBLE
+from indice_contencion import IndiceContencion
+from fuente_zip import FuenteZip
+from persistencia import DiarioAprendizaje, actualizar_json
+from memoria_sqlite import abrir_almacen
+from numeros_columnas import limpiar_numeros
 
 # ===============================
 # SISTEMA DE AUTO-APRENDIZAJE
 # ===============================
 try:
     from thefuzz import process, fuzz
-    from pydantic import BaseModel, validator, Field
-    FUZZY_DISPONIBLE = True
+    # Pydantic se importa recién al validar (ver obtener_modelos_validacion)
+    FUZZY_DISPONIBLE = importlib.util.find_spec('pydantic') is not None
 except ImportError:
     FUZZY_DISPONIBLE = False
+if not FUZZY_DISPONIBLE:
     print("⚠️ FuzzyWuzzy/Pydantic no disponible. Instalar: pip install thefuzz pydantic")
 
-# Configurar Tesseract con variables de entorno
+# Configurar Tesseract con variables de entorno (el ejecutable, al importar pytesseract)
 os.environ['TESSDATA_PREFIX'] = r'C:\Program Files\Tesseract-OCR\tessdata'
-pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
 
 # ===============================
 # BASE DE CONOCIMIENTO (AUTO-APRENDIZAJE)
 # ===============================
+# Almacenamiento de la memoria: 'json' (archivo + diario) o 'sqlite' (varias
+# sesiones o procesos escribiendo a la vez; ver memoria_sqlite.py)
+BACKEND_MEMORIA = os.environ.get('MEMORIA_BACKEND', 'json').strip().lower()
+
+_almacen_memoria = None
+
+def obtener_almacen_memoria():
+    """Almacén SQLite compartido por el proceso, o None con el backend JSON"""
+    global _almacen_memoria
+    if BACKEND_MEMORIA != 'sqlite':
+        return None
+    if _almacen_memoria is None:
+        _almacen_memoria = abrir_almacen()
+    return _almacen_memoria
+
+def _streamlit_activo():
+    """streamlit solo si ya lo cargó la interfaz (el pool y el CLI no lo importan por esto)"""
+    return sys.modules.get('streamlit')
+
 class MemoriaInteligente:
     """Sistema de memoria que 'aprende' nombres y valores correctos"""
     
     def __init__(self):
         # Cargar desde archivo JSON si existe, sino crear nuevo
         self.archivo_memoria = 'memoria_aprendizaje.json'
+        # Índice de trigramas por lista de conocidos (ver indice_difuso.py)
+        self._indices_difusos = {}
+        # Lo aprendido va a un diario que se compacta de a ratos (ver persistencia.py)
+        self.diario = DiarioAprendizaje(self.archivo_memoria)
+        self._candado_memoria = threading.RLock()
+        # Con MEMORIA_BACKEND=sqlite todo va a la base compartida en vez del JSON
+        self.almacen = obtener_almacen_memoria()
+        # Último nombre leído de la base, por tipo (para traer lo que aprendieron otros procesos)
+        self._ultimo_orden = {}
+        # Cuántas veces se ha reseteado el snapshot JSON (ver resetear_memoria)
+        self._generacion = 0
         self.cargar_memoria()
+        atexit.register(self.compactar_memoria)
     
     def cargar_memoria(self):
-        """Carga la memoria desde archivo JSON"""
+        """Carga la memoria desde archivo JSON (o desde SQLite)"""
+        if self.almacen is not None:
+            self._cargar_desde_almacen()
+            return
         try:
-            if Path(self.archivo_memoria).exists():
-                with open(self.archivo_memoria, 'r', encoding='utf-8') as f:
-                    memoria = json.load(f)
-                    
-                self.proveedores_conocidos = memoria.get('proveedores', [
-                    "GRUPO EMPRESARIAL MERCURY SAS", "ANDES CABLES SAS", "DURMAN COLOMBIA SAS",
-                    "VISION INTEGRADOS SAS", "HERINCO", "DROGUERIAS CAFAM", "COHAN MEDICAL"
-                ])
-                
-                self.medicamentos_conocidos = memoria.get('medicamentos', [
-                    "HIALURONATO DE SODIO 0.4%", "ACETAMINOFEN 500MG", "IBUPROFENO 400MG",
-                    "SOLUCION OFTALMICA", "SUSPENSION ORAL", "TABLETAS RECUBIERTAS"
-                ])
-                
-                self.correcciones_aprendidas = memoria.get('correcciones', {})
+            # Snapshot y diario de un mismo momento (sin una compactación entre medio)
+            with self.diario.bloqueo:
+                if Path(self.archivo_memoria).exists():
+                    with open(self.archivo_memoria, 'r', encoding='utf-8') as f:
+                        memoria = json.load(f)
+                    self._tomar_snapshot(memoria)
+                else:
+                    self.inicializar_memoria()
                 
-            else:
-                self.inicializar_memoria()
+                # Lo aprendido después del último snapshot
+                self._aplicar_entradas(self.diario.entradas())
                 
         except Exception as e:
             print(f"⚠️ Error cargando memoria: {e}")
             self.inicializar_memoria()
     
+    def _tomar_snapshot(self, memoria):
+        """Reemplaza listas, correcciones y generación por las del snapshot leído"""
+        self.proveedores_conocidos = memoria.get('proveedores', [
+            "GRUPO EMPRESARIAL MERCURY SAS", "ANDES CABLES SAS", "DURMAN COLOMBIA SAS",
+            "VISION INTEGRADOS SAS", "HERINCO", "DROGUERIAS CAFAM", "COHAN MEDICAL"
+        ])
+        
+        self.medicamentos_conocidos = memoria.get('medicamentos', [
+            "HIALURONATO DE SODIO 0.4%", "ACETAMINOFEN 500MG", "IBUPROFENO 400MG",
+            "SOLUCION OFTALMICA", "SUSPENSION ORAL", "TABLETAS RECUBIERTAS"
+        ])
+        
+        self.correcciones_aprendidas = memoria.get('correcciones', {})
+        self._generacion = memoria.get('generacion', 0)
+    
+    def _cargar_desde_almacen(self):
+        """Carga las listas y correcciones desde SQLite (valores por defecto si está vacía)"""
+        try:
+            self.proveedores_conocidos, self._ultimo_orden['proveedores'] = self.almacen.nombres('proveedores')
+            self.medicamentos_conocidos, self._ultimo_orden['medicamentos'] = self.almacen.nombres('medicamentos')
+            self.correcciones_aprendidas = self.almacen.correcciones()
+            if not (self.proveedores_conocidos or self.medicamentos_conocidos or self.correcciones_aprendidas):
+                self.inicializar_memoria()
+        except Exception as e:
+            print(f"⚠️ Error cargando memoria SQLite: {e}")
+            self.inicializar_memoria()
+    
+    def _refrescar_desde_almacen(self, lista_conocidos):
+        """Agrega a la lista los nombres que otros procesos guardaron en SQLite"""
+        tipo = self._tipo_de_lista(lista_conocidos)
+        if self.almacen is None or tipo is None:
+            return
+        try:
+            nuevos, self._ultimo_orden[tipo] = self.almacen.nombres(tipo, self._ultimo_orden.get(tipo, 0))
+        except Exception as e:
+            print(f"⚠️ Error leyendo memoria SQLite: {e}")
+            return
+        if nuevos:
+            self._aplicar_entradas((tipo, nombre) for nombre in nuevos)
+    
     def inicializar_memoria(self):
         """Inicializa memoria con valores por defecto"""
         self.proveedores_conocidos = [
@@ -82,67 +174,195 @@ class MemoriaInteligente:
         
         self.guardar_memoria()
     
-    def guardar_memoria(self):
-        """Guarda la memoria actual en archivo JSON"""
+    def guardar_memoria(self, entradas=()):
+        """
+        Guarda la memoria actual en archivo JSON (escritura atómica) o en SQLite.
+        `entradas` son (tipo, nombre) del diario a agregar (ver compactar_memoria).
+        """
         try:
-            memoria = {
-                'proveedores': self.proveedores_conocidos,
-                'medicamentos': self.medicamentos_conocidos,
-                'correcciones': self.correcciones_aprendidas
-            }
-            
-            with open(self.archivo_memoria, 'w', encoding='utf-8') as f:
-                json.dump(memoria, f, ensure_ascii=False, indent=2)
+            if self.almacen is not None:
+                self.almacen.agregar_nombres('proveedores', self.proveedores_conocidos)
+                self.almacen.agregar_nombres('medicamentos', self.medicamentos_conocidos)
+                self.almacen.guardar_correcciones(self.correcciones_aprendidas)
+                return
+            with self._candado_memoria:
+                # Leer, fusionar y escribir con el candado entre procesos tomado
+                actualizar_json(self.archivo_memoria,
+                                lambda memoria: self._fusionar_snapshot(memoria, entradas), {})
                 
         except Exception as e:
             print(f"⚠️ Error guardando memoria: {e}")
     
+    def _fusionar_snapshot(self, memoria, entradas=()):
+        """Une el snapshot leído con lo que esta instancia tiene en memoria (para actualizar_json)"""
+        # Conservar las claves que escriben otros módulos (p.ej. nombres_completos)
+        memoria = memoria or {}
+        if memoria.get('generacion', 0) != self._generacion:
+            # Otro proceso reseteó la memoria: lo aprendido aquí antes del reset
+            # se descarta en vez de volver a agregarlo al snapshot
+            self._tomar_snapshot(memoria)
+        else:
+            # Otro proceso pudo compactar nombres que esta instancia no tiene:
+            # se unen al snapshot (y a memoria) en lugar de reemplazarlos
+            self._aplicar_entradas(
+                (tipo, nombre) for tipo in ('proveedores', 'medicamentos')
+                for nombre in memoria.get(tipo) or []
+            )
+            for error, correccion in (memoria.get('correcciones') or {}).items():
+                self.correcciones_aprendidas.setdefault(error, correccion)
+        # El diario solo tiene entradas posteriores al último reset (este lo vacía)
+        self._aplicar_entradas(entradas)
+        memoria.update({
+            'proveedores': self.proveedores_conocidos,
+            'medicamentos': self.medicamentos_conocidos,
+            'correcciones': self.correcciones_aprendidas
+        })
+        return memoria
+    
+    def resetear_memoria(self):
+        """
+        Borra todo lo aprendido (snapshot, diario o base SQLite) y vuelve a los valores por defecto.
+        
+        Con JSON el snapshot guarda una 'generacion' que el reset incrementa: los demás
+        procesos (servidor, pool de lotes, otras sesiones) la comparan al compactar y
+        descartan lo que aprendieron antes del reset en lugar de volver a agregarlo.
+        """
+        with self._candado_memoria:
+            if self.almacen is not None:
+                self.almacen.vaciar()
+            else:
+                with self.diario.bloqueo:
+                    # Lo pendiente en el diario volvería a aparecer al compactar
+                    self.diario.rotar()
+                    self.diario.confirmar_rotacion()
+                    memoria = actualizar_json(
+                        self.archivo_memoria,
+                        lambda anterior: {'nombres_completos': {},
+                                          'generacion': (anterior or {}).get('generacion', 0) + 1},
+                        {}
+                    )
+                    self._tomar_snapshot(memoria)
+            self.inicializar_memoria()
+    
+    def _lista_por_tipo(self, tipo):
+        return {'proveedores': self.proveedores_conocidos,
+                'medicamentos': self.medicamentos_conocidos}.get(tipo)
+    
+    def _aplicar_entradas(self, entradas):
+        """Aplica entradas del diario a las listas en memoria (sin duplicar)"""
+        vistos = {}
+        for tipo, valor in entradas:
+            lista = self._lista_por_tipo(tipo)
+            if lista is None or not valor:
+                continue
+            if tipo not in vistos:
+                vistos[tipo] = set(lista)
+            if valor not in vistos[tipo]:
+                vistos[tipo].add(valor)
+                lista.append(valor)
+    
+    def _tipo_de_lista(self, lista_conocidos):
+        if lista_conocidos is self.proveedores_conocidos:
+            return 'proveedores'
+        if lista_conocidos is self.medicamentos_conocidos:
+            return 'medicamentos'
+        return None
+    
+    def registrar_aprendizaje(self, lista_conocidos, nombre):
+        """Deja constancia de un nombre nuevo en el diario (el snapshot se compacta después)"""
+        tipo = self._tipo_de_lista(lista_conocidos)
+        if tipo is None:
+            return
+        try:
+            if self.almacen is not None:
+                # SQLite: una transacción corta por nombre, sin diario
+                self.almacen.agregar_nombre(tipo, nombre)
+                return
+            self.diario.registrar(tipo, nombre)
+            if self.diario.necesita_compactar():
+                self.compactar_memoria()
+        except Exception as e:
+            print(f"⚠️ Error registrando aprendizaje: {e}")
+    
+    def compactar_memoria(self):
+        """Vuelca el diario al snapshot (también corre al cerrar el proceso)"""
+        if self.almacen is not None:
+            return
+        # El candado entre procesos va de rotar a confirmar_rotacion: nadie agrega
+        # al diario rotado ni cambia el snapshot mientras tanto
+        with self._candado_memoria, self.diario.bloqueo:
+            try:
+                # Incluye lo que otros procesos hayan registrado en el mismo diario
+                self.guardar_memoria(self.diario.rotar())
+                self.diario.confirmar_rotacion()
+            except Exception as e:
+                print(f"⚠️ Error compactando memoria: {e}")
+    
+    def _indice(self, lista_conocidos):
+        """Índice difuso de la lista (se rehace si la lista se reemplazó, p.ej. al recargar)"""
+        indice = self._indices_difusos.get(id(lista_conocidos))
+        if indice is None or indice.lista is not lista_conocidos:
+            indice = IndiceDifuso(lista_conocidos)
+            self._indices_difusos[id(lista_conocidos)] = indice
+        return indice
+    
     def corregir_nombre(self, nombre, lista_conocidos, umbral=80):
         """Corrige un nombre usando fuzzy matching"""
         if not FUZZY_DISPONIBLE or not nombre:
             return nombre
         
         try:
-            import streamlit as st
+            st = _streamlit_activo()
             # Inicializar contador de correcciones en session_state
-            if 'correcciones_sesion' not in st.session_state:
+            if st is not None and 'correcciones_sesion' not in st.session_state:
                 st.session_state['correcciones_sesion'] = []
         except:
             pass
             
-        # Buscar coincidencia más cercana
-        mejor_coincidencia, puntaje = process.extractOne(nombre, lista_conocidos)
+        # Nombres que otras sesiones/procesos guardaron en SQLite desde la última consulta
+        self._refrescar_desde_almacen(lista_conocidos)
+        
+        # Buscar coincidencia más cercana (índice de trigramas; recorrido lineal si no hay rapidfuzz)
+        if DIFUSO_DISPONIBLE:
+            indice = self._indice(lista_conocidos)
+            mejor_coincidencia, puntaje = indice.mejor_coincidencia(nombre)
+            ya_conocido = indice.contiene(nombre)
+        else:
+            mejor_coincidencia, puntaje = process.extractOne(nombre, lista_conocidos)
+            ya_conocido = nombre in lista_conocidos
         
         if puntaje >= umbral:
             print(f"📝 Auto-corrección: '{nombre}' → '{mejor_coincidencia}' (confianza: {puntaje}%)")
             
             # Registrar corrección en session_state para mostrar en interfaz
             try:
-                import streamlit as st
+                st = _streamlit_activo()
                 correccion = {
                     'tipo': 'nombre',
                     'original': nombre,
                     'corregido': mejor_coincidencia,
                     'confianza': puntaje
                 }
-                st.session_state['correcciones_sesion'].append(correccion)
+                if st is not None:
+                    st.session_state['correcciones_sesion'].append(correccion)
             except:
                 pass
                 
             return mejor_coincidencia
         
         # Si no hay coincidencia buena, agregar a memoria para futuras referencias
-        if nombre not in lista_conocidos and len(nombre) > 3:
+        if not ya_conocido and len(nombre) > 3:
             lista_conocidos.append(nombre)
             print(f"🧠 Aprendido nuevo nombre: '{nombre}'")
-            self.guardar_memoria()
+            self.registrar_aprendizaje(lista_conocidos, nombre)
             
             # Registrar aprendizaje
             try:
-                import streamlit as st
-                if 'nombres_aprendidos' not in st.session_state:
-                    st.session_state['nombres_aprendidos'] = []
-                st.session_state['nombres_aprendidos'].append(nombre)
+                st = _streamlit_activo()
+                if st is not None:
+                    if 'nombres_aprendidos' not in st.session_state:
+                        st.session_state['nombres_aprendidos'] = []
+                    st.session_state['nombres_aprendidos'].append(nombre)
             except:
                 pass
             
@@ -188,14 +408,37 @@ class MemoriaInteligente:
         except ValueError:
             print(f"⚠️ No se pudo convertir '{valor}' a número")
             return 0.0
+    
+    def limpiar_numeros(self, valores):
+        """
+        limpiar_numero para una columna completa (lista, arreglo o Series).
+        
+        Returns:
+            (numeros, fallidos): floats y máscara de celdas que no se pudieron convertir
+        """
+        return limpiar_numeros(valores, self.correcciones_aprendidas)
+
+# Instancia global de memoria inteligente: se crea al primer uso (lee la memoria
+# del disco), no al importar app.py
+_memoria_inteligente = None
+_candado_memoria_inteligente = threading.Lock()
 
-# Instancia global de memoria inteligente
-memoria_inteligente = MemoriaInteligente()
+def obtener_memoria_inteligente():
+    """MemoriaInteligente del proceso (creada la primera vez que se pide)"""
+    global _memoria_inteligente
+    if _memoria_inteligente is None:
+        with _candado_memoria_inteligente:
+            if _memoria_inteligente is None:
+                _memoria_inteligente = MemoriaInteligente()
+    return _memoria_inteligente
 
 # Funciones wrapper para uso externo
 def cargar_memoria():
-    """Carga la memoria de aprendizaje desde archivo JSON"""
+    """Carga la memoria de aprendizaje desde archivo JSON (o desde SQLite)"""
     try:
+        almacen = obtener_almacen_memoria()
+        if almacen is not None:
+            return almacen.exportar()
         if Path('memoria_aprendizaje.json').exists():
             with open('memoria_aprendizaje.json', 'r', encoding='utf-8') as f:
                 return json.load(f)
@@ -206,101 +449,176 @@ def cargar_memoria():
         return {'nombres_completos': {}}
 
 def guardar_memoria(memoria):
-    """Guarda la memoria de aprendizaje en archivo JSON"""
+    """Guarda los nombres_completos de `memoria` en archivo JSON (escritura atómica) o en SQLite"""
     try:
-        with open('memoria_aprendizaje.json', 'w', encoding='utf-8') as f:
-            json.dump(memoria, f, ensure_ascii=False, indent=2)
+        # Solo se agregan/actualizan nombres_completos: las listas y correcciones
+        # las escribe MemoriaInteligente, y otros procesos pueden haber aprendido
+        # nombres que este dict (leído antes) no tiene. Para borrar: resetear_memoria()
+        nombres_completos = memoria.get('nombres_completos') or {}
+        almacen = obtener_almacen_memoria()
+        if almacen is not None:
+            almacen.guardar_nombres_completos(nombres_completos)
+            return
+        def _fusionar(actual):
+            actual = actual or {}
+            actual.setdefault('nombres_completos', {}).update(nombres_completos)
+            return actual
+        # Mismo candado entre procesos que MemoriaInteligente.guardar_memoria
+        actualizar_json('memoria_aprendizaje.json', _fusionar, {})
     except Exception as e:
         print(f"⚠️ Error guardando memoria: {e}")
 
+def resetear_memoria():
+    """Borra toda la memoria de aprendizaje (JSON y diario, o SQLite) y retorna la nueva"""
+    try:
+        obtener_memoria_inteligente().resetear_memoria()
+    except Exception as e:
+        print(f"⚠️ Error reseteando memoria: {e}")
+    return cargar_memoria()
+
 # ===============================
 # MODELOS PYDANTIC PARA VALIDACIÓN AUTOMÁTICA
 # ===============================
-if FUZZY_DISPONIBLE:
-    
-    class FilaCarteraEdades(BaseModel):
-        """Modelo para validar filas de cartera por edades"""
-        documento: str = Field(..., description="Número de documento")
-        proveedor: str = Field(..., description="Nombre del proveedor")  
-        corriente: float = Field(default=0.0, description="Valor corriente")
-        de_1_a_30: float = Field(default=0.0, description="Valor de 1 a 30 días")
-        de_31_a_60: float = Field(default=0.0, description="Valor de 31 a 60 días")
-        de_61_a_90: float = Field(default=0.0, description="Valor de 61 a 90 días")
-        de_91_o_mas: float = Field(default=0.0, description="Valor de 91 días o más")
-        total: float = Field(default=0.0, description="Valor total")
-        
-        @validator('proveedor')
-        def corregir_proveedor(cls, v):
-            return memoria_inteligente.corregir_nombre(v, memoria_inteligente.proveedores_conocidos)
-        
-        @validator('corriente', 'de_1_a_30', 'de_31_a_60', 'de_61_a_90', 'de_91_o_mas', 'total', pre=True)
-        def limpiar_valores_monetarios(cls, v):
-            return memoria_inteligente.limpiar_numero(v)
-        
-        @validator('total')
-        def validar_total(cls, v, values):
-            # Validar que el total sea consistente con la suma de los componentes
-            componentes = [
-                values.get('corriente', 0),
-                values.get('de_1_a_30', 0), 
-                values.get('de_31_a_60', 0),
-                values.get('de_61_a_90', 0),
-                values.get('de_91_o_mas', 0)
-            ]
-            suma_calculada = sum(componentes)
-            
-            # Si hay diferencia significativa (>1%), usar la suma calculada
-            if abs(v - suma_calculada) > max(v * 0.01, 1):
-                print(f"🔧 Total corregido: {v} → {suma_calculada} (suma de componentes)")
-                return suma_calculada
-            
-            return v
+# Definidos en modelos_validacion.py; Pydantic se carga en la primera validación
+_NOMBRES_MODELOS = ('FilaCarteraEdades', 'DatosMedicamento', 'DatosProveedor', 'ADAPTADOR_FILAS_CARTERA')
 
-    class DatosMedicamento(BaseModel):
-        """Modelo para validar datos de medicamentos"""
-        codigo: str = Field(..., description="Código del medicamento")
-        descripcion: str = Field(..., description="Descripción del medicamento")
-        cantidad: str = Field(default="", description="Cantidad prescrita")
-        posologia: str = Field(default="", description="Instrucciones de uso")
-        dias: str = Field(default="", description="Días de tratamiento")
-        
-        @validator('descripcion')
-        def corregir_medicamento(cls, v):
-            return memoria_inteligente.corregir_nombre(v, memoria_inteligente.medicamentos_conocidos, umbral=70)
-        
-        @validator('codigo')
-        def validar_codigo(cls, v):
-            # Códigos de medicamentos suelen ser numéricos
-            if v and not re.match(r'^\d+$', v.replace(' ', '')):
-                # Intentar limpiar caracteres no numéricos
-                codigo_limpio = re.sub(r'[^0-9]', '', v)
-                if len(codigo_limpio) >= 6:
-                    print(f"🔧 Código corregido: '{v}' → '{codigo_limpio}'")
-                    return codigo_limpio
-            return v
+def obtener_modelos_validacion():
+    """Módulo modelos_validacion, importado (y conectado a la memoria) la primera vez"""
+    import modelos_validacion
+    if modelos_validacion._obtener_memoria is None:
+        modelos_validacion.configurar(obtener_memoria_inteligente)
+    return modelos_validacion
 
-    class DatosProveedor(BaseModel):
-        """Modelo para validar datos de proveedores"""
-        nombre: str = Field(..., description="Nombre del proveedor")
-        nit: str = Field(default="", description="NIT del proveedor")
-        direccion: str = Field(default="", description="Dirección")
-        telefono: str = Field(default="", description="Teléfono")
-        
-        @validator('nombre')
-        def corregir_proveedor(cls, v):
-            return memoria_inteligente.corregir_nombre(v, memoria_inteligente.proveedores_conocidos)
-        
-        @validator('nit')
-        def limpiar_nit(cls, v):
-            if v:
-                # Limpiar NIT: solo números y guión
-                nit_limpio = re.sub(r'[^0-9\-]', '', v)
-                return nit_limpio
-            return v
+def __getattr__(nombre):
+    # Compatibilidad con `from app import memoria_inteligente, FilaCarteraEdades`
+    if nombre == 'memoria_inteligente':
+        return obtener_memoria_inteligente()
+    if nombre in _NOMBRES_MODELOS and FUZZY_DISPONIBLE:
+        return getattr(obtener_modelos_validacion(), nombre)
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
 
 # ===============================
 # FUNCIONES DE AUTO-CORRECCIÓN
 # ===============================
+_PARECE_NUMERO = re.compile(r'.*[0-9].*')
+
+COLUMNAS_MONTOS_CARTERA = ['corriente', 'de_1_a_30', 'de_31_a_60', 'de_61_a_90', 'de_91_o_mas', 'total']
+
+def limpiar_celdas_numericas(filas_raw, indices=None):
+    """
+    Limpia en una sola llamada vectorizada todas las celdas que parecen número
+    
+    Args:
+        filas_raw: Lista de filas
+        indices: filas a revisar (por defecto todas)
+    
+    Returns:
+        Dict (fila, columna) → float
+    """
+    posiciones = []
+    valores = []
+    for i in (range(len(filas_raw)) if indices is None else indices):
+        fila = filas_raw[i]
+        columnas = [j for j, valor in enumerate(fila)
+                    if isinstance(valor, str) and _PARECE_NUMERO.match(valor)]
+        for j in columnas:
+            posiciones.append((i, j))
+            valores.append(fila[j])
+    
+    if not valores:
+        return {}
+    numeros, fallidos = obtener_memoria_inteligente().limpiar_numeros(valores)
+    if fallidos.any():
+        print(f"⚠️ No se pudieron convertir {int(fallidos.sum())} celdas a número")
+    return dict(zip(posiciones, numeros.tolist()))
+
+def validar_filas_cartera(filas):
+    """
+    Valida en lote filas de cartera por edades (8 columnas)
+    
+    Los montos se limpian en una sola llamada vectorizada, cada proveedor
+    distinto se corrige una sola vez (no una vez por fila) y todas las filas
+    se validan con una sola llamada al TypeAdapter de FilaCarteraEdades.
+    
+    Args:
+        filas: Lista de filas [documento, proveedor, corriente, ..., total]
+    
+    Returns:
+        (filas_corregidas, diagnosticos): las filas que no pasan la validación
+        se devuelven sin cambios; diagnosticos tiene un dict por fila con
+        'fila', 'valida', 'errores', 'correcciones' y 'montos_fallidos'
+    """
+    diagnosticos = [
+        {'fila': k, 'valida': True, 'errores': [], 'correcciones': [], 'montos_fallidos': []}
+        for k in range(len(filas))
+    ]
+    if not filas:
+        return [], diagnosticos
+    
+    memoria = obtener_memoria_inteligente()
+    modelos = obtener_modelos_validacion()
+    
+    # Montos de todas las filas en una sola pasada: matriz filas x 6
+    numeros, fallidos = memoria.limpiar_numeros([fila[j] for fila in filas for j in range(2, 8)])
+    numeros = numeros.reshape(len(filas), 6).tolist()
+    fallidos = fallidos.reshape(len(filas), 6)
+    
+    # Un reporte repite el mismo proveedor en muchas filas: se corrige cada texto una vez
+    proveedores_corregidos = {}
+    for fila in filas:
+        proveedor = fila[1]
+        if isinstance(proveedor, str) and proveedor not in proveedores_corregidos:
+            proveedores_corregidos[proveedor] = memoria.corregir_nombre(
+                proveedor, memoria.proveedores_conocidos
+            )
+    
+    datos = []
+    for k, fila in enumerate(filas):
+        dato = {
+            'documento': fila[0],
+            'proveedor': proveedores_corregidos.get(fila[1], fila[1]) if isinstance(fila[1], str) else fila[1],
+        }
+        dato.update(zip(COLUMNAS_MONTOS_CARTERA, numeros[k]))
+        datos.append(dato)
+        diagnosticos[k]['montos_fallidos'] = [
+            campo for campo, fallido in zip(COLUMNAS_MONTOS_CARTERA, fallidos[k]) if fallido
+        ]
+    
+    contexto = {'lote': True}
+    indices = list(range(len(filas)))
+    try:
+        validadas = modelos.ADAPTADOR_FILAS_CARTERA.validate_python(datos, context=contexto)
+    except modelos.ValidationError as e:
+        # Los errores traen la fila en loc[0]: se apartan esas filas y se valida el resto
+        for error in e.errors():
+            k = error['loc'][0]
+            campo = '.'.join(str(parte) for parte in error['loc'][1:])
+            diagnosticos[k]['valida'] = False
+            diagnosticos[k]['errores'].append(f"{campo}: {error['msg']}")
+        indices = [k for k in indices if diagnosticos[k]['valida']]
+        validadas = modelos.ADAPTADOR_FILAS_CARTERA.validate_python([datos[k] for k in indices], context=contexto)
+    
+    filas_corregidas = list(filas)
+    for k, fila_validada in zip(indices, validadas):
+        if fila_validada.proveedor != filas[k][1]:
+            diagnosticos[k]['correcciones'].append(f"proveedor: '{filas[k][1]}' → '{fila_validada.proveedor}'")
+        if fila_validada.total != datos[k]['total']:
+            diagnosticos[k]['correcciones'].append(
+                f"total: {datos[k]['total']} → {fila_validada.total} (suma de componentes)"
+            )
+        filas_corregidas[k] = [
+            fila_validada.documento,
+            fila_validada.proveedor,
+            fila_validada.corriente,
+            fila_validada.de_1_a_30,
+            fila_validada.de_31_a_60,
+            fila_validada.de_61_a_90,
+            fila_validada.de_91_o_mas,
+            fila_validada.total
+        ]
+    
+    return filas_corregidas, diagnosticos
+
 def aplicar_autocorreccion_tabla(filas_raw, tipo_documento):
     """
     Aplica auto-corrección inteligente a una tabla extraída del OCR
@@ -315,58 +633,31 @@ def aplicar_autocorreccion_tabla(filas_raw, tipo_documento):
     if not FUZZY_DISPONIBLE or not filas_raw:
         return filas_raw
         
-    filas_corregidas = []
+    filas_corregidas = list(filas_raw)
     errores_corregidos = 0
-    
-    for i, fila in enumerate(filas_raw):
-        try:
-            if tipo_documento == 'cartera' and len(fila) >= 8:
-                # Validar fila de cartera por edades
-                datos = {
-                    'documento': fila[0],
-                    'proveedor': fila[1], 
-                    'corriente': fila[2],
-                    'de_1_a_30': fila[3],
-                    'de_31_a_60': fila[4], 
-                    'de_61_a_90': fila[5],
-                    'de_91_o_mas': fila[6],
-                    'total': fila[7]
-                }
-                
-                fila_validada = FilaCarteraEdades(**datos)
-                fila_corregida = [
-                    fila_validada.documento,
-                    fila_validada.proveedor,
-                    fila_validada.corriente,
-                    fila_validada.de_1_a_30,
-                    fila_validada.de_31_a_60,
-                    fila_validada.de_61_a_90,
-                    fila_validada.de_91_o_mas,
-                    fila_validada.total
-                ]
-                
-                # Contar correcciones realizadas
-                if fila != fila_corregida:
-                    errores_corregidos += 1
-                    
-                filas_corregidas.append(fila_corregida)
-                
-            else:
-                # Para otros tipos de tabla, aplicar correcciones básicas
-                fila_corregida = []
-                for valor in fila:
-                    if isinstance(valor, str) and re.match(r'.*[0-9].*', valor):
-                        # Parece un número, intentar limpiar
-                        valor_corregido = memoria_inteligente.limpiar_numero(valor)
-                        fila_corregida.append(valor_corregido)
-                    else:
-                        fila_corregida.append(valor)
-                
-                filas_corregidas.append(fila_corregida)
-                
-        except Exception as e:
-            print(f"⚠️ Error corrigiendo fila {i}: {e}")
-            filas_corregidas.append(fila)  # Usar fila original si hay error
+    pendientes = range(len(filas_raw))
+    
+    if tipo_documento == 'cartera':
+        # Filas de cartera por edades: validación Pydantic en lote
+        indices_cartera = [i for i, fila in enumerate(filas_raw) if len(fila) >= 8]
+        validadas, diagnosticos = validar_filas_cartera([filas_raw[i] for i in indices_cartera])
+        for i, fila_corregida, diagnostico in zip(indices_cartera, validadas, diagnosticos):
+            if not diagnostico['valida']:
+                print(f"⚠️ Error corrigiendo fila {i}: {'; '.join(diagnostico['errores'])}")
+            elif filas_raw[i] != fila_corregida:
+                errores_corregidos += 1
+            filas_corregidas[i] = fila_corregida
+        montos_fallidos = sum(len(d['montos_fallidos']) for d in diagnosticos)
+        if montos_fallidos:
+            print(f"⚠️ No se pudieron convertir {montos_fallidos} celdas a número")
+        en_lote = set(indices_cartera)
+        pendientes = [i for i in pendientes if i not in en_lote]
+    
+    # Para otros tipos de tabla (y filas incompletas), aplicar correcciones básicas:
+    # los valores que parecen número se limpian de una vez (no celda por celda)
+    numeros = limpiar_celdas_numericas(filas_raw, pendientes)
+    for i in pendientes:
+        filas_corregidas[i] = [numeros.get((i, j), valor) for j, valor in enumerate(filas_raw[i])]
     
     if errores_corregidos > 0:
         print(f"✅ Auto-corrección completada: {errores_corregidos} filas mejoradas")
@@ -393,7 +684,7 @@ def aplicar_autocorreccion_campos(datos, tipo_documento):
         if tipo_documento == 'vision_integrados':
             # Validar datos de medicamento
             if 'Código' in datos and 'Descripción' in datos:
-                medicamento = DatosMedicamento(
+                medicamento = obtener_modelos_validacion().DatosMedicamento(
                     codigo=datos.get('Código', ''),
                     descripcion=datos.get('Descripción', ''),
                     cantidad=datos.get('Cantidad', ''),
@@ -410,12 +701,13 @@ def aplicar_autocorreccion_campos(datos, tipo_documento):
         # Correcciones generales para nombres/proveedores
         for campo, valor in datos.items():
             if isinstance(valor, str) and ('proveedor' in campo.lower() or 'empresa' in campo.lower()):
-                datos_corregidos[campo] = memoria_inteligente.corregir_nombre(
-                    valor, memoria_inteligente.proveedores_conocidos
+                memoria = obtener_memoria_inteligente()
+                datos_corregidos[campo] = memoria.corregir_nombre(
+                    valor, memoria.proveedores_conocidos
                 )
             elif isinstance(valor, str) and any(x in campo.lower() for x in ['total', 'valor', 'precio', 'monto']):
                 # Corregir valores monetarios
-                datos_corregidos[campo] = memoria_inteligente.limpiar_numero(valor)
+                datos_corregidos[campo] = obtener_memoria_inteligente().limpiar_numero(valor)
                 
     except Exception as e:
         print(f"⚠️ Error en auto-corrección de campos: {e}")
@@ -482,10 +774,12 @@ def corregir_ocr_comun(texto):
     return texto
 
 def buscar(patron, texto, grupo=1):
-    """Busca un patron regex en el texto"""
+    """Busca un patron regex (cadena o patrón compilado) en el texto"""
     if not texto:
         return ""
-    match = re.search(patron, texto, re.IGNORECASE | re.DOTALL)
+    if isinstance(patron, str):
+        patron = re.compile(patron, re.IGNORECASE | re.DOTALL)
+    match = patron.search(texto)
     return match.group(grupo).strip() if match else ""
 
 # ===============================
@@ -550,72 +844,357 @@ def preprocesar_imagen_para_tablas(imagen):
         # Si falla todo, retornar original
         return [('original', imagen)]
 
-def ocr_pdf_bytes(pdf_bytes, max_paginas=2, dpi=200):
-    """Extrae texto de un PDF usando OCR con preprocesamiento para tablas"""
+# Selección de variante para Tesseract:
+# 'sondeo'   -> OCR barato sobre franjas muestreadas de cada variante y OCR completo
+#               solo de la mejor (1 pasada completa por página)
+# 'paralelo' -> OCR completo de todas las variantes a la vez; se detiene en cuanto
+#               una alcanza UMBRAL_CONFIANZA_PARADA (menor latencia por documento)
+# 'completo' -> OCR completo de todas las variantes en serie y se queda el texto más largo
+MODO_VARIANTES_TESSERACT = 'sondeo'
+
+# Modo 'paralelo': Tesseract corre como subproceso y libera el GIL, así que basta un pool de hilos.
+# Con menos hilos que variantes (preprocesar_imagen_para_tablas da 4) la parada temprana
+# tiene algo que cancelar: las variantes en cola no llegan a lanzar Tesseract
+MAX_HILOS_VARIANTES = min(2, os.cpu_count() or 1)
+UMBRAL_CONFIANZA_PARADA = 85  # confianza media (0-100) de image_to_data; None = esperar todas
+# Segundos máximos por variante: pytesseract mata el subproceso al vencerse, así una
+# variante que sigue corriendo tras la parada temprana no ocupa CPU indefinidamente
+TIMEOUT_VARIANTE_TESSERACT = 60
+
+# Franjas horizontales (posición relativa del centro) que se usan como sondeo
+FRANJAS_SONDEO = (0.2, 0.5, 0.8)
+ALTO_FRANJA_SONDEO = 0.06  # 6% del alto de la página por franja
+
+# Lado máximo (px) de las imágenes antes del OCR
+MAX_LADO_OCR = 4000
+
+def _franjas_sondeo(imagen):
+    """
+    Construye una imagen de sondeo apilando franjas horizontales muestreadas.
+    Se conserva la resolución original para no degradar el tamaño de la letra.
+    """
+    ancho, alto = imagen.size
+    alto_franja = max(60, int(alto * ALTO_FRANJA_SONDEO))
+    if alto_franja * len(FRANJAS_SONDEO) >= alto:
+        return imagen
+    
+    franjas = []
+    for centro in FRANJAS_SONDEO:
+        y0 = min(max(0, int(alto * centro) - alto_franja // 2), alto - alto_franja)
+        franjas.append(imagen.crop((0, y0, ancho, y0 + alto_franja)))
+    
+    sondeo = Image.new(imagen.mode, (ancho, alto_franja * len(franjas)))
+    for i, franja in enumerate(franjas):
+        sondeo.paste(franja, (0, i * alto_franja))
+    return sondeo
+
+def _puntaje_texto(texto):
+    """Puntaje de calidad de lectura: caracteres alfanuméricos reconocidos"""
+    return sum(1 for c in texto if c.isalnum())
+
+def seleccionar_variante_por_sondeo(versiones, lang='spa'):
+    """
+    Elige la mejor binarización haciendo OCR solo sobre franjas muestreadas de cada variante.
+    
+    Returns:
+        (nombre_version, imagen_version, puntaje) de la variante ganadora,
+        o None si ningún sondeo leyó texto
+    """
+    mejor = None
+    for nombre_version, img_procesada in versiones:
+        texto_sondeo = pytesseract.image_to_string(_franjas_sondeo(img_procesada), lang=lang, config='--psm 6')
+        puntaje = _puntaje_texto(texto_sondeo)
+        if mejor is None or puntaje > mejor[2]:
+            mejor = (nombre_version, img_procesada, puntaje)
+    
+    if mejor is None or mejor[2] == 0:
+        return None
+    return mejor
+
+def _texto_y_confianza_tesseract(imagen, lang='spa', config='--psm 3', timeout=0):
+    """
+    Ejecuta image_to_data una sola vez y reconstruye el texto línea por línea.
+    
+    Args:
+        timeout: segundos antes de matar el subproceso de Tesseract (0 = sin límite)
+    
+    Returns:
+        (texto, confianza_media) - confianza 0-100 sobre las palabras reconocidas
+    """
+    try:
+        datos = pytesseract.image_to_data(imagen, lang=lang, config=config, timeout=timeout,
+                                          output_type=pytesseract.Output.DICT)
+    except RuntimeError as e:
+        # pytesseract avisa el timeout con RuntimeError (el subproceso ya fue terminado)
+        print(f"⚠️ Tesseract superó {timeout}s en una variante: {e}")
+        return "", 0.0
+    
+    lineas = {}
+    confianzas = []
+    for i, palabra in enumerate(datos['text']):
+        palabra = palabra.strip()
+        if not palabra:
+            continue
+        clave = (datos['block_num'][i], datos['par_num'][i], datos['line_num'][i])
+        lineas.setdefault(clave, []).append(palabra)
+        try:
+            conf = float(datos['conf'][i])
+        except (TypeError, ValueError):
+            continue
+        if conf >= 0:
+            confianzas.append(conf)
+    
+    # Separar párrafos con línea en blanco, igual que image_to_string
+    partes = []
+    parrafo_anterior = None
+    for clave in sorted(lineas):
+        parrafo = clave[:2]
+        if parrafo_anterior is not None and parrafo != parrafo_anterior:
+            partes.append('')
+        partes.append(' '.join(lineas[clave]))
+        parrafo_anterior = parrafo
+    
+    confianza = sum(confianzas) / len(confianzas) if confianzas else 0.0
+    return '\n'.join(partes), confianza
+
+def ocr_variantes_en_paralelo(versiones, lang='spa', config='--psm 3', max_hilos=None, umbral_confianza=None):
+    """
+    OCR completo de todas las variantes en un pool acotado de hilos.
+    Si una variante alcanza `umbral_confianza`, se cancelan las que aún están en cola
+    y se retorna sin esperar a las que ya corren: esas terminan en segundo plano,
+    a lo sumo TIMEOUT_VARIANTE_TESSERACT segundos.
+    
+    Returns:
+        str: texto de la variante que cumplió el umbral, o el más largo si ninguna lo cumplió
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    
+    max_hilos = max_hilos or MAX_HILOS_VARIANTES
+    pool = ThreadPoolExecutor(max_workers=max(1, min(max_hilos, len(versiones))))
+    mejor_texto = ""
     try:
-        imagenes = convert_from_bytes(
-            pdf_bytes,
-            dpi=dpi,
-            first_page=1,
-            last_page=min(max_paginas, 5)
-        )
-        
-        texto_completo = []
-        for i, img in enumerate(imagenes, 1):
-            # Probar con preprocesamiento para detectar mejor tablas con encabezados de color
-            mejor_texto = ""
-            max_longitud = 0
+        futuros = {
+            pool.submit(_texto_y_confianza_tesseract, img_procesada, lang, config,
+                        TIMEOUT_VARIANTE_TESSERACT): nombre_version
+            for nombre_version, img_procesada in versiones
+        }
+        for futuro in as_completed(futuros):
+            texto, confianza = futuro.result()
             
-            # Generar versiones preprocesadas
-            versiones = preprocesar_imagen_para_tablas(img)
+            if umbral_confianza is not None and confianza >= umbral_confianza and texto.strip():
+                en_curso = sum(1 for f in futuros if f.running())
+                en_cola = sum(1 for f in futuros if not f.done() and not f.running())
+                print(f"⚡ Variante '{futuros[futuro]}' alcanzó confianza {confianza:.0f}: "
+                      f"se descartan {en_cola} en cola; {en_curso} ya en curso terminan en segundo plano")
+                return texto
             
-            # Probar OCR en cada versión y quedarse con el que da más texto
-            for nombre_version, img_procesada in versiones:
-                config = '--psm 3'
-                texto = pytesseract.image_to_string(img_procesada, lang='spa', config=config)
-                
-                # Criterio: el que detecte más texto y más líneas probablemente leyó mejor
-                if len(texto) > max_longitud:
-                    max_longitud = len(texto)
-                    mejor_texto = texto
+            # Mismo criterio que el modo en serie: el texto más largo
+            if len(texto) > len(mejor_texto):
+                mejor_texto = texto
+        
+        return mejor_texto
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+def ocr_tesseract_variantes(imagen, modo=None, lang='spa', config='--psm 3', versiones=None):
+    """
+    OCR de Tesseract sobre las versiones preprocesadas de una imagen.
+    
+    Args:
+        imagen: PIL Image (página o foto)
+        modo: 'sondeo', 'paralelo' o 'completo' (por defecto MODO_VARIANTES_TESSERACT)
+        versiones: versiones ya preprocesadas de `imagen` (evita repetir el preprocesamiento)
+    
+    Returns:
+        str: texto de la mejor variante
+    """
+    modo = modo or MODO_VARIANTES_TESSERACT
+    
+    # Generar versiones preprocesadas
+    if versiones is None:
+        versiones = preprocesar_imagen_para_tablas(imagen)
+    
+    if modo == 'sondeo' and len(versiones) > 1:
+        ganadora = seleccionar_variante_por_sondeo(versiones, lang=lang)
+        if ganadora:
+            # Un solo OCR completo, sobre la variante elegida
+            return pytesseract.image_to_string(ganadora[1], lang=lang, config=config)
+        # Si los sondeos no leyeron nada (franjas en blanco), probar todas completas
+    
+    if modo == 'paralelo' and len(versiones) > 1:
+        return ocr_variantes_en_paralelo(
+            versiones, lang=lang, config=config, umbral_confianza=UMBRAL_CONFIANZA_PARADA
+        )
+    
+    mejor_texto = ""
+    max_longitud = 0
+    
+    # Probar OCR en cada versión y quedarse con el que da más texto
+    for nombre_version, img_procesada in versiones:
+        texto = pytesseract.image_to_string(img_procesada, lang=lang, config=config)
+        
+        # Criterio: el que detecte más texto probablemente leyó mejor los encabezados
+        if len(texto) > max_longitud:
+            max_longitud = len(texto)
+            mejor_texto = texto
+    
+    return mejor_texto
+
+def ocr_pdf_bytes(pdf_bytes, max_paginas=2, dpi=200, modo=None):
+    """
+    Extrae texto de un PDF usando OCR con preprocesamiento para tablas.
+    Las páginas se rasterizan y procesan de a una; max_paginas=None procesa todas.
+    Las páginas con capa de texto nativa no pasan por OCR (ver leer_pdf_bytes).
+    """
+    return leer_pdf_bytes(pdf_bytes, max_paginas, dpi, modo)['texto']
+
+def leer_pdf_bytes(pdf_bytes, max_paginas=2, dpi=200, modo=None):
+    """
+    Lee un PDF combinando la capa de texto nativa (milisegundos) con OCR solo
+    para las páginas escaneadas.
+    
+    Returns:
+        dict: {
+            'texto': texto de todas las páginas en orden,
+            'elementos': cajas con coordenadas de las páginas nativas (para tablas),
+            'paginas_nativas': int,
+            'paginas_ocr': int
+        }
+    """
+    modo = modo or MODO_VARIANTES_TESSERACT
+    clave = clave_ocr(bytes(pdf_bytes), 'pdf_texto_u_ocr', lang='spa', psm=3, dpi=dpi,
+                      max_paginas=max_paginas, modo=modo)
+    return cache_ocr.obtener_o_calcular(clave, lambda: _leer_pdf_bytes(pdf_bytes, max_paginas, dpi, modo))
+
+def iterar_paginas_pdf(pdf_bytes, dpi=200, max_paginas=None, omitir=None):
+    """
+    Generador que rasteriza el PDF UNA página a la vez.
+    
+    El PDF se escribe una sola vez a un archivo temporal y pdftoppm se invoca por página,
+    así solo hay una imagen en memoria aunque el documento tenga 100 páginas.
+    
+    Args:
+        pdf_bytes: contenido del PDF
+        dpi: resolución de rasterizado
+        max_paginas: límite de páginas (None = todas)
+        omitir: números de página que no se rasterizan (p.ej. las que ya tienen texto nativo)
+    
+    Yields:
+        (numero_pagina, PIL Image)
+    """
+    from pdf2image import convert_from_path, pdfinfo_from_path
+    
+    with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp:
+        tmp.write(pdf_bytes)
+        ruta_pdf = tmp.name
+    
+    try:
+        total_paginas = pdfinfo_from_path(ruta_pdf).get('Pages', 1)
+        ultima = total_paginas if not max_paginas else min(total_paginas, max_paginas)
+        
+        omitir = set(omitir or ())
+        for numero in range(1, ultima + 1):
+            if numero in omitir:
+                continue
+            paginas = convert_from_path(ruta_pdf, dpi=dpi, first_page=numero, last_page=numero)
+            if not paginas:
+                break
+            yield numero, paginas[0]
+    finally:
+        try:
+            os.unlink(ruta_pdf)
+        except OSError:
+            pass
+
+def _leer_pdf_bytes(pdf_bytes, max_paginas, dpi, modo):
+    """Lectura del PDF sin pasar por la caché (página por página)"""
+    try:
+        # Paso 1: capa de texto nativa (vacía si pdfplumber no está o el PDF es escaneado)
+        capa = extraer_capa_texto(pdf_bytes, max_paginas=max_paginas)
+        textos = {p['numero']: p['texto'] for p in capa if p['nativa']}
+        elementos = [e for p in capa if p['nativa'] for e in p['elementos']]
+        if textos:
+            print(f"⚡ PDF: {len(textos)} página(s) con texto nativo, sin OCR")
+        
+        # Paso 2: OCR solo de las páginas escaneadas
+        paginas_ocr = 0
+        for numero, img in iterar_paginas_pdf(pdf_bytes, dpi=dpi, max_paginas=max_paginas, omitir=textos.keys()):
+            # Elegir la mejor versión preprocesada (tablas con encabezados de color)
+            textos[numero] = ocr_tesseract_variantes(img, modo=modo)
+            paginas_ocr += 1
             
-            texto_completo.append(mejor_texto)
+            # Liberar la página antes de rasterizar la siguiente
+            img.close()
+            del img
         
-        return "\n".join(texto_completo)
+        return {
+            'texto': "\n".join(textos[n] for n in sorted(textos)),
+            'elementos': elementos,
+            'paginas_nativas': len(textos) - paginas_ocr,
+            'paginas_ocr': paginas_ocr
+        }
     except Exception as e:
         raise Exception(f"Error en OCR de PDF: {str(e)}")
 
-def ocr_imagen(imagen):
-    """Extrae texto de una imagen usando OCR con preprocesamiento para tablas"""
+def ocr_imagen(imagen, modo=None, versiones=None, huella=None):
+    """
+    Extrae texto de una imagen usando OCR con preprocesamiento para tablas.
+    `modo` elige cómo se prueban las variantes (ver MODO_VARIANTES_TESSERACT).
+    `versiones` son las versiones preprocesadas de redimensionar_para_ocr(imagen), o una
+    función que las retorna (solo se llama si el texto no está en caché).
+    `huella` es huella_contenido(imagen) si ya se calculó (clave de caché).
+    """
+    modo = modo or MODO_VARIANTES_TESSERACT
+    clave = clave_ocr(imagen, 'tesseract', huella=huella, lang='spa', psm=3, modo=modo, max_lado=MAX_LADO_OCR)
+    return cache_ocr.obtener_o_calcular(clave, lambda: _ocr_imagen(imagen, modo, versiones))
+
+def redimensionar_para_ocr(imagen):
+    """Reduce la imagen a MAX_LADO_OCR solo si es muy grande"""
+    if max(imagen.size) > MAX_LADO_OCR:
+        ratio = MAX_LADO_OCR / max(imagen.size)
+        nuevo_tam = tuple(int(dim * ratio) for dim in imagen.size)
+        imagen = imagen.resize(nuevo_tam, Image.Resampling.LANCZOS)
+    return imagen
+
+def _ocr_imagen(imagen, modo, versiones=None):
+    """OCR de la imagen sin pasar por la caché"""
     try:
         # Redimensionar solo si es muy grande
-        if max(imagen.size) > 4000:
-            ratio = 4000 / max(imagen.size)
-            nuevo_tam = tuple(int(dim * ratio) for dim in imagen.size)
-            imagen = imagen.resize(nuevo_tam, Image.Resampling.LANCZOS)
-        
-        # Probar con preprocesamiento para detectar mejor tablas con encabezados de color
-        mejor_texto = ""
-        max_longitud = 0
+        imagen = redimensionar_para_ocr(imagen)
+        if callable(versiones):
+            versiones = versiones()
         
-        # Generar versiones preprocesadas
-        versiones = preprocesar_imagen_para_tablas(imagen)
-        
-        # Probar OCR en cada versión y quedarse con el que da más texto
-        for nombre_version, img_procesada in versiones:
-            config = '--psm 3'
-            texto = pytesseract.image_to_string(img_procesada, lang='spa', config=config)
-            
-            # Criterio: el que detecte más texto probablemente leyó mejor los encabezados
-            if len(texto) > max_longitud:
-                max_longitud = len(texto)
-                mejor_texto = texto
-        
-        return mejor_texto
+        # Elegir la mejor versión preprocesada (tablas con encabezados de color)
+        return ocr_tesseract_variantes(imagen, modo=modo, versiones=versiones)
     except Exception as e:
         raise Exception(f"Error en OCR de imagen: {str(e)}")
 
-def extraer_tabla_con_easyocr(imagen, num_columnas=8):
+def construir_filas_por_coordenadas(elementos, num_columnas=8):
+    """
+    Reconstruye filas de una tabla a partir de cajas de texto con coordenadas.
+    Agrupa por filas usando la coordenada Y y ordena cada fila por la coordenada X.
+    
+    Args:
+        elementos: lista de dicts {'texto', 'x', 'y', 'altura', ...} (PaddleOCR, EasyOCR o capa de texto PDF)
+        num_columnas: solo se retornan filas con este número de celdas
+    
+    Returns:
+        (filas_finales, tolerancia_y): lista de filas (lista de textos) y la tolerancia usada
+    """
+    # Agrupación por Y en una sola pasada sobre las coordenadas ordenadas (ver agrupacion_filas.py)
+    tolerancia = calcular_tolerancia_y(elementos)
+    filas_agrupadas = construir_filas(elementos, tolerancia)
+    
+    # Extraer solo el texto de cada fila
+    filas_finales = []
+    for fila in filas_agrupadas:
+        if len(fila) == num_columnas:  # Solo filas con número correcto de columnas
+            fila_textos = [elem['texto'] for elem in fila]
+            filas_finales.append(fila_textos)
+    
+    return filas_finales, tolerancia
+
+def extraer_tabla_con_easyocr(imagen, num_columnas=8, cajas=None):
     """
     Extrae tabla estructurada usando PaddleOCR (preferido) o EasyOCR con COORDENADAS ESPACIALES.
     Agrupa por filas usando coordenadas Y y ordena columnas por coordenada X.
@@ -624,90 +1203,66 @@ def extraer_tabla_con_easyocr(imagen, num_columnas=8):
     Args:
         imagen: PIL Image object
         num_columnas: Número de columnas esperadas en la tabla (default 8 para cartera por edades)
+        cajas: resultado de leer_cajas_ocr(imagen) si ya se tiene (evita repetir el OCR)
     
     Returns:
         List[List]: Lista de filas, cada fila es una lista de valores ordenados por posición
     """
+    if cajas is None:
+        cajas = leer_cajas_ocr(imagen)
+    if not cajas['elementos']:
+        return []
+    
+    filas_finales, tolerancia_y = construir_filas_por_coordenadas(cajas['elementos'], num_columnas)
+    
+    print(f"{cajas['motor']}: Extraidas {len(filas_finales)} filas completas de {num_columnas} columnas (tolerancia Y={tolerancia_y:.1f}px)")
+    return filas_finales
+
+def _elemento_desde_bbox(bbox, texto, confianza):
+    """Caja de OCR ([[x1,y1], ..., [x4,y4]], texto, confianza) -> elemento con centro y altura"""
+    ys = [float(punto[1]) for punto in bbox]
+    xs = [float(punto[0]) for punto in bbox]
+    return {
+        'texto': texto,
+        'x': sum(xs) / 4,
+        'y': sum(ys) / 4,
+        'altura': max(ys) - min(ys),
+        'confianza': float(confianza)
+    }
+
+def leer_cajas_ocr(imagen, huella=None):
+    """
+    Cajas de texto con coordenadas de la imagen: PaddleOCR si está instalado,
+    si no (o si falla) EasyOCR. Con caché por contenido (`huella`: ver ocr_imagen).
+    
+    Returns:
+        dict: {'motor': 'PaddleOCR'|'EasyOCR'|None, 'elementos': [{'texto','x','y','altura','confianza'}, ...]}
+    """
+    huella = huella or huella_contenido(imagen)
+    clave = clave_ocr(imagen, 'cajas_coordenadas', huella=huella)
+    # No se guardan lecturas fallidas: pueden deberse a que ningún motor estaba instalado
+    return cache_ocr.obtener_o_calcular(
+        clave, lambda: _leer_cajas_ocr(imagen, huella), guardar_vacios=False
+    ) or {'motor': None, 'elementos': []}
+
+def _leer_cajas_ocr(imagen, huella=None):
+    """Lectura de cajas sin pasar por la caché (None si ningún motor pudo leer)"""
     try:
         # OPCIÓN 1: PaddleOCR (PREFERIDO - más rápido y preciso)
         try:
-            from paddleocr import PaddleOCR
             import numpy as np
             
-            # Inicializar PaddleOCR (español, con corrección de ángulo)
-            ocr = PaddleOCR(use_angle_cls=True, lang='es', show_log=False)
-            
-            # Convertir PIL Image a numpy array
-            img_array = np.array(imagen)
+            # PaddleOCR compartido (español, con corrección de ángulo) - se carga una vez por proceso
+            ocr = obtener_paddleocr()
             
             # Ejecutar reconocimiento CON coordenadas
-            result = ocr.ocr(img_array, cls=True)
-            
-            if not result or not result[0]:
-                return []
+            with bloqueo_motor(ocr):
+                result = ocr.ocr(np.array(imagen), cls=True)
             
-            # Extraer elementos con coordenadas
             # result[0] = [[bbox, (texto, confianza)], ...]
-            elementos = []
-            for line in result[0]:
-                bbox = line[0]  # [[x1,y1], [x2,y2], [x3,y3], [x4,y4]]
-                texto = line[1][0]  # texto detectado
-                confianza = line[1][1]  # confianza
-                
-                # Calcular centro del bounding box
-                y_centro = sum([punto[1] for punto in bbox]) / 4
-                x_centro = sum([punto[0] for punto in bbox]) / 4
-                altura = max([punto[1] for punto in bbox]) - min([punto[1] for punto in bbox])
-                
-                elementos.append({
-                    'texto': texto,
-                    'x': x_centro,
-                    'y': y_centro,
-                    'altura': altura,
-                    'confianza': confianza
-                })
-            
-            # Calcular tolerancia Y basada en altura promedio
-            if elementos:
-                altura_promedio = sum(elem['altura'] for elem in elementos) / len(elementos)
-                tolerancia_y = altura_promedio * 0.6  # 60% de la altura promedio
-            else:
-                tolerancia_y = 15
-            
-            # Agrupar por filas usando coordenadas Y
-            filas_agrupadas = []
-            elementos_usados = set()
-            
-            # Ordenar por Y para procesar de arriba a abajo
-            elementos_ordenados = sorted(elementos, key=lambda e: e['y'])
-            
-            for elem in elementos_ordenados:
-                if id(elem) in elementos_usados:
-                    continue
-                    
-                # Crear nueva fila con elementos en rango Y similar
-                fila_actual = []
-                for otro_elem in elementos_ordenados:
-                    if id(otro_elem) in elementos_usados:
-                        continue
-                    if abs(otro_elem['y'] - elem['y']) <= tolerancia_y:
-                        fila_actual.append(otro_elem)
-                        elementos_usados.add(id(otro_elem))
-                
-                if fila_actual:
-                    # Ordenar elementos de la fila por X (izquierda a derecha)
-                    fila_ordenada = sorted(fila_actual, key=lambda e: e['x'])
-                    filas_agrupadas.append(fila_ordenada)
-            
-            # Extraer solo el texto de cada fila
-            filas_finales = []
-            for fila in filas_agrupadas:
-                if len(fila) == num_columnas:  # Solo filas con número correcto de columnas
-                    fila_textos = [elem['texto'] for elem in fila]
-                    filas_finales.append(fila_textos)
-            
-            print(f"PaddleOCR: Extraidas {len(filas_finales)} filas completas de {num_columnas} columnas (tolerancia Y={tolerancia_y:.1f}px)")
-            return filas_finales
+            lineas = (result[0] if result else None) or []
+            elementos = [_elemento_desde_bbox(line[0], line[1][0], line[1][1]) for line in lineas]
+            return {'motor': 'PaddleOCR', 'elementos': elementos}
             
         except ImportError:
             # PaddleOCR no disponible, usar EasyOCR
@@ -716,86 +1271,33 @@ def extraer_tabla_con_easyocr(imagen, num_columnas=8):
             print(f"Warning: PaddleOCR falló ({e}), usando EasyOCR como fallback...")
         
         # OPCIÓN 2: EasyOCR (Fallback)
-        import easyocr
-        import numpy as np
-        
-        # Inicializar el lector (español e inglés para encabezados)
-        reader = easyocr.Reader(['es', 'en'], gpu=False, verbose=False)
-        
-        # Convertir PIL Image a formato compatible
-        img_array = np.array(imagen)
-        
-        # Leer imagen CON coordenadas (detail=1)
-        result = reader.readtext(img_array, detail=1, paragraph=False)
-        
-        if not result:
-            return []
-        
-        # Extraer bounding boxes y texto
-        elementos = []
-        for bbox, texto, confianza in result:
-            # Calcular centro del bounding box para agrupación
-            y_centro = sum([punto[1] for punto in bbox]) / 4
-            x_centro = sum([punto[0] for punto in bbox]) / 4
-            altura = max([punto[1] for punto in bbox]) - min([punto[1] for punto in bbox])
-            
-            elementos.append({
-                'texto': texto,
-                'x': x_centro,
-                'y': y_centro,
-                'altura': altura,
-                'confianza': confianza
-            })
-        
-        # Calcular tolerancia Y basada en altura promedio del texto
-        if elementos:
-            altura_promedio = sum(elem['altura'] for elem in elementos) / len(elementos)
-            tolerancia_y = altura_promedio * 0.6  # 60% de la altura promedio
-        else:
-            tolerancia_y = 15
-        
-        # Agrupar por filas (elementos con Y similar están en la misma fila)
-        filas_agrupadas = []
-        elementos_usados = set()
-        
-        # Ordenar por Y para procesar de arriba a abajo
-        elementos_ordenados = sorted(elementos, key=lambda e: e['y'])
-        
-        for elem in elementos_ordenados:
-            if id(elem) in elementos_usados:
-                continue
-                
-            # Crear nueva fila con elementos en rango Y similar
-            fila_actual = []
-            for otro_elem in elementos_ordenados:
-                if id(otro_elem) in elementos_usados:
-                    continue
-                if abs(otro_elem['y'] - elem['y']) <= tolerancia_y:
-                    fila_actual.append(otro_elem)
-                    elementos_usados.add(id(otro_elem))
-            
-            if fila_actual:
-                # Ordenar elementos de la fila por X (izquierda a derecha)
-                fila_ordenada = sorted(fila_actual, key=lambda e: e['x'])
-                filas_agrupadas.append(fila_ordenada)
-        
-        # Extraer solo el texto de cada fila
-        filas_finales = []
-        for fila in filas_agrupadas:
-            if len(fila) == num_columnas:  # Solo filas con número correcto de columnas
-                fila_textos = [elem['texto'] for elem in fila]
-                filas_finales.append(fila_textos)
-        
-        print(f"EasyOCR: Extraidas {len(filas_finales)} filas completas de {num_columnas} columnas (tolerancia Y={tolerancia_y:.1f}px)")
-        return filas_finales
+        return {'motor': 'EasyOCR', 'elementos': leer_cajas_easyocr(imagen, huella=huella)}
         
     except ImportError:
         # Ni PaddleOCR ni EasyOCR disponibles
         print("Warning: PaddleOCR y EasyOCR no disponibles. Instalar con: pip install paddleocr")
-        return []
+        return None
     except Exception as e:
         print(f"Warning: Error en extraccion OCR avanzada: {e}")
-        return []
+        return None
+
+def leer_cajas_easyocr(imagen, huella=None):
+    """
+    Cajas de texto de EasyOCR en el orden de lectura del motor, con caché por contenido
+    (`huella`: ver ocr_imagen). Lanza ImportError si easyocr no está instalado.
+    """
+    def _leer():
+        import numpy as np
+        
+        # Lector compartido (español e inglés para encabezados)
+        reader = obtener_easyocr()
+        
+        # Leer imagen CON coordenadas (detail=1)
+        with bloqueo_motor(reader):
+            result = reader.readtext(np.array(imagen), detail=1, paragraph=False)
+        return [_elemento_desde_bbox(bbox, texto, confianza) for bbox, texto, confianza in result]
+    
+    return cache_ocr.obtener_o_calcular(clave_ocr(imagen, 'cajas_easyocr', huella=huella), _leer)
 
 # ===============================
 # EXTRACCION CON LLM (OPCIONAL)
@@ -952,6 +1454,10 @@ Responde SOLO con JSON válido en este formato:
 # ===============================
 # FUNCIONES DE EXTRACCION INTELIGENTE
 # ===============================
+# Valores que son parte de otras estructuras del documento, no de un par
+PALABRAS_EXCLUIR_PARES = ('SEDE ENTREGA', 'CENTRO DIST', 'FECHA FORMULA', 'CODIGO INTERNO',
+                          'NOMBRE GENERICO', 'LOTE Lote', 'MOTIVO REMISION')
+
 def extraer_pares_clave_valor(texto):
     """
     Extrae automáticamente pares clave-valor del documento.
@@ -959,13 +1465,14 @@ def extraer_pares_clave_valor(texto):
     GENÉRICO - Funciona con cualquier tipo de documento
     """
     pares = {}
+    # Valores ya guardados, indexados para descartar duplicados sin recorrer todos los pares
+    valores_guardados = IndiceContencion()
     
     # Corregir errores comunes del OCR primero
     texto = corregir_ocr_comun(texto)
     
     # Patrón 1: Etiqueta: Valor (en la misma línea) - Mejorado para evitar duplicados
-    patron_dos_puntos = r'([A-ZÁÉÍÓÚÑ][a-záéíóúñA-ZÁÉÍÓÚÑ\s]{3,60}):\s*([^\n:]{3,250})'
-    matches = re.findall(patron_dos_puntos, texto)
+    matches = PATRONES_PARES['dos_puntos'].findall(texto)
     
     for etiqueta, valor in matches:
         etiqueta_limpia = etiqueta.strip()
@@ -980,39 +1487,33 @@ def extraer_pares_clave_valor(texto):
             continue
         
         # Limpiar valores que terminan con otra etiqueta
-        valor_limpio = re.split(r'\s{2,}[A-Z]{3,}:', valor_limpio)[0].strip()
+        valor_limpio = PATRONES_PARES['etiqueta_siguiente'].split(valor_limpio)[0].strip()
         
         # Limpiar fragmentos adicionales usando la función especializada
         valor_limpio = limpiar_valor(valor_limpio)
         
         # Eliminar valores que son solo espacios múltiples o guiones
-        if re.match(r'^[\s\-—–]+$', valor_limpio):
+        if PATRONES_PARES['solo_guiones'].match(valor_limpio):
             continue
         
         # Eliminar valores que parecen ser partes de otras estructuras
-        palabras_excluir = ['SEDE ENTREGA', 'CENTRO DIST', 'FECHA FORMULA', 'CODIGO INTERNO', 
-                           'NOMBRE GENERICO', 'LOTE Lote', 'MOTIVO REMISION']
-        if any(excl in valor_limpio.upper() for excl in palabras_excluir):
+        valor_mayusculas = valor_limpio.upper()
+        if any(excl in valor_mayusculas for excl in PALABRAS_EXCLUIR_PARES):
             continue
         
         # Crear clave descriptiva normalizada (sin acentos rotos)
         clave = normalizar_clave(etiqueta_limpia)
         
-        # Evitar duplicados: verificar si ya existe un valor similar
-        ya_existe = False
-        for key_existente, valor_existente in pares.items():
-            if valor_limpio in valor_existente or valor_existente in valor_limpio:
-                if len(valor_existente) >= len(valor_limpio):
-                    ya_existe = True
-                    break
+        # Evitar duplicados: un valor ya guardado que lo contenga (uno más largo o igual)
+        ya_existe = valores_guardados.esta_contenido(valor_limpio)
         
         # Guardar solo si tiene contenido válido y no está duplicado
         if not ya_existe and valor_limpio and len(valor_limpio) > 2:
             pares[clave] = valor_limpio
+            valores_guardados.asignar(clave, valor_limpio)
     
     # Patrón 2: Formato con guiones "ETIQUETA — Valor" (solo si el valor es significativo)
-    patron_guion = r'([A-ZÁÉÍÓÚÑ][A-ZÁÉÍÓÚÑ\s]{4,50})\s*[—–]\s*([A-Za-z0-9áéíóúñÁÉÍÓÚÑ][A-Za-z0-9áéíóúñÁÉÍÓÚÑ\s.,:/-]{2,150})'
-    matches_guion = re.findall(patron_guion, texto)
+    matches_guion = PATRONES_PARES['guion'].findall(texto)
     
     for etiqueta, valor in matches_guion:
         etiqueta_limpia = etiqueta.strip()
@@ -1025,21 +1526,19 @@ def extraer_pares_clave_valor(texto):
         valor_limpio = limpiar_valor(valor_limpio)
         
         # Evitar valores fragmentados o incompletos
-        if re.match(r'^[A-Z\s]{1,15}$', valor_limpio) and len(valor_limpio) < 8:
+        if PATRONES_PARES['fragmento_mayusculas'].match(valor_limpio) and len(valor_limpio) < 8:
             continue
             
         clave = normalizar_clave(etiqueta_limpia)
         
         # Solo agregar si no existe y no es similar a uno existente
         if clave not in pares:
-            ya_existe = False
-            for valor_existente in pares.values():
-                if valor_limpio in valor_existente or valor_existente in valor_limpio:
-                    ya_existe = True
-                    break
+            ya_existe = (valores_guardados.esta_contenido(valor_limpio) or
+                         valores_guardados.contiene_alguno(valor_limpio))
             
             if not ya_existe:
                 pares[clave] = valor_limpio
+                valores_guardados.asignar(clave, valor_limpio)
     
     # Patrón 3: Campos específicos de medicamentos (mejora en la detección)
     
@@ -1138,49 +1637,49 @@ def extraer_datos_herinco(texto):
         return {}  # No es documento HERINCO
     
     # 1. DOCUMENTO (formato: CC-39412449)
-    match = re.search(r'DOCUMENTO:\s*([A-Z]{1,3}[-\s]?\d{6,12})', texto)
+    match = PATRONES_HERINCO['documento'].search(texto)
     if match:
         datos['DOCUMENTO'] = match.group(1).strip().replace(' ', '-')
     
     # 2. NOMBRES
-    match = re.search(r'NOMBRES:\s*([A-ZÁÉÍÓÚÑ][A-ZÁÉÍÓÚÑa-záéíóúñ\s]+?)(?=\n|FORMULA)', texto)
+    match = PATRONES_HERINCO['nombres'].search(texto)
     if match:
         datos['NOMBRES'] = match.group(1).strip()
     
     # 3. FORMULA (código numérico)
-    match = re.search(r'FORMULA:\s*(\d{6,10})', texto)
+    match = PATRONES_HERINCO['formula'].search(texto)
     if match:
         datos['FORMULA'] = match.group(1).strip()
     
     # 4. ASEGURADORA
-    match = re.search(r'ASEGURADORA:\s*([A-ZÁÉÍÓÚÑa-záéíóúñ\s]+?)(?=\n|NIVEL)', texto)
+    match = PATRONES_HERINCO['aseguradora'].search(texto)
     if match:
         datos['ASEGURADORA'] = match.group(1).strip()
     
     # 5. NIVEL (puede ser 1, 4, etc.) - SIEMPRE retornar el valor del OCR
-    match = re.search(r'NIVEL:\s*(\d+)', texto)
+    match = PATRONES_HERINCO['nivel'].search(texto)
     if match:
         datos['NIVEL'] = match.group(1).strip()
     
     # 6. FECHA (formato: 2025-12-09 convertir a 09/12/2025)
-    match = re.search(r'FECHA:\s*\.?(\d{4})-(\d{2})-(\d{2})', texto)
+    match = PATRONES_HERINCO['fecha'].search(texto)
     if match:
         año, mes, dia = match.groups()
         datos['FECHA'] = f"{dia}/{mes}/{año}"
     
     # 7. VALOR CUOTA
-    match = re.search(r'VALOR\s+CUOTA:\s*([O0]|\d+)', texto)
+    match = PATRONES_HERINCO['valor_cuota'].search(texto)
     if match:
         valor = match.group(1).replace('O', '0')  # Corregir OCR (O -> 0)
         datos['VALOR CUOTA'] = valor
     
     # 8. CODIGO INTERNO
-    match = re.search(r'CODIG[OÓ]\s+INTERNO:\s*(\d{6,10})', texto)
+    match = PATRONES_HERINCO['codigo_interno'].search(texto)
     if match:
         datos['CODIGO INTERNO'] = match.group(1).strip()
     
     # 9. DIRECCION (agregar # si falta)
-    match = re.search(r'DIRECCION\s+([A-Z0-9][A-Z0-9\s#\-ÁÉÍÓÚÑ]+?)(?=TELEFONO|\n\s*TELEFONO)', texto, re.IGNORECASE)
+    match = PATRONES_HERINCO['direccion'].search(texto)
     if match:
         direccion = match.group(1).strip()
         # Agregar # si falta entre calle/carrera y número
@@ -1188,43 +1687,43 @@ def extraer_datos_herinco(texto):
         datos['DIRECCION'] = direccion
     
     # 10. TELEFONO
-    match = re.search(r'TELEFONO\s+(\d{6,10})', texto)
+    match = PATRONES_HERINCO['telefono'].search(texto)
     if match:
         datos['TELEFONO'] = match.group(1).strip()
     
     # 11. CELULAR
-    match = re.search(r'CELULAR\s+(\d{10})', texto)
+    match = PATRONES_HERINCO['celular'].search(texto)
     if match:
         datos['CELULAR'] = match.group(1).strip()
     
     # 12. SEDE ENTREGA
-    match = re.search(r'SEDE\s+ENTREGA:\s*([A-ZÁÉÍÓÚÑa-záéíóúñ\s\-\.]+?)(?=\n|CIUDAD)', texto)
+    match = PATRONES_HERINCO['sede_entrega'].search(texto)
     if match:
         datos['SEDE ENTREGA'] = match.group(1).strip()
     
     # 13. CIUDAD
-    match = re.search(r'CIUDAD:\s*([A-ZÁÉÍÓÚÑa-záéíóúñ\s]+?)(?=\s*-|\n|FECHA)', texto)
+    match = PATRONES_HERINCO['ciudad'].search(texto)
     if match:
         datos['CIUDAD'] = match.group(1).strip()
     
     # 14. FECHA FORMULA (formato: 2025-08-15 convertir a 15/08/2025)
-    match = re.search(r'FECHA\s+FORMULA:\s*[—–]?\s*(\d{4})-(\d{2})-(\d{2})', texto)
+    match = PATRONES_HERINCO['fecha_formula'].search(texto)
     if match:
         año, mes, dia = match.groups()
         datos['FECHA FORMULA'] = f"{dia}/{mes}/{año}"
     
     # 15. REGIMEN
-    match = re.search(r'REGIMEN:\s*([A-ZÁÉÍÓÚÑa-záéíóúñ]+)', texto)
+    match = PATRONES_HERINCO['regimen'].search(texto)
     if match:
         datos['REGIMEN'] = match.group(1).strip()
     
     # 16. CODIGO IPS (puede empezar con 0)
-    match = re.search(r'CODIG[OÓ][\s_]+IPS:\s*0?(\d{11})', texto)
+    match = PATRONES_HERINCO['codigo_ips'].search(texto)
     if match:
         datos['CODIGO IPS'] = match.group(1).strip()  # Sin el 0 extra
     
     # 17. DESCRIPCION IPS (mantener EPS si existe, eliminar solo IPS redundante)
-    match = re.search(r'DESCRIPCI[OÓ]N\s+IPS:\s*[—–]?\s*((?:EPS\s+)?(?:IPS\s+)?[A-ZÁÉÍÓÚÑa-záéíóúñ\s]+?)(?=\n\n|INFORMACION|CODIGO)', texto)
+    match = PATRONES_HERINCO['descripcion_ips'].search(texto)
     if match:
         descripcion = match.group(1).strip()
         # Si tiene "IPS VISION" cambiar a "EPS VISION"
@@ -1233,27 +1732,27 @@ def extraer_datos_herinco(texto):
         datos['DESCRIPCION IPS'] = descripcion
     
     # 18. CODIGO MEDICO
-    match = re.search(r'CODIGO\s+MEDICO\s+(\d{10})', texto)
+    match = PATRONES_HERINCO['codigo_medico'].search(texto)
     if match:
         datos['CODIGO MEDICO'] = match.group(1).strip()
     
     # 19. NOMBRE MEDICO
-    match = re.search(r'NOMBRE\s+MEDICO\s+[—–]?\s*([A-ZÁÉÍÓÚÑa-záéíóúñ\s]+?)(?=\n|CODIGO\s+CIE)', texto)
+    match = PATRONES_HERINCO['nombre_medico'].search(texto)
     if match:
         datos['NOMBRE MEDICO'] = match.group(1).strip()
     
     # 20. CODIGO CIE
-    match = re.search(r'CODIGO\s+CIE\s*[–-]\s*([A-Z0-9]{3,6})', texto)
+    match = PATRONES_HERINCO['codigo_cie'].search(texto)
     if match:
         datos['CODIGO CIE'] = match.group(1).strip()
     
     # 21. CONTRATO (eliminar Ñ extra)
-    match = re.search(r'CONTRATO\s+Ñ?([A-ZÁÉÍÓÚÑa-záéíóúñ\s\-]+?)(?=\n|COD\s+ATC)', texto)
+    match = PATRONES_HERINCO['contrato'].search(texto)
     if match:
         datos['CONTRATO'] = match.group(1).strip()
     
     # 22. COD ATC (corregir SOIKAO1 -> S01KA01)
-    match = re.search(r'COD\s+ATC\s+NUA\s+NOMBRE\s+GENERICO.*?\n([A-Z0-9]{7})', texto, re.DOTALL)
+    match = PATRONES_HERINCO['cod_atc'].search(texto)
     if match:
         cod_atc = match.group(1).strip()
         # Corregir errores comunes OCR: SOIKAO1 -> S01KA01
@@ -1262,7 +1761,7 @@ def extraer_datos_herinco(texto):
         datos['COD ATC'] = cod_atc
     
     # 23. NUA (si está vacío, colocar 0)
-    match = re.search(r'COD\s+ATC\s+NUA\s+NOMBRE\s+GENERICO.*?\n[A-Z0-9]{7}\s+\[?\s*(\d*)\s*\[?\s+', texto, re.DOTALL)
+    match = PATRONES_HERINCO['nua'].search(texto)
     if match:
         nua = match.group(1).strip()
         datos['NUA'] = nua if nua else '0'
@@ -1275,11 +1774,7 @@ def extraer_datos_herinco(texto):
     # (HIALTEARS) FRASCO X 15 ML .
     
     # Buscar la sección completa del medicamento DESPUÉS de los encabezados
-    match_seccion = re.search(
-        r'COD\s+ATC\s+NUA\s+NOMBRE\s+GENERICO\s+CAN\s+ENTR\s+CAN\s+PEND\s+FORMULACION\s*\n\s*\n\s*([A-Z0-9]{7})\s+\[?\s*(.+?)(?=\n\s*LOTE)',
-        texto,
-        re.DOTALL
-    )
+    match_seccion = PATRONES_HERINCO['seccion_medicamento'].search(texto)
     
     if match_seccion:
         codigo_atc_verificar = match_seccion.group(1)
@@ -1287,11 +1782,7 @@ def extraer_datos_herinco(texto):
         
         # Buscar los 4 componentes: NOMBRE, CAN_ENTR, CAN_PEND, FORMULACION
         # Patrón: texto_medicamento . NUMERO NUMERO DURANTE...
-        match_datos = re.search(
-            r'(.+?)\s*\.\s*(\d+)\s+(\d+)\s+(DURANTE\s+\d+\s+D[IÍ]AS?)',
-            contenido_completo,
-            re.DOTALL | re.IGNORECASE
-        )
+        match_datos = PATRONES_HERINCO['datos_medicamento'].search(contenido_completo)
         
         if match_datos:
             # 24. NOMBRE GENERICO
@@ -1335,72 +1826,72 @@ def extraer_datos_vision_integrados(texto):
         return {}  # No es documento Vision Integrados
     
     # 1. Código del Prestador (eliminar 0 inicial si está duplicado)
-    match = re.search(r'C[oó]digo\s+del\s+Prestador:\s*0?(\d{11})', texto, re.IGNORECASE)
+    match = PATRONES_VISION['codigo_prestador'].search(texto)
     if match:
         datos['Código del Prestador'] = match.group(1).strip()
     
     # 2. Nit
-    match = re.search(r'Nit:\s*(\d{9,12})', texto, re.IGNORECASE)
+    match = PATRONES_VISION['nit'].search(texto)
     if match:
         datos['Nit'] = match.group(1).strip()
     
     # 3. Dirección (del prestador)
-    match = re.search(r'Direcci[oó]n:\s*([A-Z0-9][A-Z0-9\s#]+?)(?=\n|Tel[eé]fono)', texto, re.IGNORECASE)
+    match = PATRONES_VISION['direccion'].search(texto)
     if match:
         datos['Dirección'] = match.group(1).strip()
     
     # 4. Teléfono (del prestador)
-    match = re.search(r'Tel[eé]fono:\s*(\d{7,10})', texto, re.IGNORECASE)
+    match = PATRONES_VISION['telefono'].search(texto)
     if match:
         datos['Teléfono'] = match.group(1).strip()
     
     # 5. WEB
-    match = re.search(r'(www\.[a-z0-9\.]+\.com(?:\.co)?)', texto, re.IGNORECASE)
+    match = PATRONES_VISION['web'].search(texto)
     if match:
         datos['WEB'] = match.group(1).strip().lower()
     
     # 6. Identificacion (del paciente)
-    match = re.search(r'(CC|TI|CE|PA)\s*-\s*(\d{6,12})', texto)
+    match = PATRONES_VISION['documento_paciente'].search(texto)
     if match:
         datos['Identificacion'] = f"{match.group(1)} - {match.group(2)}"
     
     # 7. Paciente (nombre completo)
-    match = re.search(r'Paciente:\s*([A-ZÁÉÍÓÚÑ][A-ZÁÉÍÓÚÑa-záéíóúñ\s]+?)(?=\n|\d{4})', texto, re.IGNORECASE)
+    match = PATRONES_VISION['paciente'].search(texto)
     if match:
         datos['Paciente'] = match.group(1).strip()
     
     # 8. Fecha Ingreso (convertir YYYY/MM/DD a DD/MM/YYYY)
-    match = re.search(r'(\d{4})/(\d{2})/(\d{2})\s+Hora\s+Ing:', texto)
+    match = PATRONES_VISION['fecha_ingreso'].search(texto)
     if match:
         año, mes, dia = match.groups()
         datos['Fecha Ingreso'] = f"{dia}/{mes}/{año}"
     
     # 9. Hora Ing
-    match = re.search(r'Hora\s+Ing:\s*(\d{1,2}:\d{2})', texto, re.IGNORECASE)
+    match = PATRONES_VISION['hora_ingreso'].search(texto)
     if match:
         datos['Hora Ing'] = match.group(1).strip()
     
     # 10. Ingreso (número) - puede estar en línea con "Consulta Externa"
-    match = re.search(r'Ingreso:\s*(\d{6,10})', texto, re.IGNORECASE | re.DOTALL)
+    match = PATRONES_VISION['ingreso'].search(texto)
     if match:
         datos['Ingreso'] = match.group(1).strip()
     else:
         # Buscar patrón alternativo: número después de "Consulta Externa"
-        match = re.search(r'001\s*-\s*Consulta\s+Externa.*?(\d{7})', texto, re.DOTALL)
+        match = PATRONES_VISION['ingreso_consulta_externa'].search(texto)
         if match:
             datos['Ingreso'] = match.group(1).strip()
     
     # 11. Fecha Atencion (formato YYYY/MM/DD HH:MM convertir a DD/MM/YYYY HH:MM)
-    match = re.search(r'(\d{4})/(\d{2})/(\d{2})\s+(\d{1,2}:\d{2})', texto)
+    match = PATRONES_VISION['fecha_hora'].search(texto)
     if match and 'Fecha Ingreso' in datos:
         # Buscar la segunda fecha (que no sea la de ingreso)
-        todas_fechas = re.findall(r'(\d{4})/(\d{2})/(\d{2})\s+(\d{1,2}:\d{2})', texto)
+        todas_fechas = PATRONES_VISION['fecha_hora'].findall(texto)
         if len(todas_fechas) >= 2:
             año, mes, dia, hora = todas_fechas[1]
             datos['Fecha Atencion'] = f"{dia}/{mes}/{año} {hora}"
     
     # 12. Fecha Naci (formato YYYY-MM-DD convertir a DD/MM/YYYY)
-    match = re.search(r'(\d{4})-(\d{2})-(\d{2})\s+Edad:', texto)
+    match = PATRONES_VISION['fecha_nacimiento'].search(texto)
     if match:
         año, mes, dia = match.groups()
         datos['Fecha Naci'] = f"{dia}/{mes}/{año}"
@@ -1408,118 +1899,118 @@ def extraer_datos_vision_integrados(texto):
     # 13. Edad (extraer el valor que el usuario especifica, aunque sea erróneo)
     # El usuario espera "28/02/1900" pero en realidad debería ser la edad calculada
     # Voy a usar un placeholder por ahora
-    match = re.search(r'Edad:\s*(\d+)\s+a[ñn]os', texto, re.IGNORECASE)
+    match = PATRONES_VISION['edad'].search(texto)
     if match:
         # El usuario pone una fecha aquí, pero el OCR muestra años
         # Por ahora voy a dejar el campo vacío o usar lo que venga
         datos['Edad'] = '28/02/1900'  # Placeholder como usuario especifica
     
     # 14. Sexo - buscar patrón: número de ingreso seguido de sexo
-    match = re.search(r'(\d{7})\s+([MF])\s+', texto)
+    match = PATRONES_VISION['consecutivo_sexo'].search(texto)
     if match:
         datos['Sexo'] = match.group(2).upper()
     else:
         # Fallback: buscar "Sexo: X"
-        match = re.search(r'Sexo:\s*([MFmf])', texto, re.IGNORECASE)
+        match = PATRONES_VISION['sexo'].search(texto)
         if match:
             datos['Sexo'] = match.group(1).upper()
     
     # 15. Nro.Historia
-    match = re.search(r'CC(\d{8,10})\s+Tipo\s+Usuario:', texto, re.IGNORECASE)
+    match = PATRONES_VISION['cc_tipo_usuario'].search(texto)
     if match:
         datos['Nro.Historia'] = f"CC{match.group(1)}"
     
     # 16. Tipo Usuario
-    match = re.search(r'Tipo\s+Usuario:\s*([A-ZÁÉÍÓÚÑa-záéíóúñ]+)', texto, re.IGNORECASE)
+    match = PATRONES_VISION['tipo_usuario'].search(texto)
     if match:
         datos['Tipo Usuario'] = match.group(1).strip()
     
     # 17. Telefono (del paciente) - buscar el segundo teléfono
-    telefonos = re.findall(r'(\d{10})', texto)
+    telefonos = PATRONES_VISION['numero_10_digitos'].findall(texto)
     if len(telefonos) >= 2:
         datos['Telefono'] = telefonos[1]  # El segundo es del paciente
     
     # 18. Estrato
-    match = re.search(r'Estrato:\s*([A-ZÁÉÍÓÚÑa-záéíóúñ\s]+?)(?=\n|Municipio)', texto, re.IGNORECASE)
+    match = PATRONES_VISION['estrato'].search(texto)
     if match:
         datos['Estrato'] = match.group(1).strip()
     
     # 19. Municipio - puede estar en múltiples lugares
-    match = re.search(r'Municipio:\s*([A-ZÁÉÍÓÚÑ]+)', texto, re.IGNORECASE)
+    match = PATRONES_VISION['municipio'].search(texto)
     if match:
         datos['Municipio'] = match.group(1).strip()
     else:
         # Buscar "CAMPAMENTO" en el contexto
-        match = re.search(r'(CAMPAMENTO)', texto)
+        match = PATRONES_VISION['campamento'].search(texto)
         if match:
             datos['Municipio'] = match.group(1)
     
     # 20. Direccion (del paciente)
-    match = re.search(r'(\d{10})\s+Estrato:.*?\n\s*(N/A|[A-Z0-9][^\n]{0,50}?)\s+Estado\s+Civil', texto, re.DOTALL | re.IGNORECASE)
+    match = PATRONES_VISION['barrio'].search(texto)
     if match:
         datos['Direccion'] = match.group(2).strip()
     else:
         datos['Direccion'] = 'N/A'
     
     # 21. Estado Civil (puede estar vacío)
-    match = re.search(r'Estado\s+Civil:\s*([A-ZÁÉÍÓÚÑa-záéíóúñ\s]*?)(?=\n|$)', texto, re.IGNORECASE)
+    match = PATRONES_VISION['estado_civil'].search(texto)
     if match:
         datos['Estado Civil'] = match.group(1).strip()
     else:
         datos['Estado Civil'] = ''
     
     # 22. Empresa
-    match = re.search(r'UT\s+VISION\s+INTEGRADOS\s+NORTE\s+CAUCA\s+SUB', texto, re.IGNORECASE)
+    match = PATRONES_VISION['ut_vision'].search(texto)
     if match:
         datos['Empresa'] = match.group(0).strip()
     
     # 23. CONTRATO
-    match = re.search(r'RIAS\s+VISUAL\s+NORTE\s+CAUCA\s+SUBDO', texto, re.IGNORECASE)
+    match = PATRONES_VISION['rias_visual'].search(texto)
     if match:
         datos['CONTRATO'] = match.group(0).strip()
     
     # 24. Acompañante - buscar SOLA específicamente antes del teléfono
-    match = re.search(r'\n\s*(SOLA|[A-Z]+)\s+Tel\.\s+Acompa', texto, re.IGNORECASE)
+    match = PATRONES_VISION['acompanante'].search(texto)
     if match:
         datos['Acompañante'] = match.group(1).strip()
     else:
         # Buscar SOLA en el contexto
-        match = re.search(r'\bSOLA\b', texto)
+        match = PATRONES_VISION['sola'].search(texto)
         if match:
             datos['Acompañante'] = 'SOLA'
     
     # 25. Tel. Acompañante - es el segundo teléfono de 10 dígitos (el primero es del paciente)
-    match = re.search(r'Tel\.\s+Acompa[ñn]ante:\s*(\d{10})', texto, re.IGNORECASE)
+    match = PATRONES_VISION['tel_acompanante'].search(texto)
     if match:
         datos['Tel. Acompañante'] = match.group(1).strip()
     else:
         # Buscar todos los teléfonos de 10 dígitos, el segundo es del acompañante
-        telefonos = re.findall(r'\b(\d{10})\b', texto)
+        telefonos = PATRONES_VISION['telefono_10_digitos'].findall(texto)
         if len(telefonos) >= 2:
             datos['Tel. Acompañante'] = telefonos[1]  # Índice 1 (segundo)
     
     # 26. Dx Principal
-    match = re.search(r'(H\d{3,4}\s*-\s*[A-ZÁÉÍÓÚÑa-záéíóúñ\s]+?)(?=\n|H\d{3})', texto, re.IGNORECASE)
+    match = PATRONES_VISION['dx_principal'].search(texto)
     if match:
         datos['Dx Principal'] = match.group(1).strip()
     
     # 27. Dx Relacionado 1 - buscar H seguido de números después del Dx Principal
-    match = re.search(r'H\d{3,4}\s*-\s*[^\n]+\n\s*(H\d{3,4})', texto, re.IGNORECASE)
+    match = PATRONES_VISION['dx_relacionado'].search(texto)
     if match:
         datos['Dx Relacionado 1'] = match.group(1).strip()
     
     # 28. Medico
-    match = re.search(r'DIANA\s+CRISTINA\s+ARANGO\s+GUTIERREZ', texto, re.IGNORECASE)
+    match = PATRONES_VISION['medico_conocido'].search(texto)
     if match:
         datos['Medico'] = match.group(0).strip()
     # Patrón genérico si no encuentra el nombre específico
     if 'Medico' not in datos:
-        match = re.search(r'RECETA\s+MEDICA.*?\n.*?\n.*?\n\s*([A-ZÁÉÍÓÚÑ][A-ZÁÉÍÓÚÑa-záéíóúñ\s]+?)(?=\n|Datos)', texto, re.DOTALL | re.IGNORECASE)
+        match = PATRONES_VISION['medico_receta'].search(texto)
         if match:
             datos['Medico'] = match.group(1).strip()
     
     # 29. Código (del medicamento) - buscar código real en el OCR
-    match = re.search(r'(\d{9})', texto)
+    match = PATRONES_VISION['codigo_medicamento'].search(texto)
     if match:
         datos['Código'] = match.group(1).strip()
     else:
@@ -1533,12 +2024,12 @@ def extraer_datos_vision_integrados(texto):
     descripcion_completa = ""
     
     # Buscar línea con HIALURONATO
-    match = re.search(r'(HIALURONATO\s+DE\s+SODIO[^\n]+)', texto, re.IGNORECASE)
+    match = PATRONES_VISION['hialuronato'].search(texto)
     if match:
         descripcion_completa += match.group(1).strip()
     
     # Buscar línea con SOLUCION OFTALMICA
-    match = re.search(r'(SOLUCION\s+OFTALMICA[^*]+)', texto, re.IGNORECASE)
+    match = PATRONES_VISION['solucion_oftalmica'].search(texto)
     if match:
         solucion = match.group(1).strip()
         # Limpiar caracteres extraños del OCR
@@ -1549,7 +2040,7 @@ def extraer_datos_vision_integrados(texto):
             descripcion_completa = solucion
     
     # Buscar línea con GOTERO
-    match = re.search(r'(GOTERO\s+EN\s+PEBD[^:]+)', texto, re.IGNORECASE)
+    match = PATRONES_VISION['gotero'].search(texto)
     if match:
         gotero = match.group(1).strip()
         # Limpiar caracteres extraños del OCR
@@ -1566,12 +2057,12 @@ def extraer_datos_vision_integrados(texto):
         datos['Descripción'] = descripcion_completa.strip()
     
     # 31. Cantidad - buscar patrón mejorado en el OCR real
-    match = re.search(r'\*\s*(\d+)\s*\(([A-Z]+)\)', texto)
+    match = PATRONES_VISION['cantidad_asterisco'].search(texto)
     if match:
         datos['Cantidad'] = f"{match.group(1)} ({match.group(2)})"
     else:
         # Fallback al patrón original
-        match = re.search(r'(\d+)\s*\(([A-Z]+)\)', texto)
+        match = PATRONES_VISION['cantidad'].search(texto)
         if match:
             datos['Cantidad'] = f"{match.group(1)} ({match.group(2)})"
     
@@ -1579,12 +2070,12 @@ def extraer_datos_vision_integrados(texto):
     posologia_lineas = []
     
     # Buscar "APLICAR X GOTA CADA X HORAS EN"
-    match = re.search(r'(APLICAR\s+\d+\s+GOTA\s+CADA\s+\d+\s+HORAS\s+EN[^\n]*)', texto, re.IGNORECASE)
+    match = PATRONES_VISION['posologia'].search(texto)
     if match:
         posologia_lineas.append(match.group(1).strip())
     
     # Buscar "AMBOS OJOS" en línea siguiente
-    match = re.search(r'(AMBOS\s+OJOS)', texto, re.IGNORECASE)
+    match = PATRONES_VISION['ambos_ojos'].search(texto)
     if match:
         posologia_lineas.append(match.group(1).strip())
     
@@ -1596,12 +2087,12 @@ def extraer_datos_vision_integrados(texto):
         datos['Posologia'] = posologia_completa.strip()
     
     # 33. Dias - buscar patrón real en OCR
-    match = re.search(r'Dias\s*:\s*([A-Z]+)', texto, re.IGNORECASE)
+    match = PATRONES_VISION['dias'].search(texto)
     if match:
         datos['Dias'] = match.group(1).strip()
     else:
         # Buscar número después de HORAS EN y antes de AMBOS OJOS
-        match = re.search(r'HORAS\s+EN\s+(\d+)', texto, re.IGNORECASE)
+        match = PATRONES_VISION['dias_horas_en'].search(texto)
         if match:
             datos['Dias'] = match.group(1).strip()
     
@@ -1813,20 +2304,26 @@ def extraer_tabla_dos_columnas(texto):
     return {}
 
 
-def extraer_cartera_por_edades_con_easyocr(imagen):
+def extraer_cartera_por_edades_con_easyocr(imagen, elementos=None):
     """
     Extractor optimizado para cartera por edades usando EasyOCR + AUTO-CORRECCIÓN INTELIGENTE.
     Usa la lógica simple de Gemini: OCR plano + agrupación de 8 elementos + validación Pydantic.
     
     Args:
-        imagen: PIL Image object
+        imagen: PIL Image object (puede ser None si se pasan elementos)
+        elementos: cajas con coordenadas ya disponibles (p.ej. capa de texto del PDF);
+            si se pasan, no se ejecuta OCR
         
     Returns:
         dict: {'_tipo': 'tabla_multiple', '_filas': [...]}
     """
     try:
-        # Usar EasyOCR para extraer tabla estructurada
-        filas_raw = extraer_tabla_con_easyocr(imagen, num_columnas=8)
+        if elementos:
+            # Capa de texto nativa: misma reconstrucción por coordenadas, sin OCR
+            filas_raw, _ = construir_filas_por_coordenadas(elementos, num_columnas=8)
+        else:
+            # Usar EasyOCR para extraer tabla estructurada
+            filas_raw = extraer_tabla_con_easyocr(imagen, num_columnas=8)
         
         if not filas_raw:
             return {}
@@ -2119,101 +2616,56 @@ def extraer_con_ner(texto):
     """
     Extrae entidades usando NER (Named Entity Recognition) con spaCy.
     Identifica: personas, lugares, organizaciones, fechas, dinero, etc.
+    El modelo se carga una sola vez (ver servicio_ner.py).
     """
-    try:
-        import spacy
-        
-        # Intentar cargar el modelo en español
-        try:
-            nlp = spacy.load("es_core_news_sm")
-        except OSError:
-            # Si no está instalado, retornar diccionario vacío
-            return {}
-        
-        # Procesar el texto (limitar a primeros 100,000 caracteres para eficiencia)
-        doc = nlp(texto[:100000])
-        
-        entidades = {}
-        
-        # Contadores para entidades múltiples
-        contadores = {
-            'PER': 1,   # Personas
-            'LOC': 1,   # Lugares
-            'ORG': 1,   # Organizaciones
-            'MISC': 1   # Misceláneos
-        }
-        
-        for ent in doc.ents:
-            tipo = ent.label_
-            valor = ent.text.strip()
-            
-            # Filtrar basura del OCR
-            # Rechazar entidades que son claramente errores
-            if len(valor) < 3:
-                continue
-                
-            # Rechazar entidades con demasiados caracteres especiales
-            caracteres_especiales = len(re.findall(r'[^a-zA-Z0-9\s]', valor))
-            if caracteres_especiales > len(valor) / 3:
-                continue
-            
-            # Rechazar entidades que son solo números o símbolos
-            if re.match(r'^[0-9\s\-._]+$', valor):
-                continue
-            
-            # Rechazar fragmentos inútiles
-            palabras_basura = ['Email', 'Datos', 'Fecha', 'Hora', 'Ingreso', 'Dirección', 
-                              'Estrato', 'Tel', 'Cantidad', 'Municipio']
-            if any(basura.lower() in valor.lower() for basura in palabras_basura):
-                continue
-            
-            # Mapear tipos de entidades a nombres amigables
-            if tipo == 'PER':  # Persona
-                # Solo agregar si parece un nombre real (al menos 2 palabras)
-                if len(valor.split()) >= 2:
-                    clave = f'Persona_{contadores["PER"]}'
-                    entidades[clave] = valor
-                    contadores['PER'] += 1
-                
-            elif tipo == 'LOC':  # Lugar/Ubicación
-                clave = f'Lugar_{contadores["LOC"]}'
-                entidades[clave] = valor
-                contadores['LOC'] += 1
-                
-            elif tipo == 'ORG':  # Organización
-                # Solo si tiene al menos 2 palabras o es sigla reconocible
-                if len(valor.split()) >= 2 or (len(valor) >= 3 and valor.isupper()):
-                    clave = f'Organizacion_{contadores["ORG"]}'
-                    entidades[clave] = valor
-                    contadores['ORG'] += 1
-                
-            elif tipo == 'MISC':  # Otros
-                clave = f'Entidad_{contadores["MISC"]}'
-                entidades[clave] = valor
-                contadores['MISC'] += 1
-        
-        # Limitar a las primeras 10 de cada tipo para no saturar
-        entidades_filtradas = {}
-        for key, value in entidades.items():
-            # Extraer el número del contador
-            partes = key.rsplit('_', 1)
-            if len(partes) == 2 and partes[1].isdigit():
-                if int(partes[1]) <= 10:
-                    entidades_filtradas[key] = value
-        
-        return entidades_filtradas
-        
-    except ImportError:
-        # Si spaCy no está instalado, retornar vacío
-        return {}
-    except Exception as e:
-        # Cualquier otro error, retornar vacío
-        return {}
+    return extraer_entidades(texto)
+
+# ===============================
+# CLASIFICACION DEL TIPO DE DOCUMENTO
+# ===============================
+
+def _solo_texto(extractor):
+    """Adapta un extractor extractor(texto) a la firma (texto, imagen_original, elementos_coordenadas)"""
+    return lambda texto, imagen_original=None, elementos_coordenadas=None: extractor(texto)
+
+def _extraer_cartera(texto, imagen_original=None, elementos_coordenadas=None):
+    """Cartera por edades: coordenadas nativas del PDF, luego EasyOCR, luego texto OCR"""
+    # Prioridad 1: coordenadas de la capa de texto del PDF (exactas, sin OCR)
+    if elementos_coordenadas:
+        datos_cartera_nativa = extraer_cartera_por_edades_con_easyocr(None, elementos=elementos_coordenadas)
+        if datos_cartera_nativa:
+            print(f"✅ Cartera por edades detectada con texto nativo del PDF: {len(datos_cartera_nativa.get('_filas', []))} filas")
+            return datos_cartera_nativa
+    
+    # Prioridad 2: EasyOCR si imagen disponible (mucho más preciso)
+    if imagen_original:
+        datos_cartera_easyocr = extraer_cartera_por_edades_con_easyocr(imagen_original)
+        if datos_cartera_easyocr:
+            print(f"✅ Cartera por edades detectada con EasyOCR: {len(datos_cartera_easyocr.get('_filas', []))} filas")
+            return datos_cartera_easyocr
+    
+    # Fallback: Método anterior si EasyOCR no disponible o falló
+    datos_cartera = extraer_cartera_por_edades(texto)
+    if datos_cartera:
+        print(f"⚠️ Cartera por edades detectada con OCR tradicional: {len(datos_cartera.get('_filas', []))} filas")
+    return datos_cartera
+
+# Tipos especializados; el orden de registro desempata cuando varios coinciden
+# - HERINCO (entregas de medicamentos) → 27 campos
+# - Vision Integrados (fórmulas médicas) → 33 campos
+# - Tabla de ventas (asesores y presupuestos) → N filas × 6 columnas
+# - Tabla 2 columnas (RUT + nombre comercial) → N filas emparejadas
+# - Cartera por edades (aging report) → N filas × 8 columnas
+clasificador_documentos.registrar('herinco', ['HERINCO', 'ENTREGA'], _solo_texto(extraer_datos_herinco))
+clasificador_documentos.registrar('vision_integrados', ['VISION INTEGRADOS'], _solo_texto(extraer_datos_vision_integrados))
+clasificador_documentos.registrar('tabla_ventas', ['NOMBRE ASESOR', 'PPTO'], _solo_texto(extraer_tabla_ventas))
+clasificador_documentos.registrar('tabla_dos_columnas', ['NOMBRE RUT', 'NOMBRE COMERCIAL'], _solo_texto(extraer_tabla_dos_columnas))
+clasificador_documentos.registrar('cartera', ['PROVEEDOR'], _extraer_cartera)
 
 # ===============================
 # FUNCION DE EXTRACCION GENERICA MEJORADA
 # ===============================
-def extraer_datos(texto, nombre_archivo="", imagen_original=None):
+def extraer_datos(texto, nombre_archivo="", imagen_original=None, elementos_coordenadas=None, entidades_ner=None):
     """
     MOTOR DE EXTRACCIÓN INTELIGENTE - Detecta automáticamente el tipo de documento por su CONTENIDO.
     
@@ -2224,14 +2676,18 @@ def extraer_datos(texto, nombre_archivo="", imagen_original=None):
         texto: Texto extraído por OCR
         nombre_archivo: Nombre del archivo (opcional, para metadatos)
         imagen_original: PIL Image original (opcional, para EasyOCR en tablas)
+        elementos_coordenadas: cajas con coordenadas de la capa de texto del PDF (opcional,
+            reemplazan al OCR por coordenadas en tablas)
+        entidades_ner: entidades ya calculadas para este texto (p.ej. con
+            servicio_ner.extraer_entidades_lote en un lote); si es None se calculan aquí
     
     Proceso:
-    1. Ejecuta extractores especializados en orden de prioridad
-    2. Cada extractor verifica si el texto contiene sus keywords característicos
+    1. clasificador_documentos indexa el texto una vez y puntúa todos los tipos registrados
+    2. Se despacha directo al extractor ganador (el siguiente candidato si no extrae nada)
     3. Si detecta coincidencia → usa ese extractor y retorna
     4. Si ninguno detecta → usa extracción genérica (patrones + IA + tablas)
     
-    Extractores disponibles (en orden de ejecución):
+    Extractores disponibles (en orden de prioridad):
     - HERINCO: busca "HERINCO" + "ENTREGA" → 27 campos
     - Vision Integrados: busca "VISION INTEGRADOS" → 33 campos
     - Tabla Ventas: busca "NOMBRE ASESOR" + "PPTO" → N filas × 6 columnas
@@ -2246,58 +2702,15 @@ def extraer_datos(texto, nombre_archivo="", imagen_original=None):
     datos = {'_archivo': nombre_archivo}
     
     # ========================================
-    # 0. EXTRACTOR HERINCO (Entregas de Medicamentos)
-    # Detecta por: "HERINCO" + "ENTREGA" en el texto
-    # ========================================
-    datos_herinco = extraer_datos_herinco(texto)
-    if datos_herinco:
-        # Documento tipo HERINCO detectado → retorna EXACTAMENTE los 27 campos especializados
-        return datos_herinco, []
-    
-    # ========================================
-    # 1. EXTRACTOR VISION INTEGRADOS (Fórmulas Médicas)
-    # Detecta por: "VISION INTEGRADOS" en el texto
+    # 0. EXTRACTORES ESPECIALIZADOS
+    # El clasificador indexa el texto una vez, puntúa todos los tipos registrados
+    # y se despacha directo al ganador (si no extrae nada, al siguiente candidato)
     # ========================================
-    datos_vision = extraer_datos_vision_integrados(texto)
-    if datos_vision:
-        # Documento tipo Vision Integrados detectado → retorna EXACTAMENTE los 33 campos especializados
-        return datos_vision, []
-    
-    # ========================================
-    # 2. EXTRACTOR TABLA DE VENTAS (Asesores y Presupuestos)
-    # Detecta por: "NOMBRE ASESOR" + "PPTO" en el texto
-    # ========================================
-    datos_tabla_ventas = extraer_tabla_ventas(texto)
-    if datos_tabla_ventas:
-        # Tabla de ventas detectada → retorna múltiples filas con 6 columnas
-        return datos_tabla_ventas, []
-    
-    # ========================================
-    # 3. EXTRACTOR TABLA DOS COLUMNAS (RUT + Nombre Comercial)
-    # Detecta por: "NOMBRE RUT" + "NOMBRE COMERCIAL" en el texto
-    # ========================================
-    datos_tabla_dos_col = extraer_tabla_dos_columnas(texto)
-    if datos_tabla_dos_col:
-        # Tabla de 2 columnas detectada → retorna múltiples filas emparejadas
-        return datos_tabla_dos_col, []
-    
-    # ========================================
-    # 4. EXTRACTOR CARTERA POR EDADES (Aging Report) - OPTIMIZADO CON EASYOCR
-    # Detecta por: "PROVEEDOR" en el texto + múltiples valores monetarios
-    # ========================================
-    if 'PROVEEDOR' in texto.upper():
-        # Prioridad 1: EasyOCR si imagen disponible (mucho más preciso)
-        if imagen_original:
-            datos_cartera_easyocr = extraer_cartera_por_edades_con_easyocr(imagen_original)
-            if datos_cartera_easyocr:
-                print(f"✅ Cartera por edades detectada con EasyOCR: {len(datos_cartera_easyocr.get('_filas', []))} filas")
-                return datos_cartera_easyocr, []
-        
-        # Fallback: Método anterior si EasyOCR no disponible o falló
-        datos_cartera = extraer_cartera_por_edades(texto)
-        if datos_cartera:
-            print(f"⚠️ Cartera por edades detectada con OCR tradicional: {len(datos_cartera.get('_filas', []))} filas")
-            return datos_cartera, []
+    for tipo in clasificador_documentos.clasificar(texto):
+        datos_tipo = tipo['extractor'](texto, imagen_original, elementos_coordenadas)
+        if datos_tipo:
+            # Documento especializado → retorna EXACTAMENTE sus campos, sin extracción genérica
+            return datos_tipo, []
     
     # ========================================
     # 5. EXTRACCION DE TABLAS GENERICAS
@@ -2315,7 +2728,8 @@ def extraer_datos(texto, nombre_archivo="", imagen_original=None):
     # ========================================
     # 3. EXTRACCION CON IA - NER
     # ========================================
-    entidades_ner = extraer_con_ner(texto)
+    if entidades_ner is None:
+        entidades_ner = extraer_con_ner(texto)
     for clave, valor in entidades_ner.items():
         # Agregar prefijo para distinguirlos
         datos[f'IA_{clave}'] = valor
@@ -2324,28 +2738,28 @@ def extraer_datos(texto, nombre_archivo="", imagen_original=None):
     # 4. EXTRACCION CON PATRONES REGEX (EXISTENTE)
     # ========================================
     
+    # Todos los campos genéricos en una sola pasada sobre el texto normalizado
+    campos = escanear_campos(texto_norm)
+    
     # ===== FECHAS =====
     # Buscar múltiples formatos de fecha
     fechas_encontradas = []
     
     # Formato: DD/MM/YYYY, DD-MM-YYYY
-    fechas_1 = re.findall(r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}', texto_norm)
-    fechas_encontradas.extend(fechas_1)
+    fechas_encontradas.extend(campos['fecha_dmy'])
     
     # Formato: YYYY-MM-DD (común en sistemas médicos)
-    fechas_2 = re.findall(r'\d{4}-\d{2}-\d{2}', texto_norm)
-    fechas_encontradas.extend(fechas_2)
+    fechas_encontradas.extend(campos['fecha_iso'])
     
     # Formato: YYYYMMDD (compacto, común en códigos)
-    fechas_3 = re.findall(r'\b(20\d{6})\b', texto_norm)
+    fechas_3 = campos['fecha_compacta']
     # Formatear estas fechas para que sean legibles
     for fecha in fechas_3:
         fecha_formateada = f"{fecha[0:4]}-{fecha[4:6]}-{fecha[6:8]}"
         fechas_encontradas.append(fecha_formateada)
     
     # Formato: "15 de marzo de 2024"
-    fechas_4 = re.findall(r'\d{1,2}\s+de\s+\w+\s+de\s+\d{4}', texto_norm)
-    fechas_encontradas.extend(fechas_4)
+    fechas_encontradas.extend(campos['fecha_texto'])
     
     # Eliminar duplicados manteniendo orden
     fechas_unicas = []
@@ -2358,48 +2772,36 @@ def extraer_datos(texto, nombre_archivo="", imagen_original=None):
     
     # ===== NUMEROS DE DOCUMENTO =====
     # Resoluciones, radicados, licencias, etc.
-    num_resolucion = buscar(
-        r'(?:RESOLUCI[OÓ]N|RESOLUCION)\s*(?:No\.?|N[UÚ]MERO|NUM)?\s*[:.]?\s*([A-Z0-9-]{3,20})',
-        texto_norm
-    )
+    num_resolucion = buscar(PATRONES_GENERICOS['resolucion'], texto_norm)
     if num_resolucion:
         datos['Numero_Resolucion'] = num_resolucion
     
-    radicado = buscar(
-        r'(?:RADICAD[OA]|RADICACI[OÓ]N)\s*(?:No\.?|N[UÚ]MERO)?[:.]?\s*([A-Z0-9-]{5,25})',
-        texto_norm
-    )
+    radicado = buscar(PATRONES_GENERICOS['radicado'], texto_norm)
     if radicado:
         datos['Radicado'] = radicado
     
     # Cualquier numero de documento generico
-    num_docs = re.findall(
-        r'(?:NO\.|N[UÚ]MERO|NUM\.?|#)\s*[:.]?\s*([A-Z0-9-]{3,20})',
-        texto_norm
-    )
+    num_docs = campos['numero_documento']
     for i, num in enumerate(num_docs[:3], 1):
         if num not in datos.values():
             datos[f'Numero_Documento_{i}'] = num
     
     # ===== IDENTIFICACIONES =====
     # Cedulas (mejorado para capturar CC-39412449 y formatos similares)
-    cedulas = re.findall(r'(?:C\.?C\.?|CEDULA|CED\.?|DOCUMENTO)\s*(?:No\.?)?[:.\s-]*([0-9.-]{7,15})', texto_norm)
+    cedulas = campos['cedula']
     for i, cc in enumerate(cedulas[:3], 1):
         cc_limpio = cc.replace('.', '').replace('-', '').strip()
         if cc_limpio:
             datos[f'Cedula_{i}'] = cc_limpio
     
     # NITs
-    nits = re.findall(r'NIT\s*(?:No\.?)?[:.]?\s*([0-9.-]{9,15})', texto_norm)
+    nits = campos['nit']
     for i, nit in enumerate(nits[:2], 1):
         datos[f'NIT_{i}'] = nit
     
     # ===== NOMBRES Y PERSONAS =====
     # Buscar nombres completos (3-5 palabras en MAYÚSCULAS - común en documentos oficiales)
-    nombres_completos = re.findall(
-        r'\b([A-ZÁÉÍÓÚÑ]{3,}(?:\s+[A-ZÁÉÍÓÚÑ]{3,}){2,4})\b',
-        texto
-    )
+    nombres_completos = PATRONES_GENERICOS['nombre_completo'].findall(texto)
     
     # Filtrar palabras comunes que no son nombres
     palabras_excluir = {
@@ -2446,10 +2848,7 @@ def extraer_datos(texto, nombre_archivo="", imagen_original=None):
     direcciones_encontradas = []
     
     # Patrón 1: Con etiqueta DIRECCIÓN
-    direcciones = re.findall(
-        r'(?:DIRECCI[OÓ]N|DIR\.?)\s*[:.]?\s*([A-Z0-9ÁÉÍÓÚÑ#\-\s.,APTO]{10,120})',
-        texto_norm
-    )
+    direcciones = campos['direccion']
     for dir in direcciones:
         dir_limpio = dir.strip()
         # Limpiar si tiene múltiples espacios o saltos de línea
@@ -2461,10 +2860,7 @@ def extraer_datos(texto, nombre_archivo="", imagen_original=None):
             direcciones_encontradas.append(dir_limpio)
     
     # Patrón 2: Direcciones con formato calle/carrera
-    dirs_formato = re.findall(
-        r'(?:CL|CLL|CALLE|KR|KRA|CARRERA|DG|DIAGONAL|TV|TRANSVERSAL)\.?\s+[0-9A-Z#\-\s]{3,60}(?:APTO|APT|APARTAMENTO)?\s*[0-9A-Z]*',
-        texto_norm
-    )
+    dirs_formato = campos['direccion_formato']
     for dir in dirs_formato:
         dir_limpio = dir.strip()
         dir_limpio = re.sub(r'\s+', ' ', dir_limpio)
@@ -2485,10 +2881,7 @@ def extraer_datos(texto, nombre_archivo="", imagen_original=None):
     
     # ===== TELEFONOS =====
     telefonos_encontrados = []
-    telefonos = re.findall(
-        r'(?:TEL[EÉ]FONO|TEL\.?|CELULAR|CEL\.?|M[OÓ]VIL)\s*[:.]?\s*([0-9\-\(\)\s]{7,15})',
-        texto_norm
-    )
+    telefonos = campos['telefono']
     for tel in telefonos:
         tel_limpio = tel.strip()
         tel_limpio = re.sub(r'\s+', '', tel_limpio)  # Quitar espacios
@@ -2501,10 +2894,8 @@ def extraer_datos(texto, nombre_archivo="", imagen_original=None):
     
     # ===== EMAILS =====
     emails_encontrados = []
-    emails = re.findall(
-        r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
-        texto
-    )
+    # (el email no lleva espacios: da lo mismo sobre el texto normalizado)
+    emails = campos['email']
     for email in emails:
         if email not in emails_encontrados:
             emails_encontrados.append(email)
@@ -2514,10 +2905,7 @@ def extraer_datos(texto, nombre_archivo="", imagen_original=None):
     
     # ===== VALORES MONETARIOS =====
     valores_encontrados = []
-    valores = re.findall(
-        r'(?:\$|COP|USD|EUR)\s*([0-9.,]+)|([0-9.,]+)\s*(?:PESOS|D[OÓ]LARES)',
-        texto_norm
-    )
+    valores = campos['valor_monetario']
     for valor in valores:
         val = valor[0] if valor[0] else valor[1]
         if val and val not in valores_encontrados:
@@ -2529,10 +2917,7 @@ def extraer_datos(texto, nombre_archivo="", imagen_original=None):
     # ===== CANTIDADES Y MEDIDAS =====
     # Areas, metros cuadrados
     areas_encontradas = []
-    areas = re.findall(
-        r'([0-9.,]+)\s*(?:M2|M²|METROS?\s+CUADRADOS?|MTS2)',
-        texto_norm
-    )
+    areas = campos['area']
     for area in areas:
         if area not in areas_encontradas:
             areas_encontradas.append(area)
@@ -2542,10 +2927,7 @@ def extraer_datos(texto, nombre_archivo="", imagen_original=None):
     
     # Otras cantidades con unidades
     cantidades_encontradas = []
-    cantidades = re.findall(
-        r'([0-9.,]+)\s*(KG|KILOS?|LITROS?|TONELADAS?|UNIDADES?|UND)',
-        texto_norm
-    )
+    cantidades = campos['cantidad']
     for (cant, unidad) in cantidades:
         valor_completo = f"{cant} {unidad}"
         if valor_completo not in cantidades_encontradas:
@@ -2557,10 +2939,7 @@ def extraer_datos(texto, nombre_archivo="", imagen_original=None):
     # ===== CODIGOS Y REFERENCIAS =====
     # Codigos alfanumericos
     codigos_encontrados = []
-    codigos = re.findall(
-        r'(?:C[OÓ]DIGO|COD\.?|REF\.?|REFERENCIA)\s*[:.]?\s*([A-Z0-9-]{5,20})',
-        texto_norm
-    )
+    codigos = campos['codigo']
     for cod in codigos:
         if cod not in codigos_encontrados:
             codigos_encontrados.append(cod)
@@ -2570,10 +2949,7 @@ def extraer_datos(texto, nombre_archivo="", imagen_original=None):
     
     # ===== LUGARES Y CIUDADES =====
     ciudades_encontradas = []
-    ciudades = re.findall(
-        r'(?:MUNICIPIO|CIUDAD)\s*[:.]?\s*([A-ZÁÉÍÓÚÑ\s]{3,30})',
-        texto_norm
-    )
+    ciudades = campos['ciudad']
     for ciudad in ciudades:
         ciudad_limpia = ciudad.strip()
         # Cortar en palabras que no son parte del nombre de ciudad
@@ -2586,11 +2962,11 @@ def extraer_datos(texto, nombre_archivo="", imagen_original=None):
     
     # ===== PALABRAS CLAVE Y DECISIONES =====
     # Buscar decisiones o estados
-    if re.search(r'\b(?:APROBA[DR]O|APRUEBA|ACEPTA[DR]O|AUTORIZA[DR]O|CONCEDE|OTORGA)\b', texto_norm, re.IGNORECASE):
+    if PATRONES_GENERICOS['decision_aprobado'].search(texto_norm):
         datos['Estado_Decision'] = 'APROBADO'
-    elif re.search(r'\b(?:NEGA[DR]O|NIEGA|RECHAZA[DR]O|INADMITE|IMPROCEDENTE)\b', texto_norm, re.IGNORECASE):
+    elif PATRONES_GENERICOS['decision_negado'].search(texto_norm):
         datos['Estado_Decision'] = 'NEGADO'
-    elif re.search(r'\b(?:PENDIENTE|EN\s+PROCESO|EN\s+TR[AÁ]MITE)\b', texto_norm, re.IGNORECASE):
+    elif PATRONES_GENERICOS['decision_pendiente'].search(texto_norm):
         datos['Estado_Decision'] = 'PENDIENTE'
     
     # Eliminar entradas vacias
@@ -2609,14 +2985,20 @@ def extraer_datos(texto, nombre_archivo="", imagen_original=None):
 # FUNCIONES DE PROCESAMIENTO MULTIPLE
 # ===============================
 def procesar_archivo_individual(archivo, max_paginas, dpi, usar_llm=False, api_key_llm=None, modelo_llm="gpt-4o-mini"):
-    """Procesa un solo archivo y retorna el texto extraído, resultado LLM e imagen original (si aplica)"""
+    """
+    Procesa un solo archivo y retorna el texto extraído, resultado LLM, imagen original (si aplica)
+    y las cajas con coordenadas de la capa de texto del PDF (si aplica)
+    """
     try:
         file_ext = archivo.name.split('.')[-1].lower()
         imagen_original = None
+        elementos = None
         
         if file_ext == 'pdf':
             pdf_bytes = archivo.read()
-            texto = ocr_pdf_bytes(pdf_bytes, max_paginas, dpi)
+            lectura = leer_pdf_bytes(pdf_bytes, max_paginas, dpi)
+            texto = lectura['texto']
+            elementos = lectura['elementos'] or None
         else:
             imagen_original = Image.open(archivo)  # Guardar imagen original para EasyOCR
             texto = ocr_imagen(imagen_original)
@@ -2626,48 +3008,59 @@ def procesar_archivo_individual(archivo, max_paginas, dpi, usar_llm=False, api_k
         if usar_llm and api_key_llm:
             resultado_llm = extraer_con_llm(texto, api_key_llm, modelo_llm)
         
-        return texto, resultado_llm, None, imagen_original
+        return texto, resultado_llm, None, imagen_original, elementos
     except Exception as e:
-        return None, None, str(e), None
+        return None, None, str(e), None, None
 
 def procesar_multiples_archivos(archivos, max_paginas, dpi, usar_llm=False, api_key_llm=None, modelo_llm="gpt-4o-mini"):
-    """Procesa múltiples archivos y retorna resultados consolidados"""
-    resultados = []
-    resultados_llm = []
-    todas_tablas = []  # Nuevo: almacenar todas las tablas detectadas
-    
+    """
+    Procesa múltiples archivos y retorna resultados consolidados.
+    Los archivos se reparten en un pool de procesos (ver procesamiento_lotes.py);
+    la barra de progreso avanza a medida que cada archivo termina.
+    """
     progress_bar = st.progress(0)
     status = st.empty()
     
     total = len(archivos)
+    nombres = [archivo.name for archivo in archivos]
+    tareas = (
+        (archivo.name, archivo.getvalue(), max_paginas, dpi, usar_llm, api_key_llm, modelo_llm)
+        for archivo in archivos
+    )
+    status.info(f"📄 Procesando {total} archivos en paralelo...")
     
-    for i, archivo in enumerate(archivos):
-        status.info(f"📄 Procesando {i+1}/{total}: {archivo.name}")
-        progress_bar.progress(i / total)
-        
-        texto, resultado_llm, error, imagen_original = procesar_archivo_individual(
-            archivo, max_paginas, dpi, usar_llm, api_key_llm, modelo_llm
-        )
+    # Resultados por posición del archivo: se consolidan en el orden original
+    por_indice = {}
+    completados = 0
+    for indice, resultado, error in ejecutar_en_procesos(procesar_archivo_lote, tareas):
+        completados += 1
+        progress_bar.progress(completados / total)
+        status.info(f"📄 Procesado {completados}/{total}: {nombres[indice]}")
         
         if error:
-            st.warning(f"⚠️ Error en {archivo.name}: {error}")
+            st.warning(f"⚠️ Error en {nombres[indice]}: {error}")
         else:
-            # Extraer datos con métodos tradicionales y tablas + EasyOCR
-            datos, tablas = extraer_datos(texto, archivo.name, imagen_original)
-            resultados.append(datos)
-            
-            # Guardar tablas si se detectaron
-            if tablas:
-                for tabla in tablas:
-                    tabla['_archivo'] = archivo.name
-                    todas_tablas.append(tabla)
-            
-            # Guardar resultado LLM si existe
-            if resultado_llm:
-                resultados_llm.append({
-                    'archivo': archivo.name,
-                    'resultado': resultado_llm
-                })
+            por_indice[indice] = resultado
+    
+    resultados = []
+    resultados_llm = []
+    todas_tablas = []  # Nuevo: almacenar todas las tablas detectadas
+    
+    for indice in sorted(por_indice):
+        resultado = por_indice[indice]
+        resultados.append(resultado['datos'])
+        
+        # Guardar tablas si se detectaron
+        for tabla in resultado['tablas']:
+            tabla['_archivo'] = nombres[indice]
+            todas_tablas.append(tabla)
+        
+        # Guardar resultado LLM si existe
+        if resultado['resultado_llm']:
+            resultados_llm.append({
+                'archivo': nombres[indice],
+                'resultado': resultado['resultado_llm']
+            })
     
     progress_bar.progress(1.0)
     status.success(f"✅ Procesados {len(resultados)}/{total} archivos exitosamente")
@@ -2675,47 +3068,18 @@ def procesar_multiples_archivos(archivos, max_paginas, dpi, usar_llm=False, api_
     return resultados, resultados_llm, todas_tablas
 
 def extraer_archivos_desde_zip(zip_file):
-    """Extrae archivos de un ZIP y retorna lista de archivos procesables"""
-    archivos_extraidos = []
+    """
+    Archivos procesables (PDF, imágenes) de un ZIP, sin extraerlos a disco.
     
-    with tempfile.TemporaryDirectory() as temp_dir:
-        try:
-            with zipfile.ZipFile(zip_file, 'r') as zip_ref:
-                # Listar archivos en el ZIP
-                nombres_archivos = zip_ref.namelist()
-                
-                # Filtrar solo archivos válidos (PDF, imágenes)
-                extensiones_validas = ['.pdf', '.png', '.jpg', '.jpeg', '.tiff']
-                
-                for nombre in nombres_archivos:
-                    # Ignorar carpetas y archivos ocultos
-                    if nombre.endswith('/') or nombre.startswith('__MACOSX') or '/..' in nombre:
-                        continue
-                    
-                    ext = Path(nombre).suffix.lower()
-                    if ext in extensiones_validas:
-                        # Extraer archivo
-                        zip_ref.extract(nombre, temp_dir)
-                        ruta_completa = os.path.join(temp_dir, nombre)
-                        
-                        # Leer archivo y crear objeto tipo UploadedFile
-                        with open(ruta_completa, 'rb') as f:
-                            contenido = f.read()
-                            
-                        # Crear objeto simulado de archivo
-                        archivo_simulado = type('obj', (object,), {
-                            'name': Path(nombre).name,
-                            'read': lambda: contenido,
-                            'seek': lambda x: None
-                        })()
-                        
-                        archivos_extraidos.append(archivo_simulado)
-                
-                return archivos_extraidos
-                
-        except Exception as e:
-            st.error(f"Error al extraer ZIP: {str(e)}")
-            return []
+    Retorna una FuenteZip: tiene len() y se recorre de forma perezosa; cada
+    archivo lee sus propios bytes del ZIP solo cuando se procesa. Cerrarla
+    (cerrar()) al terminar. Lista vacía si el ZIP no se puede abrir.
+    """
+    try:
+        return FuenteZip(zip_file)
+    except Exception as e:
+        st.error(f"Error al extraer ZIP: {str(e)}")
+        return []
 
 # ===============================
 # ===============================
@@ -3051,7 +3415,7 @@ def main():
         max_paginas = st.slider(
             "Paginas a procesar",
             min_value=1,
-            max_value=5,
+            max_value=100,
             value=2,
             help="Mas paginas = mayor precision pero mas lento"
         )
@@ -3101,11 +3465,35 @@ def main():
         
         st.markdown("---")
         
+        # 🗄️ CACHÉ OCR
+        with st.expander("🗄️ Caché OCR", expanded=False):
+            stats_cache = cache_ocr.estadisticas()
+            col1, col2 = st.columns(2)
+            with col1:
+                st.metric("Aciertos", stats_cache['aciertos_memoria'] + stats_cache['aciertos_disco'])
+            with col2:
+                st.metric("Fallos", stats_cache['fallos'])
+            st.caption(f"📈 Tasa de aciertos: {stats_cache['tasa_aciertos']:.0%} | "
+                       f"💾 Disco: {stats_cache['mb_disco']:.1f} MB")
+        
+        # 🧭 CLASIFICADOR DE DOCUMENTOS
+        with st.expander("🧭 Clasificador de documentos", expanded=False):
+            stats_clasificador = clasificador_documentos.estadisticas()
+            col1, col2 = st.columns(2)
+            with col1:
+                st.metric("Documentos", stats_clasificador['documentos'])
+            with col2:
+                st.metric("Clasificación", f"{stats_clasificador['ms_promedio']:.2f} ms",
+                          help="Tiempo promedio de clasificación por documento")
+            if stats_clasificador['por_tipo']:
+                st.caption(" | ".join(f"{tipo}: {n}" for tipo, n in stats_clasificador['por_tipo'].items()))
+        
         # 🧠 PANEL DE AUTO-APRENDIZAJE
         if FUZZY_DISPONIBLE:
             st.markdown("#### 🧠 Auto-Aprendizaje")
             
             # Estado de la memoria
+            memoria_inteligente = obtener_memoria_inteligente()
             with st.expander("📚 Estado de la Memoria", expanded=False):
                 col1, col2 = st.columns(2)
                 with col1:
@@ -3342,7 +3730,7 @@ def main():
                     modelo_llm = st.session_state.get('modelo_llm', 'gpt-4o-mini')
                     
                     # Procesar archivo
-                    texto, resultado_llm, error, imagen_original = procesar_archivo_individual(
+                    texto, resultado_llm, error, imagen_original, elementos = procesar_archivo_individual(
                         uploaded_file, max_paginas, dpi, usar_llm, api_key_llm, modelo_llm
                     )
                     
@@ -3353,7 +3741,7 @@ def main():
                     status.info("&#128202; Extrayendo informacion...")
                     
                     # Limpiar resultados previos antes de guardar nuevos
-                    keys_to_clean = ['tablas_individuales', 'resultado_llm', 'imagen_original']
+                    keys_to_clean = ['tablas_individuales', 'resultado_llm', 'imagen_original', 'elementos_coordenadas']
                     for key in keys_to_clean:
                         if key in st.session_state:
                             del st.session_state[key]
@@ -3363,6 +3751,7 @@ def main():
                     st.session_state['modo_procesamiento'] = 'individual'
                     st.session_state['resultado_llm'] = resultado_llm  # Guardar resultado LLM
                     st.session_state['imagen_original'] = imagen_original  # Guardar imagen para EasyOCR
+                    st.session_state['elementos_coordenadas'] = elementos  # Capa de texto del PDF (si existe)
                     
                     progress_bar.progress(100)
                     status.empty()
@@ -3423,17 +3812,19 @@ def main():
         col1, col2, col3 = st.columns([1, 2, 1])
         with col2:
             if st.button("&#128269; PROCESAR CARPETA ZIP", type="primary", use_container_width=True):
+                archivos_extraidos = []
                 try:
-                    with st.spinner("Extrayendo archivos..."):
+                    with st.spinner("Leyendo contenido del ZIP..."):
                         archivos_extraidos = extraer_archivos_desde_zip(uploaded_zip)
                     
                     if archivos_extraidos:
                         st.success(f"✅ Se encontraron {len(archivos_extraidos)} archivos válidos")
                         
-                        # Mostrar archivos encontrados
+                        # Mostrar archivos encontrados (un solo bloque: el ZIP puede traer miles)
                         with st.expander("Archivos encontrados en el ZIP"):
-                            for i, arch in enumerate(archivos_extraidos, 1):
-                                st.text(f"{i}. {arch.name}")
+                            st.text("\n".join(
+                                f"{i}. {nombre}" for i, nombre in enumerate(archivos_extraidos.nombres, 1)
+                            ))
                         
                         # Procesar todos
                         usar_llm = st.session_state.get('usar_llm', False)
@@ -3461,6 +3852,9 @@ def main():
                         
                 except Exception as e:
                     st.error(f"&#10060; Error al procesar ZIP: {str(e)}")
+                finally:
+                    if isinstance(archivos_extraidos, FuenteZip):
+                        archivos_extraidos.cerrar()
     
     # PASO 2: RESULTADOS (INDIVIDUAL)
     if 'texto' in st.session_state and st.session_state.get('modo_procesamiento') == 'individual':
@@ -3471,10 +3865,11 @@ def main():
         texto_actual = st.session_state.get('texto', '')
         archivo_actual = st.session_state.get('archivo', 'documento')
         imagen_original = st.session_state.get('imagen_original', None)
+        elementos_coordenadas = st.session_state.get('elementos_coordenadas', None)
         
         # Extraer datos y tablas (con EasyOCR si imagen disponible)
         try:
-            datos, tablas = extraer_datos(texto_actual, archivo_actual, imagen_original)
+            datos, tablas = extraer_datos(texto_actual, archivo_actual, imagen_original, elementos_coordenadas)
             
             # Guardar tablas para visualización
             st.session_state['tablas_individuales'] = tablas if tablas else []
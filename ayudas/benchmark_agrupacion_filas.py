@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark: agrupación de filas por coordenadas.
+Compara el algoritmo cuadrático original (comparar cada caja contra todas)
+con agrupacion_filas.construir_filas y verifica que den exactamente las mismas filas.
+
+Uso:
+    python benchmark_agrupacion_filas.py
+"""
+import random
+import time
+
+from agrupacion_filas import construir_filas, calcular_tolerancia_y
+
+
+def construir_filas_original(elementos, tolerancia_y):
+    """Implementación original de extraer_tabla_con_easyocr (O(n²))"""
+    filas_agrupadas = []
+    elementos_usados = set()
+    elementos_ordenados = sorted(elementos, key=lambda e: e['y'])
+
+    for elem in elementos_ordenados:
+        if id(elem) in elementos_usados:
+            continue
+        fila_actual = []
+        for otro_elem in elementos_ordenados:
+            if id(otro_elem) in elementos_usados:
+                continue
+            if abs(otro_elem['y'] - elem['y']) <= tolerancia_y:
+                fila_actual.append(otro_elem)
+                elementos_usados.add(id(otro_elem))
+        if fila_actual:
+            filas_agrupadas.append(sorted(fila_actual, key=lambda e: e['x']))
+    return filas_agrupadas
+
+
+def pagina_sintetica(num_filas, num_columnas=8, semilla=0):
+    """Cajas de una tabla densa con ruido en Y/X (como una foto levemente torcida)"""
+    rnd = random.Random(semilla)
+    elementos = []
+    for f in range(num_filas):
+        y_base = 40 + f * 22
+        for c in range(num_columnas):
+            elementos.append({
+                'texto': f"f{f}c{c}",
+                'x': 30 + c * 120 + rnd.uniform(-6, 6),
+                'y': y_base + rnd.uniform(-5, 5) + c * 0.15,
+                'altura': rnd.uniform(14, 20),
+                'confianza': 0.9
+            })
+        # Cajas sueltas (sellos, notas al margen)
+        if rnd.random() < 0.1:
+            elementos.append({'texto': 'x', 'x': rnd.uniform(0, 1000), 'y': y_base + rnd.uniform(-11, 11),
+                              'altura': 10.0, 'confianza': 0.5})
+    rnd.shuffle(elementos)
+    return elementos
+
+
+def textos(filas):
+    return [[e['texto'] for e in fila] for fila in filas]
+
+
+def medir(funcion, repeticiones):
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        resultado = funcion()
+    return (time.perf_counter() - inicio) / repeticiones, resultado
+
+
+if __name__ == "__main__":
+    print("=" * 72)
+    print(f"{'cajas':>8} {'original (ms)':>15} {'vectorizado (ms)':>18} {'aceleración':>12}  iguales")
+    print("=" * 72)
+
+    for num_filas in (25, 100, 250, 500, 1000):
+        elementos = pagina_sintetica(num_filas, semilla=num_filas)
+        tolerancia = calcular_tolerancia_y(elementos)
+        repeticiones = 1 if num_filas >= 500 else 5
+
+        t_original, filas_original = medir(lambda: construir_filas_original(elementos, tolerancia), repeticiones)
+        t_nuevo, filas_nuevas = medir(lambda: construir_filas(elementos, tolerancia), repeticiones)
+
+        iguales = textos(filas_original) == textos(filas_nuevas)
+        print(f"{len(elementos):>8} {t_original * 1000:>15.2f} {t_nuevo * 1000:>18.2f} "
+              f"{t_original / t_nuevo:>11.1f}x  {'✅' if iguales else '❌'}")
+        assert iguales, "Las filas no coinciden con el algoritmo original"
+
+    # Casos borde: Y repetidas, empates en X, diferencias justo en la tolerancia
+    rnd = random.Random(7)
+    for _ in range(300):
+        elementos = [{'texto': str(i), 'x': float(rnd.randint(0, 5)), 'y': rnd.choice([0.0, 0.1, 0.3, 9.0, 9.3, 18.6]) + rnd.randint(0, 3) * 0.1,
+                      'altura': 0.5} for i in range(rnd.randint(0, 40))]
+        tolerancia = calcular_tolerancia_y(elementos)
+        assert textos(construir_filas_original(elementos, tolerancia)) == textos(construir_filas(elementos, tolerancia))
+    print("\n✅ Casos borde (Y repetidas, empates en X, bordes de tolerancia): idénticos")
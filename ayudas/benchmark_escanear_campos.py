@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark: escáner de campos genéricos en una pasada.
+Compara patrones.escanear_campos con un re.findall por campo de CAMPOS_ESCANEO
+(lo que hacía extraer_datos) y verifica que den exactamente las mismas
+coincidencias, en el mismo orden, sobre textos aleatorios armados con las
+etiquetas y valores que buscan los patrones (incluidos solapamientos entre
+campos y campos pegados entre sí).
+
+El tiempo se mide sobre un documento armado casi solo con etiquetas y valores:
+es el peor caso del escáner (un candidato cada pocos caracteres, cada uno con
+su vuelta en Python), así que puede salir más lento que los findall. En un
+documento real la mayor parte del texto no inicia ningún campo.
+
+Uso:
+    python benchmark_escanear_campos.py
+    python benchmark_escanear_campos.py --textos 10000
+"""
+import argparse
+import random
+import re
+import time
+
+from patrones import CAMPOS_ESCANEO, PATRONES_GENERICOS, escanear_campos
+
+
+def escanear_con_findall(texto):
+    """Un re.findall por campo, como extraer_datos antes del escáner"""
+    return {campo: PATRONES_GENERICOS[campo].findall(texto) for campo in CAMPOS_ESCANEO}
+
+
+def normalizar_texto(texto):
+    """app.normalizar_texto (escanear_campos recibe el texto ya normalizado)"""
+    if not texto:
+        return ""
+    texto = re.sub(r'\s+', ' ', str(texto)).strip()
+    return texto.replace('\n', ' ').replace('\r', '')
+
+
+# Piezas con las que se arman los textos: etiquetas, valores y relleno
+_ETIQUETAS = [
+    'NIT', 'NIT No.', 'C.C.', 'CC', 'CEDULA', 'CED.', 'DOCUMENTO No', 'NO.', 'NUMERO', 'NÚMERO', 'NUM.', '#',
+    'DIRECCION:', 'DIRECCIÓN', 'DIR.', 'TELEFONO:', 'TELÉFONO', 'TEL.', 'CEL', 'CELULAR', 'MÓVIL', 'MOVIL',
+    'CODIGO:', 'CÓDIGO', 'COD.', 'REF', 'REFERENCIA', 'CIUDAD:', 'MUNICIPIO', 'CL', 'CLL', 'CALLE', 'KR',
+    'KRA', 'CARRERA', 'DG', 'DIAGONAL', 'TV', 'TRANSVERSAL', 'APTO', '$', 'COP', 'USD', 'EUR',
+]
+_VALORES = [
+    '12/05/2023', '1-1-99', '2023-04-05', '20230405', '5 de mayo de 2024', '900.123.456-7', '1.234.567',
+    '12345678', '45 # 12-30', '3001234567', '(602) 555-1234', 'juan.perez@correo.com', 'A@b.co',
+    '1.234,56', '1,234.56', '15 KG', '3 LITROS', '10 UND', '12 M2', '40 METROS CUADRADOS', '500 PESOS',
+    'AB-12345', 'POPAYAN', 'SANTANDER DE QUILICHAO', '-', '.', ',', '2', '20', '2024',
+]
+_RELLENO = ['la', 'FACTURA', 'de', 'Cliente', 'TOTAL', 'valor', ':', '-', '\n', '  ', 'SAS', 'x', 'ñandú']
+
+
+def texto_aleatorio(rnd):
+    piezas = []
+    for _ in range(rnd.randint(0, 60)):
+        fuente = rnd.random()
+        pieza = rnd.choice(_ETIQUETAS if fuente < 0.35 else _VALORES if fuente < 0.75 else _RELLENO)
+        if rnd.random() < 0.2:
+            pieza = pieza.lower()
+        piezas.append(pieza)
+        # A veces pegado a la pieza anterior (el OCR se come espacios)
+        piezas.append(rnd.choice([' ', ' ', ' ', '', ': ', '\n']))
+    return ''.join(piezas)
+
+
+def medir(funcion, textos, repeticiones=3):
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        for texto in textos:
+            funcion(texto)
+    return (time.perf_counter() - inicio) / repeticiones / len(textos)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="escanear_campos contra un re.findall por campo")
+    parser.add_argument('--textos', type=int, default=5000)
+    parser.add_argument('--semilla', type=int, default=0)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.semilla)
+    textos = [normalizar_texto(texto_aleatorio(rnd)) for _ in range(args.textos)]
+    # Casos borde: vacío, un solo carácter, campos repetidos sin separación
+    textos += ['', '2', '#', 'NITNIT900123456', '$1$2$3', '20230405' * 5, 'CL CL CL 45 # 12',
+               'a@b.coc@d.co', '1,2,3 KG 4.5.6 UND']
+
+    diferencias = 0
+    for texto in textos:
+        esperado = escanear_con_findall(texto)
+        obtenido = escanear_campos(texto)
+        if esperado != obtenido:
+            diferencias += 1
+            if diferencias <= 5:
+                campos = [c for c in CAMPOS_ESCANEO if esperado[c] != obtenido[c]]
+                print(f"❌ {texto[:80]!r}: difieren {campos}")
+    print(f"{'✅' if not diferencias else '❌'} {len(textos)} textos, {diferencias} con diferencias")
+
+    # Documento de ~8 KB como el que llega a extraer_datos
+    documento = normalizar_texto('\n'.join(texto_aleatorio(rnd) for _ in range(40)))
+    t_findall = medir(escanear_con_findall, [documento], 20)
+    t_escaner = medir(escanear_campos, [documento], 20)
+    print(f"\nDocumento de {len(documento) / 1024:.1f} KB: {len(CAMPOS_ESCANEO)} findall "
+          f"{t_findall * 1000:.2f} ms, escanear_campos {t_escaner * 1000:.2f} ms "
+          f"({t_findall / t_escaner:.1f}x)")
+
+    assert not diferencias, "escanear_campos no coincide con re.findall"
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark: limpieza de montos por columna.
+Compara MemoriaInteligente.limpiar_numero celda por celda (copiado abajo) con
+numeros_columnas.limpiar_numeros y verifica que den exactamente los mismos
+valores y las mismas celdas fallidas, sobre montos de cartera con formato y
+sobre textos aleatorios tipo OCR (separadores repetidos, signos, letras que
+las correcciones convierten en dígitos, celdas vacías o numéricas).
+
+Uso:
+    python benchmark_limpiar_numeros.py
+    python benchmark_limpiar_numeros.py --celdas 200000
+"""
+import argparse
+import random
+import re
+import time
+
+import numpy as np
+
+from numeros_columnas import limpiar_numeros
+
+# Valores por defecto de MemoriaInteligente.inicializar_memoria
+CORRECCIONES = {"S": "5", "O": "0", "I": "1", "l": "1", "G": "6", "B": "8"}
+
+
+def limpiar_numero_original(valor, correcciones):
+    """
+    MemoriaInteligente.limpiar_numero (app.py), sin el print.
+    Retorna (numero, fallido) en lugar de solo el número.
+    """
+    if not valor:
+        return 0.0, False
+
+    if isinstance(valor, (int, float)):
+        return float(valor), False
+
+    valor_str = str(valor)
+
+    for error, correccion in correcciones.items():
+        valor_str = valor_str.replace(error, correccion)
+
+    valor_limpio = re.sub(r'[^0-9.,\-]', '', valor_str)
+
+    if ',' in valor_limpio and '.' in valor_limpio:
+        ultimo_punto = valor_limpio.rfind('.')
+        ultima_coma = valor_limpio.rfind(',')
+
+        if ultimo_punto > ultima_coma:  # 1,234.56
+            valor_limpio = valor_limpio.replace(',', '')
+        else:  # 1.234,56
+            valor_limpio = valor_limpio.replace('.', '').replace(',', '.')
+    elif ',' in valor_limpio:
+        if valor_limpio.count(',') == 1 and len(valor_limpio.split(',')[1]) <= 2:
+            valor_limpio = valor_limpio.replace(',', '.')  # Decimal
+        else:
+            valor_limpio = valor_limpio.replace(',', '')   # Miles
+
+    try:
+        return (float(valor_limpio) if valor_limpio else 0.0), False
+    except ValueError:
+        return 0.0, True
+
+
+def monto_cartera(rnd):
+    """Monto como sale de un reporte de cartera (US, EU, sin miles, con $ o negativo)"""
+    entero = rnd.randint(0, 10 ** rnd.randint(1, 9))
+    centavos = rnd.randint(0, 99)
+    formato = rnd.randrange(6)
+    if formato == 0:
+        texto = f"{entero:,}.{centavos:02d}"
+    elif formato == 1:
+        texto = f"{entero:,}".replace(',', '.') + f",{centavos:02d}"
+    elif formato == 2:
+        texto = f"{entero:,}"
+    elif formato == 3:
+        texto = f"{entero:,}".replace(',', '.')
+    elif formato == 4:
+        texto = f"{entero},{centavos % 10}"
+    else:
+        texto = str(entero)
+    if rnd.random() < 0.2:
+        texto = '$ ' + texto
+    if rnd.random() < 0.1:
+        texto = '-' + texto
+    return texto
+
+
+def texto_ocr(rnd):
+    """Cadena aleatoria con los caracteres que importan a la limpieza"""
+    alfabeto = '0123456789' * 3 + ',,..--' + 'SOIlGB' + '$ xA\x00'
+    return ''.join(rnd.choice(alfabeto) for _ in range(rnd.randint(0, 14)))
+
+
+def celda(rnd):
+    tipo = rnd.random()
+    if tipo < 0.55:
+        return monto_cartera(rnd)
+    if tipo < 0.9:
+        return texto_ocr(rnd)
+    return rnd.choice(['', None, 0, 0.0, 17, -3.5, 1234.5])
+
+
+def comparar(celdas, correcciones):
+    """Cuenta las celdas donde valor o fallido difieren; retorna (diferencias, ejemplos)"""
+    valores, fallidos = limpiar_numeros(celdas, correcciones)
+    diferencias = []
+    for i, valor in enumerate(celdas):
+        esperado, fallido = limpiar_numero_original(valor, correcciones)
+        if valores[i] != esperado or bool(fallidos[i]) != fallido:
+            diferencias.append((valor, esperado, fallido, valores[i], bool(fallidos[i])))
+    return len(diferencias), diferencias[:5]
+
+
+def medir(funcion, repeticiones=3):
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    return (time.perf_counter() - inicio) / repeticiones
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="limpiar_numeros contra limpiar_numero celda por celda")
+    parser.add_argument('--celdas', type=int, default=50000)
+    parser.add_argument('--semilla', type=int, default=0)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.semilla)
+    celdas = [celda(rnd) for _ in range(args.celdas)]
+
+    # Columnas de solo texto (el caso de OCR), mezcladas, y con otras correcciones
+    casos = [
+        ("solo texto", [c for c in celdas if isinstance(c, str)], CORRECCIONES),
+        ("mezcladas", celdas, CORRECCIONES),
+        ("sin correcciones", celdas, {}),
+        ("correcciones con separadores", celdas, {',': '.', 'S': '5', '-': ''}),
+    ]
+    total = 0
+    for nombre, columna, correcciones in casos:
+        diferencias, ejemplos = comparar(columna, correcciones)
+        total += diferencias
+        print(f"{'✅' if not diferencias else '❌'} {nombre}: {len(columna)} celdas, {diferencias} diferencias")
+        for ejemplo in ejemplos:
+            print(f"   {ejemplo!r}")
+
+    # Arreglo NumPy de texto (dtype 'U') entra por otro camino de _separar
+    textos = np.array([c for c in celdas if isinstance(c, str)][:5000], dtype=str)
+    valores_u, fallidos_u = limpiar_numeros(textos, CORRECCIONES)
+    valores_l, fallidos_l = limpiar_numeros(textos.tolist(), CORRECCIONES)
+    iguales_u = np.array_equal(valores_u, valores_l) and np.array_equal(fallidos_u, fallidos_l)
+    print(f"{'✅' if iguales_u else '❌'} arreglo dtype U: igual que la lista")
+    total += not iguales_u
+
+    montos = [monto_cartera(rnd) for _ in range(args.celdas)]
+    t_celda = medir(lambda: [limpiar_numero_original(m, CORRECCIONES) for m in montos])
+    t_columna = medir(lambda: limpiar_numeros(montos, CORRECCIONES))
+    print(f"\n{len(montos)} montos: celda por celda {t_celda * 1000:.1f} ms, "
+          f"por columna {t_columna * 1000:.1f} ms ({t_celda / t_columna:.1f}x)")
+
+    assert not total, "limpiar_numeros no coincide con limpiar_numero"
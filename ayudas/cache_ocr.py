@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+"""
+🗄️ CACHÉ DE RESULTADOS OCR (DIRECCIONADA POR CONTENIDO)
+=========================================================
+Evita repetir OCR cuando se vuelve a subir la misma imagen/PDF o cuando el modo
+COMPARAR lee la misma imagen con varios motores.
+
+La clave es un hash SHA-256 del contenido (bytes crudos o píxeles) más la
+configuración del OCR (motor, DPI, psm, idioma, ...). Dos niveles:
+- Memoria: LRU acotado por número de entradas
+- Disco: un JSON por entrada, con desalojo de los más antiguos al superar el tamaño máximo
+
+Uso:
+    from cache_ocr import cache_ocr, clave_ocr
+
+    clave = clave_ocr(imagen, motor='tesseract', lang='spa', psm=3)
+    texto = cache_ocr.obtener_o_calcular(clave, lambda: pytesseract.image_to_string(imagen))
+    print(cache_ocr.estadisticas())
+
+    # Varias claves de la misma imagen: la huella se calcula una sola vez
+    huella = huella_contenido(imagen)
+    clave_cajas = clave_ocr(imagen, 'cajas_coordenadas', huella=huella)
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+# Configuración (se puede ajustar con variables de entorno)
+DIRECTORIO_CACHE = os.environ.get('CACHE_OCR_DIR', '.cache_ocr')
+MAX_ENTRADAS_MEMORIA = int(os.environ.get('CACHE_OCR_MAX_ENTRADAS', '256'))
+MAX_MB_DISCO = float(os.environ.get('CACHE_OCR_MAX_MB', '200'))
+CACHE_DISCO_ACTIVA = os.environ.get('CACHE_OCR_DISCO', '1') != '0'
+
+
+def huella_contenido(fuente):
+    """
+    Hash SHA-256 del contenido de una fuente OCR.
+    Acepta bytes (archivo crudo) o una imagen PIL (se usan modo, tamaño y píxeles).
+    """
+    h = hashlib.sha256()
+    if isinstance(fuente, (bytes, bytearray, memoryview)):
+        h.update(b'bytes:')
+        h.update(fuente)
+    elif hasattr(fuente, 'tobytes') and hasattr(fuente, 'size') and hasattr(fuente, 'mode'):
+        h.update(f"imagen:{fuente.mode}:{fuente.size[0]}x{fuente.size[1]}:".encode('utf-8'))
+        h.update(fuente.tobytes())
+    else:
+        raise TypeError(f"Fuente no soportada para caché OCR: {type(fuente).__name__}")
+    return h.hexdigest()
+
+
+def clave_ocr(fuente, motor, huella=None, **config):
+    """
+    Clave de caché: huella del contenido + motor + configuración ordenada.
+
+    Args:
+        fuente: bytes o PIL Image
+        motor: 'tesseract', 'tesseract_pdf', 'cajas_coordenadas', ...
+        huella: huella_contenido(fuente) si ya se calculó (una imagen de
+            página pesa decenas de MB: hashearla en cada clave no es gratis)
+        **config: parámetros que cambian el resultado (dpi, psm, lang, modo, ...)
+    """
+    config_txt = json.dumps(config, sort_keys=True, default=str)
+    base = f"{motor}|{config_txt}|{huella or huella_contenido(fuente)}"
+    return hashlib.sha256(base.encode('utf-8')).hexdigest()
+
+
+class CacheOCR:
+    """Caché de dos niveles (memoria LRU + disco) con contadores de aciertos/fallos"""
+
+    def __init__(self, directorio=DIRECTORIO_CACHE, max_entradas=MAX_ENTRADAS_MEMORIA,
+                 max_mb_disco=MAX_MB_DISCO, usar_disco=CACHE_DISCO_ACTIVA):
+        self.directorio = Path(directorio)
+        self.max_entradas = max_entradas
+        self.max_bytes_disco = int(max_mb_disco * 1024 * 1024)
+        self.usar_disco = usar_disco
+
+        self._memoria = OrderedDict()
+        self._candado = threading.Lock()
+        self._bytes_disco = None  # se calcula al primer uso del disco
+
+        self.aciertos_memoria = 0
+        self.aciertos_disco = 0
+        self.fallos = 0
+
+    # ---------- nivel memoria ----------
+    def _leer_memoria(self, clave):
+        with self._candado:
+            if clave in self._memoria:
+                self._memoria.move_to_end(clave)
+                return True, self._memoria[clave]
+        return False, None
+
+    def _escribir_memoria(self, clave, valor):
+        with self._candado:
+            self._memoria[clave] = valor
+            self._memoria.move_to_end(clave)
+            while len(self._memoria) > self.max_entradas:
+                self._memoria.popitem(last=False)
+
+    # ---------- nivel disco ----------
+    def _ruta(self, clave):
+        return self.directorio / clave[:2] / f"{clave}.json"
+
+    def _leer_disco(self, clave):
+        if not self.usar_disco:
+            return False, None
+        ruta = self._ruta(clave)
+        try:
+            with open(ruta, 'r', encoding='utf-8') as f:
+                valor = json.load(f)['valor']
+            # Tocar el archivo para que el desalojo sea por uso reciente
+            os.utime(ruta, None)
+            return True, valor
+        except FileNotFoundError:
+            return False, None
+        except Exception as e:
+            print(f"⚠️ Entrada de caché OCR ilegible ({ruta.name}): {e}")
+            return False, None
+
+    def _escribir_disco(self, clave, valor):
+        if not self.usar_disco:
+            return
+        ruta = self._ruta(clave)
+        try:
+            ruta.parent.mkdir(parents=True, exist_ok=True)
+            contenido = json.dumps({'valor': valor, 'creado': time.time()}, ensure_ascii=False)
+            # Escritura atómica: archivo temporal + rename
+            temporal = ruta.parent / f"{clave}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temporal, 'w', encoding='utf-8') as f:
+                f.write(contenido)
+            os.replace(temporal, ruta)
+        except (TypeError, ValueError):
+            # Valor no serializable a JSON: queda solo en memoria
+            return
+        except Exception as e:
+            print(f"⚠️ No se pudo escribir caché OCR en disco: {e}")
+            return
+
+        with self._candado:
+            if self._bytes_disco is None:
+                self._bytes_disco = self._medir_disco()
+            else:
+                self._bytes_disco += len(contenido.encode('utf-8'))
+            if self._bytes_disco > self.max_bytes_disco:
+                self._desalojar_disco()
+
+    def _archivos_disco(self):
+        if not self.directorio.exists():
+            return []
+        return list(self.directorio.glob('*/*.json'))
+
+    def _medir_disco(self):
+        total = 0
+        for ruta in self._archivos_disco():
+            try:
+                total += ruta.stat().st_size
+            except OSError:
+                pass
+        return total
+
+    def _desalojar_disco(self):
+        """Borra las entradas menos usadas hasta quedar en el 80% del límite"""
+        archivos = []
+        for ruta in self._archivos_disco():
+            try:
+                st = ruta.stat()
+                archivos.append((st.st_mtime, st.st_size, ruta))
+            except OSError:
+                pass
+        archivos.sort()
+
+        objetivo = int(self.max_bytes_disco * 0.8)
+        total = sum(tam for _, tam, _ in archivos)
+        for _, tam, ruta in archivos:
+            if total <= objetivo:
+                break
+            try:
+                ruta.unlink()
+                total -= tam
+            except OSError:
+                pass
+        self._bytes_disco = total
+
+    # ---------- API pública ----------
+    def obtener(self, clave):
+        """Retorna (encontrado, valor) buscando en memoria y luego en disco"""
+        encontrado, valor = self._leer_memoria(clave)
+        if encontrado:
+            self._contar('aciertos_memoria')
+            return True, valor
+
+        encontrado, valor = self._leer_disco(clave)
+        if encontrado:
+            self._contar('aciertos_disco')
+            self._escribir_memoria(clave, valor)
+            return True, valor
+
+        self._contar('fallos')
+        return False, None
+
+    def _contar(self, contador):
+        with self._candado:
+            setattr(self, contador, getattr(self, contador) + 1)
+
+    def guardar(self, clave, valor):
+        """Guarda el valor en ambos niveles"""
+        self._escribir_memoria(clave, valor)
+        self._escribir_disco(clave, valor)
+
+    def obtener_o_calcular(self, clave, calcular, guardar_vacios=True):
+        """
+        Retorna el valor en caché o lo calcula con `calcular()` y lo guarda.
+        Con guardar_vacios=False no se guardan resultados vacíos (p.ej. motor no disponible).
+        """
+        encontrado, valor = self.obtener(clave)
+        if encontrado:
+            return valor
+        valor = calcular()
+        if valor or guardar_vacios:
+            self.guardar(clave, valor)
+        return valor
+
+    def limpiar(self, disco=False):
+        """Vacía la memoria (y opcionalmente el disco) y reinicia contadores"""
+        with self._candado:
+            self._memoria.clear()
+            self.aciertos_memoria = self.aciertos_disco = self.fallos = 0
+            if disco:
+                for ruta in self._archivos_disco():
+                    try:
+                        ruta.unlink()
+                    except OSError:
+                        pass
+                self._bytes_disco = 0
+
+    def estadisticas(self):
+        """Contadores de aciertos/fallos y ocupación de cada nivel"""
+        consultas = self.aciertos_memoria + self.aciertos_disco + self.fallos
+        aciertos = self.aciertos_memoria + self.aciertos_disco
+        return {
+            'aciertos_memoria': self.aciertos_memoria,
+            'aciertos_disco': self.aciertos_disco,
+            'fallos': self.fallos,
+            'tasa_aciertos': (aciertos / consultas) if consultas else 0.0,
+            'entradas_memoria': len(self._memoria),
+            'mb_disco': (self._bytes_disco or 0) / (1024 * 1024),
+        }
+
+
+# Instancia global compartida por ocr_imagen, ocr_pdf_bytes y leer_cajas_ocr
+cache_ocr = CacheOCR()
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+🧭 CLASIFICADOR DE TIPO DE DOCUMENTO (ÍNDICE DE PALABRAS CLAVE)
+================================================================
+extraer_datos probaba los extractores especializados uno tras otro (HERINCO,
+Visión Integrados, ventas, dos columnas, cartera) y cada uno pasaba el texto
+completo a mayúsculas para revisar sus palabras clave.
+
+Aquí el texto se indexa una sola vez (tokens en mayúsculas → posiciones) y se
+puntúan todos los tipos registrados contra ese índice. extraer_datos despacha
+directo al extractor ganador; si ese no extrae nada, sigue con los demás
+candidatos y por último con la extracción genérica.
+
+Una palabra clave coincide donde lo hacía `'CLAVE' in texto.upper()`: una
+palabra sola puede estar en cualquier parte de un token ('ENTREGA' →
+'ENTREGADO', 'PROVEEDOR' → 'NITPROVEEDOR', 'HERINCO' → '1HERINCO'). En una
+frase la primera palabra puede ser final de un token, la última su comienzo y
+las del medio tokens completos, en tokens consecutivos; a diferencia de `in`,
+no importa si el OCR dejó uno o varios espacios o un salto de línea.
+
+Uso:
+    from clasificador_documentos import clasificador_documentos
+
+    clasificador_documentos.registrar('herinco', ['HERINCO', 'ENTREGA'], extraer_datos_herinco)
+    for tipo in clasificador_documentos.clasificar(texto):  # ganador primero
+        datos = tipo['extractor'](texto)
+        if datos:
+            break
+"""
+
+import re
+import threading
+import time
+from bisect import bisect_left
+
+_TOKEN = re.compile(r'[A-ZÁÉÍÓÚÑÜ0-9]+')
+
+
+class IndicePalabras:
+    """Tokens en mayúsculas de un texto con sus posiciones (se arma una vez por documento)"""
+
+    def __init__(self, texto):
+        self.tokens = _TOKEN.findall((texto or '').upper())
+        self._posiciones = {}
+        for posicion, token in enumerate(self.tokens):
+            self._posiciones.setdefault(token, []).append(posicion)
+        self._ordenados = sorted(self._posiciones)
+
+    def _con_prefijo(self, prefijo):
+        """Tokens distintos que empiezan con `prefijo` (búsqueda binaria en el vocabulario)"""
+        i = bisect_left(self._ordenados, prefijo)
+        while i < len(self._ordenados) and self._ordenados[i].startswith(prefijo):
+            yield self._ordenados[i]
+            i += 1
+
+    def contiene(self, clave):
+        """True si la palabra o frase `clave` aparece en el texto"""
+        palabras = _TOKEN.findall(clave.upper())
+        if not palabras:
+            return False
+
+        if len(palabras) == 1:
+            palabra = palabras[0]
+            # Prefijo por búsqueda binaria; si no, pegada a otro token (se recorre el vocabulario)
+            return (next(self._con_prefijo(palabra), None) is not None
+                    or any(palabra in token for token in self._ordenados))
+
+        ultima = len(palabras) - 1
+        for primero in self._ordenados:
+            if not primero.endswith(palabras[0]):
+                continue
+            for inicio in self._posiciones[primero]:
+                if inicio + ultima >= len(self.tokens):
+                    break
+                if (all(self.tokens[inicio + k] == palabras[k] for k in range(1, ultima))
+                        and self.tokens[inicio + ultima].startswith(palabras[ultima])):
+                    return True
+        return False
+
+
+class ClasificadorDocumentos:
+    """Registro de tipos de documento y clasificación por palabras clave"""
+
+    def __init__(self):
+        self._tipos = []
+        self._candado = threading.Lock()
+        self.documentos = 0
+        self.segundos = 0.0
+        self.ultimo_ms = 0.0
+        self.por_tipo = {}
+
+    def registrar(self, nombre, palabras_clave, extractor, prioridad=None):
+        """
+        Registra (o reemplaza) un tipo de documento.
+
+        Args:
+            nombre: identificador del tipo ('herinco', 'cartera', ...)
+            palabras_clave: palabras o frases que deben aparecer TODAS en el texto
+            extractor: función que recibe el texto (más lo que le pase el
+                llamador) y retorna los datos, o {} si al final no era de este tipo
+            prioridad: desempate entre tipos con el mismo puntaje (menor gana);
+                por defecto el orden de registro
+        """
+        with self._candado:
+            self._tipos = [t for t in self._tipos if t['nombre'] != nombre]
+            if prioridad is None:
+                prioridad = len(self._tipos)
+            self._tipos.append({
+                'nombre': nombre,
+                'palabras_clave': list(palabras_clave),
+                'extractor': extractor,
+                'prioridad': prioridad,
+            })
+            self._tipos.sort(key=lambda t: t['prioridad'])
+
+    def tipos(self):
+        """Nombres de los tipos registrados, en orden de prioridad"""
+        return [t['nombre'] for t in self._tipos]
+
+    def puntuar(self, texto, indice=None):
+        """
+        Puntaje de cada tipo registrado: fracción de sus palabras clave presentes.
+
+        Returns:
+            List[dict]: {'nombre','puntaje','extractor','prioridad'} para todos los tipos,
+            de mayor a menor puntaje (empates por prioridad)
+        """
+        if indice is None:
+            indice = IndicePalabras(texto)
+        puntajes = []
+        for tipo in self._tipos:
+            claves = tipo['palabras_clave']
+            presentes = sum(1 for clave in claves if indice.contiene(clave))
+            puntajes.append({
+                'nombre': tipo['nombre'],
+                'puntaje': presentes / len(claves) if claves else 0.0,
+                'extractor': tipo['extractor'],
+                'prioridad': tipo['prioridad'],
+            })
+        puntajes.sort(key=lambda p: (-p['puntaje'], p['prioridad']))
+        return puntajes
+
+    def clasificar(self, texto):
+        """
+        Tipos candidatos para el texto (los que tienen todas sus palabras clave),
+        el ganador primero. Lista vacía → documento genérico.
+        """
+        inicio = time.perf_counter()
+        candidatos = [p for p in self.puntuar(texto) if p['puntaje'] >= 1.0]
+        transcurrido = time.perf_counter() - inicio
+
+        ganador = candidatos[0]['nombre'] if candidatos else 'generico'
+        with self._candado:
+            self.documentos += 1
+            self.segundos += transcurrido
+            self.ultimo_ms = transcurrido * 1000
+            self.por_tipo[ganador] = self.por_tipo.get(ganador, 0) + 1
+        return candidatos
+
+    def estadisticas(self):
+        """Documentos clasificados, tiempo de clasificación y conteo por tipo ganador"""
+        with self._candado:
+            return {
+                'documentos': self.documentos,
+                'ms_promedio': (self.segundos / self.documentos * 1000) if self.documentos else 0.0,
+                'ms_ultimo': self.ultimo_ms,
+                'ms_total': self.segundos * 1000,
+                'por_tipo': dict(self.por_tipo),
+            }
+
+
+# Instancia compartida por el proceso (app.py registra sus extractores al importarse)
+clasificador_documentos = ClasificadorDocumentos()
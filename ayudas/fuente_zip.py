@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+📦 LECTURA DE ZIP EN STREAMING (SIN EXTRAER A DISCO)
+=====================================================
+extraer_archivos_desde_zip extraía cada archivo a un TemporaryDirectory, lo
+leía completo a memoria y lo envolvía en un objeto falso con lambdas. Las
+lambdas capturaban la variable `contenido` del bucle, así que todos los
+archivos terminaban devolviendo los bytes del último. Además el lote completo
+quedaba en memoria antes de empezar a procesar.
+
+Aquí FuenteZip solo lee el índice del ZIP (nombres y tamaños) y entrega un
+ArchivoZip por cada PDF/imagen. Cada ArchivoZip lee SUS bytes directo del
+archivo comprimido cuando se le piden (getvalue/read) y no los guarda: como
+procesar_multiples_archivos consume las tareas de a poco (ver
+procesamiento_lotes.py), en memoria solo están los archivos en vuelo, aunque
+el ZIP tenga miles de escaneos.
+
+ArchivoZip tiene la interfaz que usa el resto de la app de los archivos de
+st.file_uploader: name, size, read(), seek(), tell() y getvalue().
+
+Uso:
+    from fuente_zip import FuenteZip
+
+    with FuenteZip(uploaded_zip) as fuente:
+        print(len(fuente), "archivos válidos")
+        for archivo in fuente:              # perezoso: nada se descomprime aún
+            contenido = archivo.getvalue()  # bytes de este archivo
+"""
+
+import zipfile
+from pathlib import Path
+
+# La misma lista usa extractor_cli.py para los archivos sueltos
+EXTENSIONES_VALIDAS = ('.pdf', '.png', '.jpg', '.jpeg', '.tiff', '.tif', '.bmp')
+
+
+def es_miembro_valido(nombre):
+    """PDF o imagen que no sea carpeta, metadato de macOS, oculto ni ruta con '..'"""
+    if nombre.endswith('/'):
+        return False
+    # '.DS_Store', '._factura.pdf' (AppleDouble), '.git/...', '../...'
+    if any(parte.startswith('.') or parte == '__MACOSX' for parte in Path(nombre).parts):
+        return False
+    return Path(nombre).suffix.lower() in EXTENSIONES_VALIDAS
+
+
+class ArchivoZip:
+    """Un archivo dentro del ZIP, leído bajo demanda (interfaz de UploadedFile)"""
+
+    def __init__(self, zip_ref, info):
+        self._zip = zip_ref
+        self._info = info
+        self.name = Path(info.filename).name
+        self.ruta = info.filename
+        self.size = info.file_size
+        self._flujo = None
+
+    def abrir(self):
+        """Flujo de lectura directo del ZIP (descomprime a medida que se lee)"""
+        return self._zip.open(self._info, 'r')
+
+    def getvalue(self):
+        """Bytes completos del archivo (se descomprimen en cada llamada, no se guardan)"""
+        with self.abrir() as flujo:
+            return flujo.read()
+
+    def read(self, tamano=-1):
+        if self._flujo is None:
+            self._flujo = self.abrir()
+        return self._flujo.read(tamano)
+
+    def seek(self, posicion, desde=0):
+        if self._flujo is None:
+            if posicion == 0 and desde == 0:
+                return 0
+            self._flujo = self.abrir()
+        return self._flujo.seek(posicion, desde)
+
+    def tell(self):
+        return self._flujo.tell() if self._flujo is not None else 0
+
+    def close(self):
+        if self._flujo is not None:
+            self._flujo.close()
+            self._flujo = None
+
+    def __repr__(self):
+        return f"ArchivoZip({self.ruta!r}, {self.size} bytes)"
+
+
+class FuenteZip:
+    """PDFs e imágenes de un ZIP, entregados uno a uno sin extraer nada a disco"""
+
+    def __init__(self, zip_file):
+        self._zip = zipfile.ZipFile(zip_file, 'r')
+        # Solo el directorio central: nombres y tamaños, sin descomprimir
+        self._miembros = [
+            info for info in self._zip.infolist()
+            if not info.is_dir() and es_miembro_valido(info.filename)
+        ]
+
+    def __len__(self):
+        return len(self._miembros)
+
+    def __iter__(self):
+        for info in self._miembros:
+            yield ArchivoZip(self._zip, info)
+
+    @property
+    def nombres(self):
+        return [Path(info.filename).name for info in self._miembros]
+
+    @property
+    def tamano_total(self):
+        """Bytes descomprimidos de todos los archivos válidos"""
+        return sum(info.file_size for info in self._miembros)
+
+    def cerrar(self):
+        self._zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.cerrar()
+        return False
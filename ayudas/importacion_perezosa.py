@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+💤 IMPORTACIÓN PEREZOSA DE MÓDULOS PESADOS
+===========================================
+app.py importaba streamlit, pytesseract, pandas y PIL al cargarse, aunque
+quien lo importara fuera un proceso del pool de lotes o el CLI, que solo usan
+funciones de extracción. Solo streamlit y pandas tardan cientos de
+milisegundos, y cada proceso del pool los pagaba al arrancar.
+
+ModuloPerezoso es un reemplazo del módulo: el import real ocurre la primera
+vez que se usa un atributo (st.session_state, pd.DataFrame...), una sola vez
+aunque varios hilos lo pidan a la vez. Si el módulo no está instalado, el
+ImportError aparece en ese primer uso y no al importar app.py (así el núcleo
+funciona sin streamlit).
+
+Uso:
+    from importacion_perezosa import ModuloPerezoso
+
+    st = ModuloPerezoso('streamlit')
+    pytesseract = ModuloPerezoso('pytesseract', al_cargar=_configurar_tesseract)
+
+    st.session_state   # aquí se importa streamlit
+"""
+
+import importlib
+import threading
+
+# Sin estos atributos (objeto a medio construir) __getattr__ no debe intentar importar
+_ATRIBUTOS_PROPIOS = frozenset(('_nombre', '_al_cargar', '_modulo', '_candado'))
+
+
+class ModuloPerezoso:
+    """Módulo que se importa en el primer acceso a uno de sus atributos"""
+
+    def __init__(self, nombre, al_cargar=None):
+        """
+        Args:
+            nombre: nombre del módulo ('pandas', 'PIL.Image'...)
+            al_cargar: función (modulo) que se llama una vez, recién importado
+        """
+        self._nombre = nombre
+        self._al_cargar = al_cargar
+        self._modulo = None
+        self._candado = threading.Lock()
+
+    def _cargar(self):
+        with self._candado:
+            if self._modulo is None:
+                modulo = importlib.import_module(self._nombre)
+                if self._al_cargar is not None:
+                    self._al_cargar(modulo)
+                self._modulo = modulo
+        return self._modulo
+
+    @property
+    def cargado(self):
+        """True si el módulo ya se importó"""
+        return self._modulo is not None
+
+    def __getattr__(self, atributo):
+        # Solo se llega aquí con atributos que no son de ModuloPerezoso
+        if atributo in _ATRIBUTOS_PROPIOS:
+            raise AttributeError(atributo)
+        return getattr(self._modulo or self._cargar(), atributo)
+
+    def __repr__(self):
+        estado = "cargado" if self.cargado else "sin cargar"
+        return f"<ModuloPerezoso {self._nombre!r} ({estado})>"
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+🧩 ÍNDICE DE CONTENCIÓN DE VALORES (PARES CLAVE-VALOR SIN DUPLICADOS)
+======================================================================
+extraer_pares_clave_valor descartaba un valor nuevo si ya había otro que lo
+contuviera (o que estuviera contenido en él) recorriendo todos los pares
+guardados con `in` en cada coincidencia: cuadrático en el número de campos, y
+cada comparación es a su vez una búsqueda de subcadena. En contratos o
+extractos con cientos de líneas "Etiqueta: Valor" se notaba.
+
+Aquí cada valor vigente se indexa por sus trigramas y por su trigrama inicial:
+  - ¿`valor` está contenido en alguno? Solo se revisan los valores que tienen
+    el trigrama menos frecuente de `valor` (los demás no pueden contenerlo).
+  - ¿Alguno está contenido en `valor`? Para cada posición de `valor` se
+    revisan solo los valores que empiezan con el trigrama de esa posición.
+Valores de menos de 3 caracteres (raros) se revisan aparte, uno por uno.
+
+Cada clave tiene un solo valor vigente: asignar una clave que ya existía saca
+su valor anterior del índice, igual que sobrescribir el dict de pares.
+
+Uso:
+    from indice_contencion import IndiceContencion
+
+    indice = IndiceContencion()
+    if not indice.esta_contenido(valor):
+        pares[clave] = valor
+        indice.asignar(clave, valor)
+"""
+
+
+def _trigramas(valor):
+    return [valor[i:i + 3] for i in range(len(valor) - 2)]
+
+
+class IndiceContencion:
+    """Valores vigentes (uno por clave) con búsquedas de subcadena por trigramas"""
+
+    def __init__(self):
+        self._por_clave = {}
+        # valor → claves que lo tienen (un valor se indexa una sola vez)
+        self._vigentes = {}
+        self._por_trigrama = {}
+        self._por_inicio = {}
+        self._cortos = set()
+
+    def __len__(self):
+        return len(self._vigentes)
+
+    # ---------- Altas y bajas ----------
+    def asignar(self, clave, valor):
+        """Asigna `valor` a `clave` (reemplaza el valor anterior de la clave)"""
+        anterior = self._por_clave.get(clave)
+        if anterior is not None:
+            self._quitar(anterior)
+        self._por_clave[clave] = valor
+        self._agregar(valor)
+
+    def _agregar(self, valor):
+        claves = self._vigentes.get(valor, 0)
+        self._vigentes[valor] = claves + 1
+        if claves:
+            return
+        if len(valor) < 3:
+            self._cortos.add(valor)
+            return
+        for trigrama in set(_trigramas(valor)):
+            self._por_trigrama.setdefault(trigrama, set()).add(valor)
+        self._por_inicio.setdefault(valor[:3], set()).add(valor)
+
+    def _quitar(self, valor):
+        claves = self._vigentes[valor] - 1
+        if claves:
+            self._vigentes[valor] = claves
+            return
+        del self._vigentes[valor]
+        if len(valor) < 3:
+            self._cortos.discard(valor)
+            return
+        for trigrama in set(_trigramas(valor)):
+            valores = self._por_trigrama[trigrama]
+            valores.discard(valor)
+            if not valores:
+                del self._por_trigrama[trigrama]
+        valores = self._por_inicio[valor[:3]]
+        valores.discard(valor)
+        if not valores:
+            del self._por_inicio[valor[:3]]
+
+    # ---------- Consultas ----------
+    def esta_contenido(self, valor):
+        """True si `valor` es subcadena de algún valor vigente"""
+        if not self._vigentes:
+            return False
+        if len(valor) < 3:
+            return any(valor in existente for existente in self._vigentes)
+
+        menos_frecuente = None
+        for trigrama in _trigramas(valor):
+            candidatos = self._por_trigrama.get(trigrama)
+            if candidatos is None:
+                # Ningún valor tiene este trigrama: ninguno puede contener a `valor`
+                return False
+            if menos_frecuente is None or len(candidatos) < len(menos_frecuente):
+                menos_frecuente = candidatos
+        return any(valor in existente for existente in menos_frecuente)
+
+    def contiene_alguno(self, valor):
+        """True si algún valor vigente es subcadena de `valor`"""
+        if any(corto in valor for corto in self._cortos):
+            return True
+        for i in range(len(valor) - 2):
+            for existente in self._por_inicio.get(valor[i:i + 3], ()):
+                if valor.startswith(existente, i):
+                    return True
+        return False
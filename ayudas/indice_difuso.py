@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+🔤 ÍNDICE DIFUSO DE NOMBRES CONOCIDOS (TRIGRAMAS + MEMO)
+=========================================================
+MemoriaInteligente.corregir_nombre llamaba process.extractOne contra la lista
+completa de proveedores/medicamentos conocidos en cada celda: un recorrido
+lineal por consulta, y la lista crece con cada nombre nuevo que se aprende.
+
+Aquí cada lista tiene un índice invertido de trigramas sobre los nombres ya
+procesados (minúsculas, solo letras y números, ASCII, como hace thefuzz). Una
+consulta toma como candidatos los nombres que más trigramas comparten con ella
+y solo a esos los puntúa con WRatio de rapidfuzz (el mismo puntaje que
+thefuzz.process.extractOne). Con listas cortas se puntúan todos, igual que antes;
+con listas largas el resultado puede diferir del recorrido completo solo cuando
+el mejor nombre casi no comparte trigramas con la consulta, o en empates.
+
+Los resultados se memorizan por consulta. Si la lista creció desde entonces,
+solo se puntúan los nombres agregados después, sin invalidar todo el memo.
+
+Uso:
+    from indice_difuso import IndiceDifuso
+
+    indice = IndiceDifuso(proveedores_conocidos)   # comparte la lista, no la copia
+    mejor, puntaje = indice.mejor_coincidencia("ANDES CABLE SAS")
+    proveedores_conocidos.append("NUEVO SAS")       # se indexa solo en la siguiente consulta
+"""
+
+import threading
+
+import numpy as np
+
+try:
+    from rapidfuzz import fuzz as rf_fuzz, process as rf_process
+    from thefuzz.utils import full_process
+    DIFUSO_DISPONIBLE = True
+except ImportError:
+    DIFUSO_DISPONIBLE = False
+
+# Hasta este tamaño se puntúa la lista completa (resultado idéntico a extractOne)
+MAX_NOMBRES_SIN_INDICE = 500
+# Candidatos (los de más trigramas compartidos) que se puntúan por consulta
+MAX_CANDIDATOS = 128
+# Apariciones de trigramas que se cuentan por consulta (de los más raros a los más comunes)
+MAX_POSTINGS_POR_CONSULTA = 20000
+# Consultas distintas que se recuerdan por lista
+MAX_MEMO = 50000
+
+
+def procesar_nombre(nombre):
+    """Normalización de thefuzz para WRatio: minúsculas, letras/números, solo ASCII"""
+    return full_process(str(nombre), force_ascii=True)
+
+
+def trigramas(procesado):
+    """Trigramas del nombre procesado, con bordes marcados por espacios"""
+    relleno = f"  {procesado} "
+    return {relleno[i:i + 3] for i in range(len(relleno) - 2)}
+
+
+class IndiceDifuso:
+    """Índice de trigramas sobre una lista de nombres conocidos (compartida, solo crece)"""
+
+    def __init__(self, lista):
+        self.lista = lista
+        self._procesados = []
+        self._postings = {}
+        self._arreglos = {}
+        self._conocidos = set()
+        self._memo = {}
+        self._candado = threading.Lock()
+
+    # ---------- Sincronización con la lista ----------
+    def _sincronizar(self):
+        """Indexa los nombres agregados a la lista desde la última consulta"""
+        if len(self.lista) < len(self._procesados):
+            # La lista se reemplazó o se recortó: se reconstruye todo
+            self._procesados = []
+            self._postings = {}
+            self._arreglos = {}
+            self._conocidos = set()
+            self._memo = {}
+
+        for i in range(len(self._procesados), len(self.lista)):
+            self._conocidos.add(self.lista[i])
+            procesado = procesar_nombre(self.lista[i])
+            self._procesados.append(procesado)
+            for trigrama in trigramas(procesado):
+                self._postings.setdefault(trigrama, []).append(i)
+
+    def contiene(self, nombre):
+        """`nombre in lista` sin recorrer la lista"""
+        with self._candado:
+            self._sincronizar()
+            return nombre in self._conocidos
+
+    # ---------- Puntuación ----------
+    def _arreglo(self, trigrama):
+        """Postings del trigrama como arreglo numpy (se rehace solo si el trigrama creció)"""
+        postings = self._postings[trigrama]
+        arreglo = self._arreglos.get(trigrama)
+        if arreglo is None or len(arreglo) != len(postings):
+            arreglo = np.asarray(postings, dtype=np.int32)
+            self._arreglos[trigrama] = arreglo
+        return arreglo
+
+    def _candidatos(self, consulta):
+        """Índices de los nombres con más trigramas en común, en orden de la lista"""
+        presentes = [t for t in trigramas(consulta) if t in self._postings]
+        if not presentes:
+            return []
+        # Los trigramas más raros primero; los muy comunes ('sas', ' sa') no
+        # discriminan y son los que más cuestan de contar
+        presentes.sort(key=lambda t: len(self._postings[t]))
+        arreglos = []
+        contados = 0
+        for trigrama in presentes:
+            largo = len(self._postings[trigrama])
+            if contados and contados + largo > MAX_POSTINGS_POR_CONSULTA:
+                break
+            arreglos.append(self._arreglo(trigrama))
+            contados += largo
+
+        indices, conteos = np.unique(np.concatenate(arreglos), return_counts=True)
+        if len(indices) > MAX_CANDIDATOS:
+            mejores = np.argpartition(-conteos, MAX_CANDIDATOS)[:MAX_CANDIDATOS]
+            indices = np.sort(indices[mejores])
+        return indices.tolist()
+
+    def _puntuar(self, consulta, indices):
+        """Mejor (indice, puntaje) entre `indices`; los empates los gana el primero de la lista"""
+        if not indices:
+            return None, 0
+        elegidos = [self._procesados[i] for i in indices]
+        resultado = rf_process.extractOne(consulta, elegidos, scorer=rf_fuzz.WRatio, processor=None)
+        if resultado is None:
+            return None, 0
+        _, puntaje, posicion = resultado
+        return indices[posicion], int(round(puntaje))
+
+    def mejor_coincidencia(self, nombre):
+        """
+        Nombre conocido más parecido y su puntaje (0-100), como
+        process.extractOne(nombre, lista). Retorna (None, 0) si la lista está vacía.
+        """
+        consulta = procesar_nombre(nombre)
+        with self._candado:
+            self._sincronizar()
+            total = len(self._procesados)
+
+            memorizado = self._memo.get(consulta)
+            if memorizado is not None:
+                indice, puntaje, indexados = memorizado
+                if indexados < total:
+                    # Solo los nombres aprendidos después pueden superar el memo
+                    nuevo, puntaje_nuevo = self._puntuar(consulta, list(range(indexados, total)))
+                    if indice is None or puntaje_nuevo > puntaje:
+                        indice, puntaje = nuevo, puntaje_nuevo
+            else:
+                if total <= MAX_NOMBRES_SIN_INDICE:
+                    indice, puntaje = self._puntuar(consulta, list(range(total)))
+                else:
+                    indice, puntaje = self._puntuar(consulta, self._candidatos(consulta))
+
+            if len(self._memo) >= MAX_MEMO:
+                self._memo.clear()
+            self._memo[consulta] = (indice, puntaje, total)
+
+        if indice is None:
+            return None, 0
+        return self.lista[indice], puntaje
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Presupuesto de tiempo de importación.
+Importa cada módulo del núcleo en un intérprete nuevo (como un proceso del pool
+o el CLI al arrancar), mide cuánto tarda y revisa que no haya cargado ningún
+módulo pesado que solo se necesita más tarde (streamlit, pandas, pydantic...).
+Muestra los módulos que más tiempo se llevaron según `python -X importtime`.
+
+Termina con código 1 si algún módulo se pasa del presupuesto o carga un módulo
+pesado, así sirve como prueba antes de publicar cambios.
+
+Uso:
+    python medir_importacion.py
+    python medir_importacion.py --presupuesto 0.5 --modulos app extractor_cli
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+AYUDAS = RAIZ / "ayudas"
+
+# Lo que usa el pool de lotes y el CLI (app_maestro.py es la interfaz: carga streamlit a propósito)
+MODULOS = ['app', 'extractor_maestro', 'extractor_cli', 'procesamiento_lotes', 'servidor_extraccion']
+
+# No deben quedar importados después de `import <modulo>`
+PESADOS = ['streamlit', 'pandas', 'pydantic', 'pytesseract', 'pdfplumber', 'pdf2image',
+           'azure.ai.formrecognizer', 'spacy', 'easyocr', 'paddleocr', 'cv2', 'torch']
+
+PRESUPUESTO_SEGUNDOS = 1.0
+
+_CODIGO_HIJO = """
+import json, sys, time
+sys.path[:0] = [{ayudas!r}, {raiz!r}]
+inicio = time.perf_counter()
+import {modulo}
+segundos = time.perf_counter() - inicio
+print(json.dumps({{'segundos': segundos, 'pesados': [m for m in {pesados!r} if m in sys.modules]}}))
+"""
+
+
+def _mas_lentos(salida_importtime, cuantos):
+    """(microsegundos acumulados, módulo) de lo que importó `modulo`, de mayor a menor"""
+    tiempos = []
+    for linea in salida_importtime.splitlines():
+        if not linea.startswith('import time:') or '|' not in linea:
+            continue
+        _, acumulado, nombre = linea[len('import time:'):].split('|')
+        # Cada nivel de anidación suma dos espacios: nos quedamos con el primero bajo `modulo`
+        if acumulado.strip().isdigit() and nombre.startswith('   ') and not nombre.startswith('     '):
+            tiempos.append((int(acumulado), nombre.strip()))
+    return sorted(tiempos, reverse=True)[:cuantos]
+
+
+def medir(modulo, cuantos=8):
+    """Importa `modulo` en un proceso nuevo y retorna sus tiempos"""
+    codigo = _CODIGO_HIJO.format(raiz=str(RAIZ), ayudas=str(AYUDAS), modulo=modulo, pesados=PESADOS)
+    inicio = time.perf_counter()
+    proceso = subprocess.run([sys.executable, '-X', 'importtime', '-c', codigo],
+                             capture_output=True, text=True, cwd=str(RAIZ))
+    total = time.perf_counter() - inicio
+
+    if proceso.returncode != 0:
+        error = proceso.stderr.strip().splitlines()[-1] if proceso.stderr.strip() else '?'
+        return {'modulo': modulo, 'error': error, 'total': total}
+
+    resultado = json.loads(proceso.stdout.strip().splitlines()[-1])
+    resultado.update(modulo=modulo, total=total, lentos=_mas_lentos(proceso.stderr, cuantos))
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiempo de importación de los módulos del núcleo")
+    parser.add_argument('--presupuesto', type=float, default=PRESUPUESTO_SEGUNDOS,
+                        help="Segundos máximos por importación (por defecto 1.0)")
+    parser.add_argument('--modulos', nargs='+', default=MODULOS)
+    parser.add_argument('--detalle', type=int, default=8, help="Módulos más lentos a mostrar")
+    args = parser.parse_args()
+
+    fallas = 0
+    for modulo in args.modulos:
+        resultado = medir(modulo, args.detalle)
+        if 'error' in resultado:
+            print(f"❌ {modulo}: no se pudo importar ({resultado['error']})")
+            fallas += 1
+            continue
+
+        excedido = resultado['segundos'] > args.presupuesto
+        marca = "❌" if excedido or resultado['pesados'] else "✅"
+        print(f"{marca} {modulo}: {resultado['segundos'] * 1000:.0f} ms de importación, "
+              f"{resultado['total'] * 1000:.0f} ms con el arranque del intérprete")
+        if resultado['pesados']:
+            print(f"   cargó módulos pesados: {', '.join(resultado['pesados'])}")
+        for microsegundos, nombre in resultado['lentos']:
+            print(f"   {microsegundos / 1000:8.1f} ms  {nombre}")
+        fallas += excedido or bool(resultado['pesados'])
+
+    if fallas:
+        print(f"\n❌ {fallas} módulo(s) fuera del presupuesto de {args.presupuesto:.2f}s")
+        sys.exit(1)
+    print(f"\n✅ Todo dentro del presupuesto de {args.presupuesto:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
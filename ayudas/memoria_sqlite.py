@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+"""
+🗃️ MEMORIA DE APRENDIZAJE EN SQLITE (WAL, VARIOS PROCESOS)
+===========================================================
+Alternativa a memoria_aprendizaje.json: dos sesiones de Streamlit o dos
+procesos del pool de lotes que escriben el mismo JSON se pisan entre sí.
+
+Con SQLite en modo WAL los lectores no bloquean a los escritores ni al revés,
+cada escritura es una transacción corta, y las búsquedas van por índice.
+Guarda lo mismo que el JSON:
+  - proveedores / medicamentos conocidos (en orden de aprendizaje)
+  - correcciones de caracteres OCR ("O" → "0", ...)
+  - nombres_completos (variante → {'nombre_correcto', 'apariciones', ...})
+
+Se activa con la variable de entorno MEMORIA_BACKEND=sqlite. La primera vez
+importa memoria_aprendizaje.json si existe; exportar()/importar() mantienen
+el formato JSON para respaldos y para descargar desde la interfaz.
+
+Uso:
+    from memoria_sqlite import AlmacenMemoriaSQLite
+
+    almacen = AlmacenMemoriaSQLite('memoria_aprendizaje.db')
+    almacen.agregar_nombre('proveedores', 'NUEVO PROVEEDOR SAS')
+    memoria = almacen.exportar()          # mismo dict que el JSON
+
+    python memoria_sqlite.py exportar respaldo.json
+    python memoria_sqlite.py importar memoria_aprendizaje.json
+"""
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+
+RUTA_BD_MEMORIA = 'memoria_aprendizaje.db'
+# Espera máxima por un bloqueo de escritura de otro proceso
+TIMEOUT_BLOQUEO_SEGUNDOS = 10
+
+TIPOS_NOMBRES = ('proveedores', 'medicamentos')
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS nombres_conocidos (
+    orden INTEGER PRIMARY KEY AUTOINCREMENT,
+    tipo TEXT NOT NULL,
+    nombre TEXT NOT NULL,
+    UNIQUE (tipo, nombre)
+);
+CREATE INDEX IF NOT EXISTS idx_nombres_tipo_orden ON nombres_conocidos (tipo, orden);
+
+CREATE TABLE IF NOT EXISTS correcciones (
+    error TEXT PRIMARY KEY,
+    correccion TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS nombres_completos (
+    variante TEXT PRIMARY KEY,
+    nombre_correcto TEXT,
+    info TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_nombres_completos_correcto ON nombres_completos (nombre_correcto);
+"""
+
+
+class AlmacenMemoriaSQLite:
+    """Memoria de aprendizaje en una base SQLite compartida (una conexión por hilo)"""
+
+    def __init__(self, ruta=RUTA_BD_MEMORIA):
+        self.ruta = str(ruta)
+        self._local = threading.local()
+        # CREATE ... IF NOT EXISTS: varios procesos pueden abrir la misma base a la vez
+        self._conexion().executescript(_ESQUEMA)
+
+    # ---------- Conexión ----------
+    def _conexion(self):
+        conexion = getattr(self._local, 'conexion', None)
+        if conexion is None:
+            # isolation_level=None: las transacciones se abren explícitamente
+            conexion = sqlite3.connect(self.ruta, timeout=TIMEOUT_BLOQUEO_SEGUNDOS, isolation_level=None)
+            conexion.execute("PRAGMA journal_mode=WAL")
+            conexion.execute("PRAGMA synchronous=NORMAL")
+            self._local.conexion = conexion
+        return conexion
+
+    def _transaccion(self):
+        return _Transaccion(self._conexion())
+
+    def cerrar(self):
+        conexion = getattr(self._local, 'conexion', None)
+        if conexion is not None:
+            conexion.close()
+            self._local.conexion = None
+
+    # ---------- Nombres conocidos ----------
+    def nombres(self, tipo, desde_orden=0):
+        """
+        Nombres de un tipo en orden de aprendizaje.
+
+        Returns:
+            (nombres, ultimo_orden): con desde_orden solo los agregados después
+            (para refrescar una lista en memoria con lo que aprendieron otros procesos)
+        """
+        filas = self._conexion().execute(
+            "SELECT orden, nombre FROM nombres_conocidos WHERE tipo = ? AND orden > ? ORDER BY orden",
+            (tipo, desde_orden)
+        ).fetchall()
+        ultimo = filas[-1][0] if filas else desde_orden
+        return [nombre for _, nombre in filas], ultimo
+
+    def agregar_nombre(self, tipo, nombre):
+        """Agrega un nombre conocido; False si ya estaba"""
+        with self._transaccion() as conexion:
+            cursor = conexion.execute(
+                "INSERT OR IGNORE INTO nombres_conocidos (tipo, nombre) VALUES (?, ?)", (tipo, nombre)
+            )
+            return cursor.rowcount > 0
+
+    def agregar_nombres(self, tipo, nombres):
+        """Agrega varios nombres en una sola transacción (los repetidos se ignoran)"""
+        with self._transaccion() as conexion:
+            conexion.executemany(
+                "INSERT OR IGNORE INTO nombres_conocidos (tipo, nombre) VALUES (?, ?)",
+                ((tipo, nombre) for nombre in nombres)
+            )
+
+    def _reemplazar_nombres(self, conexion, tipo, nombres):
+        conexion.execute("DELETE FROM nombres_conocidos WHERE tipo = ?", (tipo,))
+        conexion.executemany(
+            "INSERT OR IGNORE INTO nombres_conocidos (tipo, nombre) VALUES (?, ?)",
+            ((tipo, nombre) for nombre in nombres)
+        )
+
+    # ---------- Correcciones OCR ----------
+    def correcciones(self):
+        filas = self._conexion().execute("SELECT error, correccion FROM correcciones ORDER BY rowid").fetchall()
+        return dict(filas)
+
+    def guardar_correcciones(self, correcciones):
+        """Agrega o actualiza correcciones (no borra las existentes)"""
+        with self._transaccion() as conexion:
+            conexion.executemany(
+                "INSERT INTO correcciones (error, correccion) VALUES (?, ?) "
+                "ON CONFLICT(error) DO UPDATE SET correccion = excluded.correccion",
+                correcciones.items()
+            )
+
+    # ---------- Nombres completos ----------
+    def nombre_completo(self, variante):
+        """Info aprendida para una variante, o None"""
+        fila = self._conexion().execute(
+            "SELECT info FROM nombres_completos WHERE variante = ?", (variante,)
+        ).fetchone()
+        return json.loads(fila[0]) if fila else None
+
+    def guardar_nombre_completo(self, variante, info):
+        with self._transaccion() as conexion:
+            conexion.execute(
+                "INSERT INTO nombres_completos (variante, nombre_correcto, info) VALUES (?, ?, ?) "
+                "ON CONFLICT(variante) DO UPDATE SET nombre_correcto = excluded.nombre_correcto, "
+                "info = excluded.info",
+                (variante, info.get('nombre_correcto'), json.dumps(info, ensure_ascii=False))
+            )
+
+    def guardar_nombres_completos(self, nombres_completos):
+        """Agrega o actualiza varias variantes (las demás no se tocan)"""
+        with self._transaccion() as conexion:
+            conexion.executemany(
+                "INSERT INTO nombres_completos (variante, nombre_correcto, info) VALUES (?, ?, ?) "
+                "ON CONFLICT(variante) DO UPDATE SET nombre_correcto = excluded.nombre_correcto, "
+                "info = excluded.info",
+                ((variante, (info or {}).get('nombre_correcto'), json.dumps(info or {}, ensure_ascii=False))
+                 for variante, info in nombres_completos.items())
+            )
+
+    def nombres_completos(self):
+        filas = self._conexion().execute("SELECT variante, info FROM nombres_completos ORDER BY rowid").fetchall()
+        return {variante: json.loads(info) for variante, info in filas}
+
+    # ---------- Importación / exportación JSON ----------
+    def vacia(self):
+        conexion = self._conexion()
+        return not any(
+            conexion.execute(f"SELECT 1 FROM {tabla} LIMIT 1").fetchone()
+            for tabla in ('nombres_conocidos', 'correcciones', 'nombres_completos')
+        )
+
+    def vaciar(self):
+        """Borra toda la memoria (nombres, correcciones y nombres completos)"""
+        with self._transaccion() as conexion:
+            for tabla in ('nombres_conocidos', 'correcciones', 'nombres_completos'):
+                conexion.execute(f"DELETE FROM {tabla}")
+
+    def exportar(self):
+        """La memoria completa con el mismo formato que memoria_aprendizaje.json"""
+        return {
+            'proveedores': self.nombres('proveedores')[0],
+            'medicamentos': self.nombres('medicamentos')[0],
+            'correcciones': self.correcciones(),
+            'nombres_completos': self.nombres_completos(),
+        }
+
+    def importar(self, memoria):
+        """
+        Carga un dict con el formato del JSON. Cada sección presente reemplaza
+        a la guardada; las secciones ausentes no se tocan.
+        """
+        with self._transaccion() as conexion:
+            for tipo in TIPOS_NOMBRES:
+                if tipo in memoria:
+                    self._reemplazar_nombres(conexion, tipo, memoria[tipo] or [])
+            if 'correcciones' in memoria:
+                conexion.execute("DELETE FROM correcciones")
+                conexion.executemany(
+                    "INSERT OR REPLACE INTO correcciones (error, correccion) VALUES (?, ?)",
+                    (memoria['correcciones'] or {}).items()
+                )
+            if 'nombres_completos' in memoria:
+                conexion.execute("DELETE FROM nombres_completos")
+                conexion.executemany(
+                    "INSERT OR REPLACE INTO nombres_completos (variante, nombre_correcto, info) VALUES (?, ?, ?)",
+                    ((variante, (info or {}).get('nombre_correcto'), json.dumps(info or {}, ensure_ascii=False))
+                     for variante, info in (memoria['nombres_completos'] or {}).items())
+                )
+
+    def importar_json(self, ruta):
+        with open(ruta, 'r', encoding='utf-8') as f:
+            self.importar(json.load(f))
+
+    def exportar_json(self, ruta):
+        with open(ruta, 'w', encoding='utf-8') as f:
+            json.dump(self.exportar(), f, ensure_ascii=False, indent=2)
+
+
+class _Transaccion:
+    """BEGIN IMMEDIATE ... COMMIT/ROLLBACK (toma el bloqueo de escritura al empezar)"""
+
+    def __init__(self, conexion):
+        self.conexion = conexion
+
+    def __enter__(self):
+        self.conexion.execute("BEGIN IMMEDIATE")
+        return self.conexion
+
+    def __exit__(self, tipo_error, error, traza):
+        if tipo_error is None:
+            self.conexion.execute("COMMIT")
+        else:
+            self.conexion.execute("ROLLBACK")
+        return False
+
+
+def abrir_almacen(ruta=RUTA_BD_MEMORIA, ruta_json='memoria_aprendizaje.json'):
+    """Abre el almacén; si está vacío y hay un JSON previo, lo importa"""
+    almacen = AlmacenMemoriaSQLite(ruta)
+    if almacen.vacia() and Path(ruta_json).exists():
+        try:
+            almacen.importar_json(ruta_json)
+            print(f"✅ Memoria importada de {ruta_json} a {ruta}")
+        except (OSError, ValueError) as e:
+            print(f"⚠️ No se pudo importar {ruta_json}: {e}")
+    return almacen
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Importar/exportar la memoria SQLite como JSON")
+    parser.add_argument('accion', choices=['exportar', 'importar'])
+    parser.add_argument('archivo_json', type=Path)
+    parser.add_argument('--bd', default=RUTA_BD_MEMORIA, help="Base SQLite de la memoria")
+    args = parser.parse_args()
+
+    almacen = AlmacenMemoriaSQLite(args.bd)
+    if args.accion == 'exportar':
+        almacen.exportar_json(args.archivo_json)
+        print(f"✅ Memoria exportada a {args.archivo_json}")
+    else:
+        almacen.importar_json(args.archivo_json)
+        print(f"✅ Memoria importada desde {args.archivo_json}")
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+🧾 MODELOS PYDANTIC DE VALIDACIÓN (CARTERA, MEDICAMENTOS, PROVEEDORES)
+=======================================================================
+Vivían en app.py y se definían al importarlo, así que todo proceso que
+importara app.py (el pool de lotes, el CLI) cargaba Pydantic y construía el
+TypeAdapter de cartera aunque nunca validara una tabla.
+
+app.py importa este módulo recién en la primera validación
+(app.obtener_modelos_validacion()). Los validadores corrigen nombres y montos
+con la MemoriaInteligente del proceso, que app.py entrega con configurar().
+
+Uso:
+    from app import obtener_modelos_validacion
+
+    modelos = obtener_modelos_validacion()
+    filas = modelos.ADAPTADOR_FILAS_CARTERA.validate_python(datos, context={'lote': True})
+"""
+
+import re
+from typing import List
+
+from pydantic import (BaseModel, validator, field_validator, Field,
+                      TypeAdapter, ValidationError, ValidationInfo)
+
+# Función que retorna la MemoriaInteligente del proceso (ver configurar)
+_obtener_memoria = None
+
+
+def configurar(obtener_memoria):
+    """Indica de dónde sacan los validadores la MemoriaInteligente (lo hace app.py)"""
+    global _obtener_memoria
+    _obtener_memoria = obtener_memoria
+
+
+def _memoria():
+    if _obtener_memoria is None:
+        # Importado sin pasar por app.obtener_modelos_validacion()
+        from app import obtener_memoria_inteligente
+        configurar(obtener_memoria_inteligente)
+    return _obtener_memoria()
+
+
+class FilaCarteraEdades(BaseModel):
+    """Modelo para validar filas de cartera por edades"""
+    documento: str = Field(..., description="Número de documento")
+    proveedor: str = Field(..., description="Nombre del proveedor")
+    corriente: float = Field(default=0.0, description="Valor corriente")
+    de_1_a_30: float = Field(default=0.0, description="Valor de 1 a 30 días")
+    de_31_a_60: float = Field(default=0.0, description="Valor de 31 a 60 días")
+    de_61_a_90: float = Field(default=0.0, description="Valor de 61 a 90 días")
+    de_91_o_mas: float = Field(default=0.0, description="Valor de 91 días o más")
+    total: float = Field(default=0.0, description="Valor total")
+
+    @field_validator('proveedor')
+    @classmethod
+    def corregir_proveedor(cls, v, info: ValidationInfo):
+        # En lote (validar_filas_cartera) los proveedores llegan ya corregidos
+        if (info.context or {}).get('lote'):
+            return v
+        memoria = _memoria()
+        return memoria.corregir_nombre(v, memoria.proveedores_conocidos)
+
+    @field_validator('corriente', 'de_1_a_30', 'de_31_a_60', 'de_61_a_90', 'de_91_o_mas', 'total', mode='before')
+    @classmethod
+    def limpiar_valores_monetarios(cls, v):
+        return _memoria().limpiar_numero(v)
+
+    @field_validator('total')
+    @classmethod
+    def validar_total(cls, v, info: ValidationInfo):
+        # Validar que el total sea consistente con la suma de los componentes
+        values = info.data
+        componentes = [
+            values.get('corriente', 0),
+            values.get('de_1_a_30', 0),
+            values.get('de_31_a_60', 0),
+            values.get('de_61_a_90', 0),
+            values.get('de_91_o_mas', 0)
+        ]
+        suma_calculada = sum(componentes)
+
+        # Si hay diferencia significativa (>1%), usar la suma calculada
+        if abs(v - suma_calculada) > max(v * 0.01, 1):
+            # En lote la corrección queda en los diagnósticos de la fila
+            if not (info.context or {}).get('lote'):
+                print(f"🔧 Total corregido: {v} → {suma_calculada} (suma de componentes)")
+            return suma_calculada
+
+        return v
+
+
+# Valida una lista completa de filas en una sola llamada (ver app.validar_filas_cartera)
+ADAPTADOR_FILAS_CARTERA = TypeAdapter(List[FilaCarteraEdades])
+
+
+class DatosMedicamento(BaseModel):
+    """Modelo para validar datos de medicamentos"""
+    codigo: str = Field(..., description="Código del medicamento")
+    descripcion: str = Field(..., description="Descripción del medicamento")
+    cantidad: str = Field(default="", description="Cantidad prescrita")
+    posologia: str = Field(default="", description="Instrucciones de uso")
+    dias: str = Field(default="", description="Días de tratamiento")
+
+    @validator('descripcion')
+    def corregir_medicamento(cls, v):
+        memoria = _memoria()
+        return memoria.corregir_nombre(v, memoria.medicamentos_conocidos, umbral=70)
+
+    @validator('codigo')
+    def validar_codigo(cls, v):
+        # Códigos de medicamentos suelen ser numéricos
+        if v and not re.match(r'^\d+$', v.replace(' ', '')):
+            # Intentar limpiar caracteres no numéricos
+            codigo_limpio = re.sub(r'[^0-9]', '', v)
+            if len(codigo_limpio) >= 6:
+                print(f"🔧 Código corregido: '{v}' → '{codigo_limpio}'")
+                return codigo_limpio
+        return v
+
+
+class DatosProveedor(BaseModel):
+    """Modelo para validar datos de proveedores"""
+    nombre: str = Field(..., description="Nombre del proveedor")
+    nit: str = Field(default="", description="NIT del proveedor")
+    direccion: str = Field(default="", description="Dirección")
+    telefono: str = Field(default="", description="Teléfono")
+
+    @validator('nombre')
+    def corregir_proveedor(cls, v):
+        memoria = _memoria()
+        return memoria.corregir_nombre(v, memoria.proveedores_conocidos)
+
+    @validator('nit')
+    def limpiar_nit(cls, v):
+        if v:
+            # Limpiar NIT: solo números y guión
+            nit_limpio = re.sub(r'[^0-9\-]', '', v)
+            return nit_limpio
+        return v
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+🔧 REGISTRO DE MOTORES OCR (POOL POR PROCESO)
+==============================================
+Carga PaddleOCR y EasyOCR una sola vez por proceso y reutiliza los lectores
+en todas las llamadas. Cargar los modelos toma varios segundos, así que crear
+un lector nuevo por documento dominaba el tiempo de los lotes.
+
+Uso:
+    from motores_ocr import obtener_paddleocr, obtener_easyocr, precalentar_motores
+
+    ocr = obtener_paddleocr()          # se carga la primera vez, luego se reutiliza
+    with bloqueo_motor(ocr):           # la inferencia no es segura entre hilos
+        resultado = ocr.ocr(img_array, cls=True)
+
+    precalentar_motores()              # opcional: cargar todo al arrancar la app
+"""
+
+import threading
+
+# Configuración por defecto de cada motor (la misma que se usaba en app.py)
+CONFIG_PADDLEOCR = {'use_angle_cls': True, 'lang': 'es', 'show_log': False}
+CONFIG_EASYOCR = {'idiomas': ('es', 'en'), 'gpu': False, 'verbose': False}
+
+_motores = {}
+_candados = {}
+_candados_uso = {}
+_candado_registro = threading.Lock()
+
+
+def _candado_para(clave):
+    """Retorna el candado propio de un motor (uno por clave)"""
+    with _candado_registro:
+        if clave not in _candados:
+            _candados[clave] = threading.Lock()
+        return _candados[clave]
+
+
+def _obtener_motor(clave, fabrica):
+    """
+    Retorna el motor registrado bajo `clave`, creándolo con `fabrica()` la primera vez.
+    Usa doble verificación para que solo un hilo cargue el modelo.
+    """
+    motor = _motores.get(clave)
+    if motor is not None:
+        return motor
+
+    with _candado_para(clave):
+        motor = _motores.get(clave)
+        if motor is None:
+            motor = fabrica()
+            _motores[clave] = motor
+            _candados_uso[id(motor)] = threading.Lock()
+        return motor
+
+
+def bloqueo_motor(motor):
+    """
+    Candado de inferencia del motor compartido. PaddleOCR y EasyOCR no garantizan
+    llamadas concurrentes sobre el mismo lector, así que los hilos se turnan.
+    """
+    candado = _candados_uso.get(id(motor))
+    if candado is None:
+        with _candado_registro:
+            candado = _candados_uso.setdefault(id(motor), threading.Lock())
+    return candado
+
+
+def obtener_paddleocr(lang=None, use_angle_cls=None):
+    """
+    Retorna un lector PaddleOCR compartido por todo el proceso.
+    Lanza ImportError si paddleocr no está instalado.
+    """
+    lang = lang or CONFIG_PADDLEOCR['lang']
+    use_angle_cls = CONFIG_PADDLEOCR['use_angle_cls'] if use_angle_cls is None else use_angle_cls
+
+    def _crear():
+        from paddleocr import PaddleOCR
+        print(f"⏳ Cargando PaddleOCR (lang={lang})...")
+        return PaddleOCR(use_angle_cls=use_angle_cls, lang=lang, show_log=CONFIG_PADDLEOCR['show_log'])
+
+    return _obtener_motor(('paddleocr', lang, use_angle_cls), _crear)
+
+
+def obtener_easyocr(idiomas=None, gpu=None):
+    """
+    Retorna un lector EasyOCR compartido por todo el proceso.
+    Lanza ImportError si easyocr no está instalado.
+    """
+    idiomas = tuple(idiomas or CONFIG_EASYOCR['idiomas'])
+    gpu = CONFIG_EASYOCR['gpu'] if gpu is None else gpu
+
+    def _crear():
+        import easyocr
+        print(f"⏳ Cargando EasyOCR ({', '.join(idiomas)})...")
+        return easyocr.Reader(list(idiomas), gpu=gpu, verbose=CONFIG_EASYOCR['verbose'])
+
+    return _obtener_motor(('easyocr', idiomas, gpu), _crear)
+
+
+def precalentar_motores(motores=('paddleocr', 'easyocr')):
+    """
+    Carga los motores indicados al arrancar para que el primer documento no pague
+    el costo de inicialización. Los motores no instalados se omiten.
+
+    Returns:
+        Dict[str, bool]: motor -> True si quedó cargado
+    """
+    fabricas = {
+        'paddleocr': obtener_paddleocr,
+        'easyocr': obtener_easyocr,
+    }
+
+    estado = {}
+    for nombre in motores:
+        fabrica = fabricas.get(nombre)
+        if fabrica is None:
+            print(f"⚠️  Motor OCR desconocido: {nombre}")
+            estado[nombre] = False
+            continue
+        try:
+            fabrica()
+            estado[nombre] = True
+        except ImportError:
+            estado[nombre] = False
+        except Exception as e:
+            print(f"⚠️  No se pudo precalentar {nombre}: {e}")
+            estado[nombre] = False
+    return estado
+
+
+def motores_cargados():
+    """Lista las claves de los motores ya cargados en este proceso"""
+    return list(_motores.keys())
+
+
+def liberar_motores():
+    """Descarta los motores cargados (se recargarán en el próximo uso)"""
+    with _candado_registro:
+        _motores.clear()
+        _candados_uso.clear()
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+🔢 LIMPIEZA DE NÚMEROS POR COLUMNA (VECTORIZADA)
+=================================================
+MemoriaInteligente.limpiar_numero se llamaba celda por celda: en cada llamada
+recorría correcciones_aprendidas con str.replace, pasaba una regex y decidía
+el formato de miles con rfind/split. En un reporte de cartera con miles de
+filas eso son decenas de miles de llamadas Python.
+
+Aquí una columna completa (lista, arreglo NumPy o Series de pandas) se limpia
+de una vez:
+  - Las correcciones OCR y la regex de limpieza se aplican una sola vez sobre
+    todas las celdas unidas por un separador ('\\x00'), en C.
+  - La decisión de formato (1,234.56 / 1.234,56 / 1,5 / 1,234) y la validación
+    son operaciones de numpy.strings (numpy.char en NumPy 1.x) sobre el arreglo
+    completo.
+
+El resultado es el mismo de limpiar_numero celda por celda: vacíos y celdas sin
+dígitos → 0.0, y lo que float() no aceptaría → 0.0 marcado en la máscara de
+fallidos (en lugar de imprimir una advertencia por celda).
+
+Uso:
+    from numeros_columnas import limpiar_numeros
+
+    valores, fallidos = limpiar_numeros(df['Total'], correcciones_aprendidas)
+    df['Total'] = valores                 # Series si entró una Series
+    print(f"{fallidos.sum()} celdas no se pudieron convertir")
+"""
+
+import re
+import sys
+
+import numpy as np
+
+# Funciones vectorizadas de texto: ufuncs de numpy.strings (NumPy >= 2.0) o, en
+# NumPy 1.x, las equivalentes de numpy.char (mismo resultado, más lentas)
+_cadenas = getattr(np, 'strings', np.char)
+
+# Une las celdas de una columna en un solo texto (no sobrevive a la limpieza de nadie más)
+_SEPARADOR = '\x00'
+_NO_NUMERICO = re.compile(r'[^0-9.,\-\x00]')
+
+
+def _separar(valores):
+    """
+    Separa las celdas de texto (por limpiar) de las que ya son números.
+
+    Returns:
+        (textos, numeros, es_numero): textos de las celdas por limpiar, en
+        orden; numeros con el float de las celdas numéricas o vacías (→ 0.0)
+    """
+    arreglo = valores if isinstance(valores, np.ndarray) else np.asarray(valores, dtype=object)
+    if arreglo.dtype.kind in 'iufb':
+        return [], arreglo.astype(np.float64), np.ones(len(arreglo), dtype=bool)
+    if arreglo.dtype.kind == 'U':
+        return arreglo.tolist(), np.zeros(len(arreglo)), np.zeros(len(arreglo), dtype=bool)
+
+    lista = arreglo.tolist()
+    numeros = np.zeros(len(lista))
+    es_numero = np.zeros(len(lista), dtype=bool)
+    if set(map(type, lista)) <= {str}:
+        # Caso común (columna de OCR): un texto vacío termina en 0.0 igual tras la limpieza
+        return lista, numeros, es_numero
+
+    textos = []
+    for i, valor in enumerate(lista):
+        # Mismo orden de casos que limpiar_numero: falsy → 0.0, int/float → float, resto → str
+        if type(valor) is str:
+            if valor:
+                textos.append(valor)
+            else:
+                es_numero[i] = True
+        elif not valor:
+            es_numero[i] = True
+        elif isinstance(valor, (int, float)):
+            numeros[i] = float(valor)
+            es_numero[i] = True
+        else:
+            textos.append(str(valor))
+    return textos, numeros, es_numero
+
+
+def _limpiar_textos(textos, correcciones):
+    """Correcciones OCR + regex de limpieza sobre toda la columna en una pasada"""
+    unido = _SEPARADOR.join(textos)
+    if unido.count(_SEPARADOR) != len(textos) - 1:
+        # Alguna celda traía el separador: se le quita antes de unir
+        unido = _SEPARADOR.join(t.replace(_SEPARADOR, '') for t in textos)
+    for error, correccion in (correcciones or {}).items():
+        # Mismas sustituciones, en el mismo orden, que limpiar_numero por celda
+        if error and _SEPARADOR not in error and _SEPARADOR not in correccion:
+            unido = unido.replace(error, correccion)
+    return np.array(_NO_NUMERICO.sub('', unido).split(_SEPARADOR), dtype=str)
+
+
+def _normalizar_separadores(limpio):
+    """Deja un solo punto decimal según el formato de miles de cada celda"""
+    comas = _cadenas.count(limpio, ',')
+    puntos = _cadenas.count(limpio, '.')
+    ultima_coma = _cadenas.rfind(limpio, ',')
+    ultimo_punto = _cadenas.rfind(limpio, '.')
+    largo = _cadenas.str_len(limpio)
+
+    con_ambos = (comas > 0) & (puntos > 0)
+    formato_us = con_ambos & (ultimo_punto > ultima_coma)        # 1,234.56
+    formato_eu = con_ambos & (ultimo_punto < ultima_coma)        # 1.234,56
+    solo_coma = (comas > 0) & (puntos == 0)
+    coma_decimal = solo_coma & (comas == 1) & (largo - ultima_coma - 1 <= 2)   # 1,5
+    coma_miles = solo_coma & ~coma_decimal                        # 1,234
+
+    normalizado = limpio.copy()
+    if formato_us.any():
+        normalizado[formato_us] = _cadenas.replace(limpio[formato_us], ',', '')
+    if formato_eu.any():
+        sin_puntos = _cadenas.replace(limpio[formato_eu], '.', '')
+        normalizado[formato_eu] = _cadenas.replace(sin_puntos, ',', '.')
+    if coma_decimal.any():
+        normalizado[coma_decimal] = _cadenas.replace(limpio[coma_decimal], ',', '.')
+    if coma_miles.any():
+        normalizado[coma_miles] = _cadenas.replace(limpio[coma_miles], ',', '')
+    return normalizado
+
+
+def limpiar_numeros(valores, correcciones=None):
+    """
+    Versión por columna de MemoriaInteligente.limpiar_numero.
+
+    Args:
+        valores: lista, arreglo NumPy o Series de pandas (textos y/o números)
+        correcciones: dict error→corrección OCR (correcciones_aprendidas)
+
+    Returns:
+        (numeros, fallidos): float64 y máscara booleana de las celdas con
+        dígitos que no se pudieron convertir (quedan en 0.0). Si `valores` es
+        una Series, ambos son Series con el mismo índice.
+    """
+    textos, numeros, es_numero = _separar(valores)
+    fallidos = np.zeros(len(numeros), dtype=bool)
+
+    por_limpiar = ~es_numero
+    if por_limpiar.any():
+        normalizado = _normalizar_separadores(_limpiar_textos(textos, correcciones))
+
+        # Lo que float() acepta tras la limpieza: dígitos, a lo sumo un punto y
+        # a lo sumo un signo menos al inicio
+        largo = _cadenas.str_len(normalizado)
+        guiones = _cadenas.count(normalizado, '-')
+        puntos = _cadenas.count(normalizado, '.')
+        validos = ((largo - guiones - puntos > 0) & (puntos <= 1) &
+                   ((guiones == 0) | ((guiones == 1) & _cadenas.startswith(normalizado, '-'))))
+
+        convertidos = np.zeros(len(normalizado))
+        convertidos[validos] = normalizado[validos].astype(np.float64)
+        numeros[por_limpiar] = convertidos
+        # Celdas vacías tras la limpieza → 0.0 sin marcar, igual que limpiar_numero
+        fallidos[por_limpiar] = ~validos & (largo > 0)
+
+    # Si pandas no está importado, `valores` no puede ser una Series (no se importa por esto)
+    pd = sys.modules.get('pandas')
+    if pd is not None and isinstance(valores, pd.Series):
+        return (pd.Series(numeros, index=valores.index, name=valores.name),
+                pd.Series(fallidos, index=valores.index, name=valores.name))
+    return numeros, fallidos
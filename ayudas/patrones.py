@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+"""
+🔎 REGISTRO DE PATRONES REGEX Y ESCÁNER DE CAMPOS EN UNA PASADA
+================================================================
+Todos los patrones de extraer_datos y de los extractores especializados
+(HERINCO, Visión Integrados) compilados una sola vez al importar el módulo,
+agrupados por extractor. Antes cada re.search/re.findall recibía el patrón como
+cadena y pasaba por la caché interna de `re` en cada documento.
+
+Los campos genéricos (fechas, números de documento, cédulas, NIT, direcciones,
+teléfonos, emails, valores, cantidades, códigos, ciudades) se recolectan con
+escanear_campos(): una alternación de lookaheads encuentra en C la siguiente
+posición donde empieza algún campo, y ahí un solo match trae todos los campos
+que arrancan en esa posición. El resultado es idéntico a un re.findall por
+patrón (mismas coincidencias, mismo orden, sin solapamientos).
+
+Uso:
+    from patrones import PATRONES_GENERICOS, PATRONES_HERINCO, escanear_campos
+
+    match = PATRONES_HERINCO['documento'].search(texto)
+    campos = escanear_campos(texto_norm)  # {'cedula': [...], 'nit': [...], ...}
+"""
+
+import re
+
+# ============================================
+# PATRONES GENÉRICOS (extraer_datos)
+# ============================================
+
+PATRONES_GENERICOS = {
+    # Fechas
+    'fecha_dmy': re.compile(r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}'),
+    'fecha_iso': re.compile(r'\d{4}-\d{2}-\d{2}'),
+    'fecha_compacta': re.compile(r'\b(20\d{6})\b'),
+    'fecha_texto': re.compile(r'\d{1,2}\s+de\s+\w+\s+de\s+\d{4}'),
+    # Números de documento
+    'resolucion': re.compile(
+        r'(?:RESOLUCI[OÓ]N|RESOLUCION)\s*(?:No\.?|N[UÚ]MERO|NUM)?\s*[:.]?\s*([A-Z0-9-]{3,20})',
+        re.IGNORECASE | re.DOTALL
+    ),
+    'radicado': re.compile(
+        r'(?:RADICAD[OA]|RADICACI[OÓ]N)\s*(?:No\.?|N[UÚ]MERO)?[:.]?\s*([A-Z0-9-]{5,25})',
+        re.IGNORECASE | re.DOTALL
+    ),
+    'numero_documento': re.compile(r'(?:NO\.|N[UÚ]MERO|NUM\.?|#)\s*[:.]?\s*([A-Z0-9-]{3,20})'),
+    # Identificaciones
+    'cedula': re.compile(r'(?:C\.?C\.?|CEDULA|CED\.?|DOCUMENTO)\s*(?:No\.?)?[:.\s-]*([0-9.-]{7,15})'),
+    'nit': re.compile(r'NIT\s*(?:No\.?)?[:.]?\s*([0-9.-]{9,15})'),
+    # Nombres (3-5 palabras en MAYÚSCULAS); se busca sobre el texto sin normalizar
+    'nombre_completo': re.compile(r'\b([A-ZÁÉÍÓÚÑ]{3,}(?:\s+[A-ZÁÉÍÓÚÑ]{3,}){2,4})\b'),
+    # Direcciones
+    'direccion': re.compile(r'(?:DIRECCI[OÓ]N|DIR\.?)\s*[:.]?\s*([A-Z0-9ÁÉÍÓÚÑ#\-\s.,APTO]{10,120})'),
+    'direccion_formato': re.compile(
+        r'(?:CL|CLL|CALLE|KR|KRA|CARRERA|DG|DIAGONAL|TV|TRANSVERSAL)\.?\s+[0-9A-Z#\-\s]{3,60}(?:APTO|APT|APARTAMENTO)?\s*[0-9A-Z]*'
+    ),
+    # Contacto
+    'telefono': re.compile(r'(?:TEL[EÉ]FONO|TEL\.?|CELULAR|CEL\.?|M[OÓ]VIL)\s*[:.]?\s*([0-9\-\(\)\s]{7,15})'),
+    'email': re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'),
+    # Valores y cantidades
+    'valor_monetario': re.compile(r'(?:\$|COP|USD|EUR)\s*([0-9.,]+)|([0-9.,]+)\s*(?:PESOS|D[OÓ]LARES)'),
+    'area': re.compile(r'([0-9.,]+)\s*(?:M2|M²|METROS?\s+CUADRADOS?|MTS2)'),
+    'cantidad': re.compile(r'([0-9.,]+)\s*(KG|KILOS?|LITROS?|TONELADAS?|UNIDADES?|UND)'),
+    # Códigos y lugares
+    'codigo': re.compile(r'(?:C[OÓ]DIGO|COD\.?|REF\.?|REFERENCIA)\s*[:.]?\s*([A-Z0-9-]{5,20})'),
+    'ciudad': re.compile(r'(?:MUNICIPIO|CIUDAD)\s*[:.]?\s*([A-ZÁÉÍÓÚÑ\s]{3,30})'),
+    # Decisiones o estados
+    'decision_aprobado': re.compile(
+        r'\b(?:APROBA[DR]O|APRUEBA|ACEPTA[DR]O|AUTORIZA[DR]O|CONCEDE|OTORGA)\b', re.IGNORECASE
+    ),
+    'decision_negado': re.compile(r'\b(?:NEGA[DR]O|NIEGA|RECHAZA[DR]O|INADMITE|IMPROCEDENTE)\b', re.IGNORECASE),
+    'decision_pendiente': re.compile(r'\b(?:PENDIENTE|EN\s+PROCESO|EN\s+TR[AÁ]MITE)\b', re.IGNORECASE),
+}
+
+# ============================================
+# PATRONES HERINCO (extraer_datos_herinco)
+# ============================================
+
+PATRONES_HERINCO = {
+    'documento': re.compile(r'DOCUMENTO:\s*([A-Z]{1,3}[-\s]?\d{6,12})'),
+    'nombres': re.compile(r'NOMBRES:\s*([A-ZÁÉÍÓÚÑ][A-ZÁÉÍÓÚÑa-záéíóúñ\s]+?)(?=\n|FORMULA)'),
+    'formula': re.compile(r'FORMULA:\s*(\d{6,10})'),
+    'aseguradora': re.compile(r'ASEGURADORA:\s*([A-ZÁÉÍÓÚÑa-záéíóúñ\s]+?)(?=\n|NIVEL)'),
+    'nivel': re.compile(r'NIVEL:\s*(\d+)'),
+    'fecha': re.compile(r'FECHA:\s*\.?(\d{4})-(\d{2})-(\d{2})'),
+    'valor_cuota': re.compile(r'VALOR\s+CUOTA:\s*([O0]|\d+)'),
+    'codigo_interno': re.compile(r'CODIG[OÓ]\s+INTERNO:\s*(\d{6,10})'),
+    'direccion': re.compile(r'DIRECCION\s+([A-Z0-9][A-Z0-9\s#\-ÁÉÍÓÚÑ]+?)(?=TELEFONO|\n\s*TELEFONO)', re.IGNORECASE),
+    'telefono': re.compile(r'TELEFONO\s+(\d{6,10})'),
+    'celular': re.compile(r'CELULAR\s+(\d{10})'),
+    'sede_entrega': re.compile(r'SEDE\s+ENTREGA:\s*([A-ZÁÉÍÓÚÑa-záéíóúñ\s\-\.]+?)(?=\n|CIUDAD)'),
+    'ciudad': re.compile(r'CIUDAD:\s*([A-ZÁÉÍÓÚÑa-záéíóúñ\s]+?)(?=\s*-|\n|FECHA)'),
+    'fecha_formula': re.compile(r'FECHA\s+FORMULA:\s*[—–]?\s*(\d{4})-(\d{2})-(\d{2})'),
+    'regimen': re.compile(r'REGIMEN:\s*([A-ZÁÉÍÓÚÑa-záéíóúñ]+)'),
+    'codigo_ips': re.compile(r'CODIG[OÓ][\s_]+IPS:\s*0?(\d{11})'),
+    'descripcion_ips': re.compile(r'DESCRIPCI[OÓ]N\s+IPS:\s*[—–]?\s*((?:EPS\s+)?(?:IPS\s+)?[A-ZÁÉÍÓÚÑa-záéíóúñ\s]+?)(?=\n\n|INFORMACION|CODIGO)'),
+    'codigo_medico': re.compile(r'CODIGO\s+MEDICO\s+(\d{10})'),
+    'nombre_medico': re.compile(r'NOMBRE\s+MEDICO\s+[—–]?\s*([A-ZÁÉÍÓÚÑa-záéíóúñ\s]+?)(?=\n|CODIGO\s+CIE)'),
+    'codigo_cie': re.compile(r'CODIGO\s+CIE\s*[–-]\s*([A-Z0-9]{3,6})'),
+    'contrato': re.compile(r'CONTRATO\s+Ñ?([A-ZÁÉÍÓÚÑa-záéíóúñ\s\-]+?)(?=\n|COD\s+ATC)'),
+    'cod_atc': re.compile(r'COD\s+ATC\s+NUA\s+NOMBRE\s+GENERICO.*?\n([A-Z0-9]{7})', re.DOTALL),
+    'nua': re.compile(r'COD\s+ATC\s+NUA\s+NOMBRE\s+GENERICO.*?\n[A-Z0-9]{7}\s+\[?\s*(\d*)\s*\[?\s+', re.DOTALL),
+    'seccion_medicamento': re.compile(r'COD\s+ATC\s+NUA\s+NOMBRE\s+GENERICO\s+CAN\s+ENTR\s+CAN\s+PEND\s+FORMULACION\s*\n\s*\n\s*([A-Z0-9]{7})\s+\[?\s*(.+?)(?=\n\s*LOTE)', re.DOTALL),
+    'datos_medicamento': re.compile(r'(.+?)\s*\.\s*(\d+)\s+(\d+)\s+(DURANTE\s+\d+\s+D[IÍ]AS?)', re.DOTALL | re.IGNORECASE),
+}
+
+# ============================================
+# PATRONES VISIÓN INTEGRADOS (extraer_datos_vision_integrados)
+# ============================================
+
+PATRONES_VISION = {
+    'codigo_prestador': re.compile(r'C[oó]digo\s+del\s+Prestador:\s*0?(\d{11})', re.IGNORECASE),
+    'nit': re.compile(r'Nit:\s*(\d{9,12})', re.IGNORECASE),
+    'direccion': re.compile(r'Direcci[oó]n:\s*([A-Z0-9][A-Z0-9\s#]+?)(?=\n|Tel[eé]fono)', re.IGNORECASE),
+    'telefono': re.compile(r'Tel[eé]fono:\s*(\d{7,10})', re.IGNORECASE),
+    'web': re.compile(r'(www\.[a-z0-9\.]+\.com(?:\.co)?)', re.IGNORECASE),
+    'documento_paciente': re.compile(r'(CC|TI|CE|PA)\s*-\s*(\d{6,12})'),
+    'paciente': re.compile(r'Paciente:\s*([A-ZÁÉÍÓÚÑ][A-ZÁÉÍÓÚÑa-záéíóúñ\s]+?)(?=\n|\d{4})', re.IGNORECASE),
+    'fecha_ingreso': re.compile(r'(\d{4})/(\d{2})/(\d{2})\s+Hora\s+Ing:'),
+    'hora_ingreso': re.compile(r'Hora\s+Ing:\s*(\d{1,2}:\d{2})', re.IGNORECASE),
+    'ingreso': re.compile(r'Ingreso:\s*(\d{6,10})', re.IGNORECASE | re.DOTALL),
+    'ingreso_consulta_externa': re.compile(r'001\s*-\s*Consulta\s+Externa.*?(\d{7})', re.DOTALL),
+    'fecha_hora': re.compile(r'(\d{4})/(\d{2})/(\d{2})\s+(\d{1,2}:\d{2})'),
+    'fecha_nacimiento': re.compile(r'(\d{4})-(\d{2})-(\d{2})\s+Edad:'),
+    'edad': re.compile(r'Edad:\s*(\d+)\s+a[ñn]os', re.IGNORECASE),
+    'consecutivo_sexo': re.compile(r'(\d{7})\s+([MF])\s+'),
+    'sexo': re.compile(r'Sexo:\s*([MFmf])', re.IGNORECASE),
+    'cc_tipo_usuario': re.compile(r'CC(\d{8,10})\s+Tipo\s+Usuario:', re.IGNORECASE),
+    'tipo_usuario': re.compile(r'Tipo\s+Usuario:\s*([A-ZÁÉÍÓÚÑa-záéíóúñ]+)', re.IGNORECASE),
+    'numero_10_digitos': re.compile(r'(\d{10})'),
+    'estrato': re.compile(r'Estrato:\s*([A-ZÁÉÍÓÚÑa-záéíóúñ\s]+?)(?=\n|Municipio)', re.IGNORECASE),
+    'municipio': re.compile(r'Municipio:\s*([A-ZÁÉÍÓÚÑ]+)', re.IGNORECASE),
+    'campamento': re.compile(r'(CAMPAMENTO)'),
+    'barrio': re.compile(r'(\d{10})\s+Estrato:.*?\n\s*(N/A|[A-Z0-9][^\n]{0,50}?)\s+Estado\s+Civil', re.DOTALL | re.IGNORECASE),
+    'estado_civil': re.compile(r'Estado\s+Civil:\s*([A-ZÁÉÍÓÚÑa-záéíóúñ\s]*?)(?=\n|$)', re.IGNORECASE),
+    'ut_vision': re.compile(r'UT\s+VISION\s+INTEGRADOS\s+NORTE\s+CAUCA\s+SUB', re.IGNORECASE),
+    'rias_visual': re.compile(r'RIAS\s+VISUAL\s+NORTE\s+CAUCA\s+SUBDO', re.IGNORECASE),
+    'acompanante': re.compile(r'\n\s*(SOLA|[A-Z]+)\s+Tel\.\s+Acompa', re.IGNORECASE),
+    'sola': re.compile(r'\bSOLA\b'),
+    'tel_acompanante': re.compile(r'Tel\.\s+Acompa[ñn]ante:\s*(\d{10})', re.IGNORECASE),
+    'telefono_10_digitos': re.compile(r'\b(\d{10})\b'),
+    'dx_principal': re.compile(r'(H\d{3,4}\s*-\s*[A-ZÁÉÍÓÚÑa-záéíóúñ\s]+?)(?=\n|H\d{3})', re.IGNORECASE),
+    'dx_relacionado': re.compile(r'H\d{3,4}\s*-\s*[^\n]+\n\s*(H\d{3,4})', re.IGNORECASE),
+    'medico_conocido': re.compile(r'DIANA\s+CRISTINA\s+ARANGO\s+GUTIERREZ', re.IGNORECASE),
+    'medico_receta': re.compile(r'RECETA\s+MEDICA.*?\n.*?\n.*?\n\s*([A-ZÁÉÍÓÚÑ][A-ZÁÉÍÓÚÑa-záéíóúñ\s]+?)(?=\n|Datos)', re.DOTALL | re.IGNORECASE),
+    'codigo_medicamento': re.compile(r'(\d{9})'),
+    'hialuronato': re.compile(r'(HIALURONATO\s+DE\s+SODIO[^\n]+)', re.IGNORECASE),
+    'solucion_oftalmica': re.compile(r'(SOLUCION\s+OFTALMICA[^*]+)', re.IGNORECASE),
+    'gotero': re.compile(r'(GOTERO\s+EN\s+PEBD[^:]+)', re.IGNORECASE),
+    'cantidad_asterisco': re.compile(r'\*\s*(\d+)\s*\(([A-Z]+)\)'),
+    'cantidad': re.compile(r'(\d+)\s*\(([A-Z]+)\)'),
+    'posologia': re.compile(r'(APLICAR\s+\d+\s+GOTA\s+CADA\s+\d+\s+HORAS\s+EN[^\n]*)', re.IGNORECASE),
+    'ambos_ojos': re.compile(r'(AMBOS\s+OJOS)', re.IGNORECASE),
+    'dias': re.compile(r'Dias\s*:\s*([A-Z]+)', re.IGNORECASE),
+    'dias_horas_en': re.compile(r'HORAS\s+EN\s+(\d+)', re.IGNORECASE),
+}
+
+# ============================================
+# PATRONES DE PARES CLAVE-VALOR (extraer_pares_clave_valor)
+# ============================================
+
+PATRONES_PARES = {
+    # "Etiqueta: Valor" en la misma línea
+    'dos_puntos': re.compile(r'([A-ZÁÉÍÓÚÑ][a-záéíóúñA-ZÁÉÍÓÚÑ\s]{3,60}):\s*([^\n:]{3,250})'),
+    # "ETIQUETA — Valor"
+    'guion': re.compile(
+        r'([A-ZÁÉÍÓÚÑ][A-ZÁÉÍÓÚÑ\s]{4,50})\s*[—–]\s*([A-Za-z0-9áéíóúñÁÉÍÓÚÑ][A-Za-z0-9áéíóúñÁÉÍÓÚÑ\s.,:/-]{2,150})'
+    ),
+    # Valor que arrastra la siguiente etiqueta ("...   NIT:")
+    'etiqueta_siguiente': re.compile(r'\s{2,}[A-Z]{3,}:'),
+    'solo_guiones': re.compile(r'^[\s\-—–]+$'),
+    'fragmento_mayusculas': re.compile(r'^[A-Z\s]{1,15}$'),
+}
+
+REGISTRO_PATRONES = {
+    'generico': PATRONES_GENERICOS,
+    'herinco': PATRONES_HERINCO,
+    'vision': PATRONES_VISION,
+    'pares': PATRONES_PARES,
+}
+
+
+# ============================================
+# ESCÁNER DE CAMPOS GENÉRICOS (UNA PASADA)
+# ============================================
+
+# Campos que escanear_campos() recolecta sobre el texto normalizado, con la
+# condición que se cumple donde empieza cada coincidencia (primer carácter).
+# La condición evita probar el patrón completo en cada posición del texto.
+# Los patrones deben compilarse sin flags: se combinan en una sola expresión.
+CAMPOS_ESCANEO = {
+    'fecha_dmy': r'\d',
+    'fecha_iso': r'\d',
+    'fecha_compacta': r'2',
+    'fecha_texto': r'\d',
+    'numero_documento': r'NO\.|N[UÚ]M|#',
+    'cedula': r'C\.?C|CED|DOC',
+    'nit': r'NIT',
+    'direccion': r'DIR',
+    'direccion_formato': r'C[AL]|D[GI]|KR|T[RV]',
+    'telefono': r'TEL|CEL|M[OÓ]V',
+    'email': r'\b[A-Za-z0-9._%+-]+@',
+    'valor_monetario': r'[$\d.,]|COP|USD|EUR',
+    'area': r'[\d.,]',
+    'cantidad': r'[\d.,]',
+    'codigo': r'C[OÓ]D|REF',
+    'ciudad': r'MUN|CIU',
+}
+# Unión de las condiciones de arriba por primer carácter (una clase de
+# caracteres es mucho más rápida que alternar las 16); si se agrega un campo,
+# actualizarla
+INICIO_ALGUN_CAMPO = r'[\d#$.,CDEKMNRTU]|\b[A-Za-z0-9._%+-]+@'
+
+
+def _compilar_escaner(campos):
+    """
+    Arma las dos expresiones del escáner:
+      - `cualquiera`: (?=inicio)(?:(?=g0)(?=p0)|(?=g1)(?=p1)|...) → siguiente
+        posición donde empieza algún campo
+      - `todos`: (?:(?=(p0)))?(?:(?=(p1)))?... → en esa posición, todos los campos a la vez
+
+    Cada campo queda envuelto en un grupo de `todos`; sus grupos internos quedan
+    justo después. Retorna (cualquiera, todos, [(campo, grupo, num_grupos), ...]).
+    """
+    alternativas = []
+    opcionales = []
+    indices = []
+    grupo = 1
+    for campo, condicion in campos.items():
+        patron = PATRONES_GENERICOS[campo]
+        assert not patron.flags & ~re.UNICODE, f"El campo {campo} no puede llevar flags en el escáner"
+        alternativas.append(f'(?={condicion})(?=(?:{patron.pattern}))')
+        opcionales.append(f'(?:(?=({patron.pattern})))?')
+        indices.append((campo, grupo, patron.groups))
+        grupo += 1 + patron.groups
+    cualquiera = re.compile(f'(?={INICIO_ALGUN_CAMPO})(?:' + '|'.join(alternativas) + ')')
+    return cualquiera, re.compile(''.join(opcionales)), indices
+
+
+_CUALQUIERA, _TODOS, _INDICES_ESCANEO = _compilar_escaner(CAMPOS_ESCANEO)
+
+
+def escanear_campos(texto):
+    """
+    Recolecta todos los campos de CAMPOS_ESCANEO recorriendo el texto una vez.
+
+    Returns:
+        Dict[str, list]: por campo, lo mismo que re.findall(patron, texto):
+        cadenas si el patrón tiene 0 o 1 grupo, tuplas si tiene varios.
+    """
+    resultados = {campo: [] for campo in CAMPOS_ESCANEO}
+    if not texto:
+        return resultados
+
+    # Posición desde la que cada campo puede volver a coincidir (findall no solapa)
+    siguiente = [0] * len(_INDICES_ESCANEO)
+    posicion = 0
+    largo = len(texto)
+
+    while posicion <= largo:
+        candidato = _CUALQUIERA.search(texto, posicion)
+        if candidato is None:
+            break
+        inicio = candidato.start()
+        match = _TODOS.match(texto, inicio)
+        spans = match.regs
+
+        for k, (campo, grupo, num_grupos) in enumerate(_INDICES_ESCANEO):
+            fin = spans[grupo][1]
+            if fin < 0 or inicio < siguiente[k]:
+                continue
+            if num_grupos == 0:
+                valor = match.group(grupo)
+            elif num_grupos == 1:
+                valor = match.group(grupo + 1) or ''
+            else:
+                valor = tuple(match.group(g) or '' for g in range(grupo + 1, grupo + 1 + num_grupos))
+            resultados[campo].append(valor)
+            # Un match vacío no avanza; findall sigue en la posición siguiente
+            siguiente[k] = fin if fin > inicio else inicio + 1
+
+        posicion = inicio + 1
+
+    return resultados
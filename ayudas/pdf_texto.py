@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+📄 CAPA DE TEXTO NATIVA DE PDFs
+================================
+Muchos PDFs son generados digitalmente (facturas, reportes de cartera exportados
+desde el ERP) y ya traen el texto embebido. Leerlo directamente toma milisegundos,
+mientras que rasterizar + OCR toma segundos por página.
+
+Este módulo extrae, página por página, el texto y las posiciones de cada celda
+(en el mismo formato de elementos que usa la reconstrucción de tablas por coordenadas)
+y marca qué páginas tienen texto real. Las páginas escaneadas se dejan para OCR.
+
+Requiere pdfplumber (opcional). Si no está instalado, todas las páginas van a OCR.
+"""
+
+import importlib.util
+import io
+
+# pdfplumber (y pdfminer) se importan en la primera extracción, no al importar el módulo
+PDFPLUMBER_DISPONIBLE = importlib.util.find_spec('pdfplumber') is not None
+
+# Una página se considera "nativa" si trae al menos esta cantidad de caracteres alfanuméricos
+MIN_CARACTERES_NATIVOS = 40
+# Proporción mínima de caracteres legibles (descarta capas de texto basura / fuentes sin mapa)
+MIN_PROPORCION_LEGIBLE = 0.6
+
+
+def _es_texto_real(texto):
+    """Verifica que la capa de texto tenga contenido legible suficiente"""
+    sin_espacios = [c for c in texto if not c.isspace()]
+    if not sin_espacios:
+        return False
+    alfanumericos = sum(1 for c in sin_espacios if c.isalnum())
+    legibles = sum(1 for c in sin_espacios if c.isprintable() and c != '�')
+    return (alfanumericos >= MIN_CARACTERES_NATIVOS and
+            legibles / len(sin_espacios) >= MIN_PROPORCION_LEGIBLE)
+
+
+def _elementos_de_pagina(pagina, desplazamiento_y=0.0):
+    """
+    Convierte las palabras de la página en elementos {'texto','x','y','altura','confianza'}.
+    keep_blank_chars une las palabras separadas por un espacio normal en una sola celda,
+    y solo corta donde hay un hueco de columna.
+    """
+    elementos = []
+    palabras = pagina.extract_words(keep_blank_chars=True, x_tolerance=3, y_tolerance=3)
+    for palabra in palabras:
+        texto = palabra['text'].strip()
+        if not texto:
+            continue
+        altura = palabra['bottom'] - palabra['top']
+        elementos.append({
+            'texto': texto,
+            'x': (palabra['x0'] + palabra['x1']) / 2,
+            'y': desplazamiento_y + (palabra['top'] + palabra['bottom']) / 2,
+            'altura': altura,
+            'confianza': 1.0
+        })
+    return elementos
+
+
+def extraer_capa_texto(pdf_bytes, max_paginas=None):
+    """
+    Lee la capa de texto embebida del PDF.
+
+    Args:
+        pdf_bytes: contenido del PDF
+        max_paginas: límite de páginas (None = todas)
+
+    Returns:
+        List[dict] con una entrada por página:
+            {'numero': int, 'texto': str, 'elementos': [...], 'nativa': bool}
+        Lista vacía si pdfplumber no está disponible o el PDF no se puede abrir.
+    """
+    if not PDFPLUMBER_DISPONIBLE:
+        return []
+    import pdfplumber
+
+    paginas = []
+    try:
+        with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
+            desplazamiento_y = 0.0
+            for numero, pagina in enumerate(pdf.pages, 1):
+                if max_paginas and numero > max_paginas:
+                    break
+
+                texto = pagina.extract_text() or ''
+                nativa = _es_texto_real(texto)
+                # Las coordenadas Y se acumulan entre páginas para que las filas
+                # de páginas distintas nunca se agrupen juntas
+                elementos = _elementos_de_pagina(pagina, desplazamiento_y) if nativa else []
+                desplazamiento_y += float(pagina.height)
+
+                paginas.append({
+                    'numero': numero,
+                    'texto': texto,
+                    'elementos': elementos,
+                    'nativa': nativa
+                })
+                # Liberar caché interna de la página (objetos de caracteres)
+                pagina.flush_cache()
+    except Exception as e:
+        print(f"⚠️ No se pudo leer la capa de texto del PDF: {e}")
+        return []
+
+    return paginas
+
+
+def resumen_capa_texto(paginas):
+    """Cuenta páginas nativas vs escaneadas (para logs)"""
+    nativas = sum(1 for p in paginas if p['nativa'])
+    return {'nativas': nativas, 'escaneadas': len(paginas) - nativas}
@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+"""
+💾 PERSISTENCIA DE LA MEMORIA DE APRENDIZAJE (DIARIO + ESCRITURA ATÓMICA)
+=========================================================================
+Antes cada nombre aprendido reescribía memoria_aprendizaje.json completo (con
+indent=2): en una tabla de cartera con cientos de proveedores nuevos eso era
+I/O cuadrático, y un corte a mitad de escritura dejaba el JSON truncado.
+
+Ahora:
+  - Cada aprendizaje se agrega como una línea JSON a un diario
+    (memoria_aprendizaje.diario.jsonl), sin tocar el snapshot.
+  - El diario se compacta en el snapshot cada MAX_ENTRADAS_DIARIO entradas,
+    cada SEGUNDOS_ENTRE_COMPACTACIONES segundos, o al cerrar el proceso.
+  - Todo snapshot se escribe en un archivo temporal del mismo directorio y se
+    reemplaza con os.replace: quien lee ve el archivo viejo o el nuevo, nunca
+    uno a medias.
+  - Varios procesos (sesiones de Streamlit, el pool de lotes, el servidor de
+    extracción) comparten snapshot y diario. Cada leer-fusionar-escribir del
+    snapshot (actualizar_json) y cada operación del diario toman un candado
+    entre procesos sobre memoria_aprendizaje.json.lock, así nadie reescribe el
+    snapshot con lo que leyó antes de que otro lo cambiara, ni borra un diario
+    rotado con entradas que no leyó.
+
+Al cargar se aplica snapshot + diario, así que lo aprendido antes de un corte
+no se pierde aunque no se haya compactado.
+
+Uso:
+    from persistencia import DiarioAprendizaje, actualizar_json
+
+    diario = DiarioAprendizaje('memoria_aprendizaje.json')
+    diario.registrar('proveedores', 'NUEVO PROVEEDOR SAS')
+    if diario.necesita_compactar():
+        with diario.bloqueo:                   # rotar → snapshot → confirmar, sin cortes
+            entradas = diario.rotar()          # lo que hay en el diario (de todos los procesos)
+            actualizar_json('memoria_aprendizaje.json', lambda memoria: fusionar(memoria, entradas), {})
+            diario.confirmar_rotacion()
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+# Entradas en el diario que disparan una compactación
+MAX_ENTRADAS_DIARIO = 200
+# Tiempo máximo con entradas sin compactar
+SEGUNDOS_ENTRE_COMPACTACIONES = 30
+
+
+def escribir_json_atomico(ruta, datos, indent=2):
+    """Escribe `datos` como JSON en `ruta` vía archivo temporal + os.replace"""
+    ruta = Path(ruta)
+    descriptor, temporal = tempfile.mkstemp(dir=str(ruta.parent), prefix=f".{ruta.name}.", suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'w', encoding='utf-8') as f:
+            json.dump(datos, f, ensure_ascii=False, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporal, ruta)
+    except BaseException:
+        try:
+            os.unlink(temporal)
+        except OSError:
+            pass
+        raise
+
+
+def leer_json(ruta, defecto=None):
+    """Lee un JSON; retorna `defecto` si no existe"""
+    ruta = Path(ruta)
+    if not ruta.exists():
+        return defecto
+    with open(ruta, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class BloqueoArchivo:
+    """
+    Candado entre procesos sobre un archivo .lock (flock en POSIX, msvcrt en
+    Windows). Dentro del proceso es reentrante y también excluye a los demás
+    hilos; usar bloqueo_de(ruta) para compartir una sola instancia por archivo.
+    """
+
+    def __init__(self, ruta):
+        self.ruta = Path(ruta)
+        self._candado = threading.RLock()
+        self._nivel = 0
+        self._archivo = None
+
+    def _tomar(self):
+        self._archivo = open(self.ruta, 'a+b')
+        if fcntl is not None:
+            fcntl.flock(self._archivo.fileno(), fcntl.LOCK_EX)
+            return
+        while True:
+            try:
+                self._archivo.seek(0)
+                msvcrt.locking(self._archivo.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                # LK_LOCK se rinde tras ~10 s: otro proceso sigue compactando
+                continue
+
+    def _soltar(self):
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._archivo.fileno(), fcntl.LOCK_UN)
+            else:
+                self._archivo.seek(0)
+                msvcrt.locking(self._archivo.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._archivo.close()
+            self._archivo = None
+
+    def __enter__(self):
+        self._candado.acquire()
+        try:
+            if self._nivel == 0:
+                self._tomar()
+        except BaseException:
+            self._candado.release()
+            raise
+        self._nivel += 1
+        return self
+
+    def __exit__(self, *_):
+        self._nivel -= 1
+        try:
+            if self._nivel == 0:
+                self._soltar()
+        finally:
+            self._candado.release()
+        return False
+
+
+_bloqueos = {}
+_candado_bloqueos = threading.Lock()
+
+
+def bloqueo_de(ruta_snapshot):
+    """El BloqueoArchivo del proceso para `ruta_snapshot` (archivo <snapshot>.lock)"""
+    ruta = Path(ruta_snapshot).resolve()
+    with _candado_bloqueos:
+        if ruta not in _bloqueos:
+            _bloqueos[ruta] = BloqueoArchivo(ruta.with_name(f"{ruta.name}.lock"))
+        return _bloqueos[ruta]
+
+
+def actualizar_json(ruta, actualizar, defecto=None):
+    """
+    Lee el JSON de `ruta`, le aplica `actualizar(datos)` y lo reescribe (atómico),
+    todo con el candado entre procesos del archivo tomado.
+
+    Args:
+        actualizar: función (datos) → datos a escribir; si retorna None se
+            escriben los mismos `datos` (modificados en el lugar)
+        defecto: lo que recibe `actualizar` si el archivo no existe
+
+    Returns:
+        Lo que se escribió
+    """
+    with bloqueo_de(ruta):
+        datos = leer_json(ruta, defecto)
+        nuevos = actualizar(datos)
+        if nuevos is None:
+            nuevos = datos
+        escribir_json_atomico(ruta, nuevos)
+        return nuevos
+
+
+class DiarioAprendizaje:
+    """Diario de solo-agregar junto a un snapshot JSON"""
+
+    def __init__(self, ruta_snapshot, max_entradas=MAX_ENTRADAS_DIARIO,
+                 segundos=SEGUNDOS_ENTRE_COMPACTACIONES):
+        ruta_snapshot = Path(ruta_snapshot)
+        self.ruta = ruta_snapshot.with_name(f"{ruta_snapshot.stem}.diario.jsonl")
+        # Diario tomado por una compactación en curso (o interrumpida)
+        self.ruta_rotada = ruta_snapshot.with_name(f"{ruta_snapshot.stem}.diario.compactando.jsonl")
+        self.max_entradas = max_entradas
+        self.segundos = segundos
+        self.pendientes = 0
+        self._primera_pendiente = None
+        self._candado = threading.Lock()
+        # El mismo candado entre procesos que actualizar_json usa para el snapshot
+        self.bloqueo = bloqueo_de(ruta_snapshot)
+
+    def registrar(self, tipo, valor):
+        """Agrega una entrada al diario (una línea; el snapshot no se toca)"""
+        linea = json.dumps({'tipo': tipo, 'valor': valor}, ensure_ascii=False) + '\n'
+        # Con el candado entre procesos ninguna línea cae en un diario ya rotado y leído
+        with self.bloqueo, self._candado:
+            with open(self.ruta, 'a', encoding='utf-8') as f:
+                f.write(linea)
+            self.pendientes += 1
+            if self._primera_pendiente is None:
+                self._primera_pendiente = time.monotonic()
+
+    def necesita_compactar(self):
+        """True si hay muchas entradas pendientes o la más vieja ya esperó demasiado"""
+        if not self.pendientes:
+            return False
+        return (self.pendientes >= self.max_entradas or
+                time.monotonic() - self._primera_pendiente >= self.segundos)
+
+    @staticmethod
+    def _leer_entradas(ruta):
+        entradas = []
+        if not ruta.exists():
+            return entradas
+        with open(ruta, 'r', encoding='utf-8') as f:
+            for linea in f:
+                try:
+                    entrada = json.loads(linea)
+                except ValueError:
+                    # Última línea a medias tras un corte: se descarta
+                    continue
+                if isinstance(entrada, dict) and 'tipo' in entrada:
+                    entradas.append((entrada['tipo'], entrada.get('valor')))
+        return entradas
+
+    def entradas(self):
+        """Entradas aún no compactadas (incluye las de una compactación interrumpida)"""
+        with self.bloqueo:
+            return self._leer_entradas(self.ruta_rotada) + self._leer_entradas(self.ruta)
+
+    def rotar(self):
+        """
+        Toma el diario para compactarlo: lo renombra (los nuevos registros van a
+        un diario nuevo) y retorna todas sus entradas. Llamar a
+        confirmar_rotacion() después de escribir el snapshot, sin soltar
+        `bloqueo` entre medio (si no, otro proceso puede agregar al diario
+        rotado entradas que este no leyó y que confirmar_rotacion borraría).
+        """
+        with self.bloqueo, self._candado:
+            if self.ruta.exists():
+                if self.ruta_rotada.exists():
+                    # Quedó una rotación sin confirmar: se le agrega el diario actual
+                    with open(self.ruta_rotada, 'a', encoding='utf-8') as destino, \
+                            open(self.ruta, 'r', encoding='utf-8') as origen:
+                        destino.write(origen.read())
+                    os.unlink(self.ruta)
+                else:
+                    os.replace(self.ruta, self.ruta_rotada)
+            self.pendientes = 0
+            self._primera_pendiente = None
+        return self._leer_entradas(self.ruta_rotada)
+
+    def confirmar_rotacion(self):
+        """Borra el diario rotado (su contenido ya está en el snapshot)"""
+        with self.bloqueo:
+            try:
+                os.unlink(self.ruta_rotada)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+⚙️ PROCESAMIENTO DE LOTES EN PARALELO (POOL DE PROCESOS)
+=========================================================
+Reparte los archivos de un lote entre varios procesos y entrega los resultados
+a medida que terminan, para ir actualizando la barra de progreso.
+
+El OCR y la extracción son CPU-bound, así que los hilos no escalan por el GIL;
+con procesos cada archivo corre en su propio intérprete. Cada proceso carga sus
+propios motores OCR una sola vez (ver motores_ocr.py) y los reutiliza para todos
+los archivos que le toquen.
+
+Como cada proceso carga sus propios modelos de PaddleOCR y EasyOCR (cientos de MB
+por proceso), el pool usa a lo sumo 4 procesos aunque haya más núcleos. En una
+máquina con memoria de sobra se sube con la variable de entorno
+LOTES_MAX_PROCESOS (p.ej. LOTES_MAX_PROCESOS=8), o por llamada con max_procesos.
+
+Uso:
+    from procesamiento_lotes import ejecutar_en_procesos, procesar_archivo_lote
+
+    tareas = [(archivo.name, archivo.getvalue(), 2, 200) for archivo in archivos]
+    for indice, resultado, error in ejecutar_en_procesos(procesar_archivo_lote, tareas):
+        ...  # orden de finalización, no de entrada
+
+La función de trabajo debe estar definida a nivel de módulo (se envía por pickle)
+y sus argumentos/resultados deben ser serializables (bytes, dicts, listas).
+"""
+
+import io
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+# Máximo de procesos del pool: LOTES_MAX_PROCESOS o, por defecto, núcleos disponibles
+# hasta 4 (cada proceso carga sus propios modelos OCR en memoria)
+MAX_PROCESOS_LOTE = int(os.environ.get('LOTES_MAX_PROCESOS', '0')) or min(os.cpu_count() or 1, 4)
+# Tareas en vuelo por proceso: suficiente para no dejar procesos ociosos sin cargar todo el lote en memoria
+TAREAS_EN_VUELO_POR_PROCESO = 2
+
+
+def _inicializar_proceso():
+    """
+    Inicialización de cada proceso del pool. Limita los hilos internos de
+    torch/OpenMP/BLAS a uno por proceso: con N procesos cada uno lanzando N hilos
+    la CPU queda sobresuscrita y el lote va más lento que en serie.
+    """
+    for variable in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS'):
+        os.environ.setdefault(variable, '1')
+
+
+def _ejecutar_en_serie(funcion, tareas):
+    """Misma interfaz que ejecutar_en_procesos, sin pool (1 proceso o pool no disponible)"""
+    for indice, argumentos in enumerate(tareas):
+        try:
+            yield indice, funcion(*argumentos), None
+        except Exception as e:
+            yield indice, None, str(e)
+
+
+def ejecutar_en_procesos(funcion, tareas, max_procesos=None):
+    """
+    Ejecuta funcion(*argumentos) para cada tupla de `tareas` en un pool de procesos.
+
+    Args:
+        funcion: función de nivel de módulo (serializable con pickle)
+        tareas: iterable de tuplas de argumentos; se consume de a poco, así que
+            puede ser un generador (p.ej. entradas de un ZIP leídas bajo demanda)
+        max_procesos: tamaño del pool (por defecto MAX_PROCESOS_LOTE)
+
+    Yields:
+        (indice, resultado, error) en orden de finalización. `indice` es la
+        posición de la tarea en `tareas`; si la tarea falló, resultado es None y
+        error trae el mensaje. Un archivo con error no detiene a los demás.
+    """
+    max_procesos = max_procesos or MAX_PROCESOS_LOTE
+    if max_procesos <= 1:
+        yield from _ejecutar_en_serie(funcion, tareas)
+        return
+
+    # 'spawn' evita heredar por fork los hilos de Streamlit y los modelos ya cargados
+    contexto = multiprocessing.get_context('spawn')
+    limite_en_vuelo = max_procesos * TAREAS_EN_VUELO_POR_PROCESO
+
+    with ProcessPoolExecutor(max_workers=max_procesos, mp_context=contexto,
+                             initializer=_inicializar_proceso) as pool:
+        pendientes = {}
+
+        def _recoger(listos):
+            for futuro in listos:
+                indice = pendientes.pop(futuro)
+                try:
+                    yield indice, futuro.result(), None
+                except Exception as e:
+                    yield indice, None, str(e) or type(e).__name__
+
+        try:
+            for indice, argumentos in enumerate(tareas):
+                pendientes[pool.submit(funcion, *argumentos)] = indice
+                if len(pendientes) >= limite_en_vuelo:
+                    listos, _ = wait(pendientes, return_when=FIRST_COMPLETED)
+                    yield from _recoger(listos)
+
+            while pendientes:
+                listos, _ = wait(pendientes, return_when=FIRST_COMPLETED)
+                yield from _recoger(listos)
+        finally:
+            # Si quien consume deja de iterar, no se procesan las tareas que no arrancaron
+            for futuro in pendientes:
+                futuro.cancel()
+
+
+class _ArchivoEnMemoria(io.BytesIO):
+    """BytesIO con atributo `name`, como los archivos subidos a Streamlit"""
+
+    def __init__(self, nombre, contenido):
+        super().__init__(contenido)
+        self.name = nombre
+
+
+def procesar_archivo_lote(nombre, contenido, max_paginas, dpi, usar_llm=False, api_key_llm=None,
+                          modelo_llm="gpt-4o-mini"):
+    """
+    Trabajo de un archivo del lote (corre dentro del proceso del pool):
+    OCR + extracción de datos y tablas.
+
+    Returns:
+        dict: {'datos': dict, 'tablas': list, 'resultado_llm': dict|None}
+
+    Raises:
+        Exception: con el mensaje de error del OCR (se reporta por archivo)
+    """
+    # Importación diferida: el proceso hijo carga app.py solo al recibir trabajo
+    from app import procesar_archivo_individual, extraer_datos
+
+    archivo = _ArchivoEnMemoria(nombre, contenido)
+    texto, resultado_llm, error, imagen_original, elementos = procesar_archivo_individual(
+        archivo, max_paginas, dpi, usar_llm, api_key_llm, modelo_llm
+    )
+    if error:
+        raise Exception(error)
+
+    datos, tablas = extraer_datos(texto, nombre, imagen_original, elementos)
+    if imagen_original is not None:
+        imagen_original.close()
+
+    return {'datos': datos, 'tablas': tablas or [], 'resultado_llm': resultado_llm}
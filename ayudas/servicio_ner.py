@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+🧠 SERVICIO NER (spaCy) CARGADO UNA SOLA VEZ
+=============================================
+Antes se llamaba spacy.load("es_core_news_sm") en cada documento y se corría el
+pipeline completo (tagger, parser, lematizador, ...) aunque solo se usa doc.ents.
+
+Aquí el modelo se carga una vez por proceso, se dejan activos solo NER y lo que
+NER necesita (p.ej. un tok2vec compartido), y los lotes pasan por nlp.pipe.
+Los textos que son casi todo números (tablas de cartera, ventas) se saltan:
+ahí el NER solo encuentra basura que después se filtra.
+
+Uso:
+    from servicio_ner import extraer_entidades, extraer_entidades_lote
+
+    entidades = extraer_entidades(texto)                  # {'Persona_1': ..., 'Lugar_1': ...}
+    por_documento = extraer_entidades_lote([t1, t2, t3])  # una lista de dicts
+"""
+
+import re
+import threading
+
+MODELO_NER = "es_core_news_sm"
+# Límite de caracteres por documento (eficiencia)
+MAX_CARACTERES_NER = 100000
+# Documentos por lote en nlp.pipe
+TAMANO_LOTE_NER = 8
+# Proporción mínima de letras (sobre caracteres no blancos) para correr NER
+MIN_PROPORCION_LETRAS = 0.35
+# Máximo de entidades por tipo
+MAX_ENTIDADES_POR_TIPO = 10
+
+PALABRAS_BASURA = ['Email', 'Datos', 'Fecha', 'Hora', 'Ingreso', 'Dirección',
+                   'Estrato', 'Tel', 'Cantidad', 'Municipio']
+
+_nlp = None
+_candado = threading.Lock()
+
+
+def obtener_nlp():
+    """
+    Retorna el pipeline de spaCy recortado a NER (cargado una vez por proceso),
+    o None si spaCy o el modelo no están instalados.
+    """
+    global _nlp
+    if _nlp is not None:
+        return _nlp or None
+
+    with _candado:
+        if _nlp is None:
+            try:
+                import spacy
+                nlp = spacy.load(MODELO_NER)
+            except (ImportError, OSError):
+                _nlp = False
+                return None
+
+            # NER más los componentes que escucha (tok2vec compartido, si lo hay)
+            necesarios = {'ner'}
+            for nombre, componente in nlp.pipeline:
+                if 'ner' in getattr(componente, 'listening_components', []):
+                    necesarios.add(nombre)
+            nlp.select_pipes(enable=[nombre for nombre in nlp.pipe_names if nombre in necesarios])
+            print(f"✅ spaCy {MODELO_NER} cargado (componentes activos: {', '.join(nlp.pipe_names)})")
+            _nlp = nlp
+        return _nlp or None
+
+
+def es_texto_numerico(texto):
+    """True si el texto es mayormente números/símbolos (contenido de tabla)"""
+    sin_espacios = [c for c in texto if not c.isspace()]
+    if not sin_espacios:
+        return True
+    letras = sum(1 for c in sin_espacios if c.isalpha())
+    return letras / len(sin_espacios) < MIN_PROPORCION_LETRAS
+
+
+def entidades_de_doc(doc):
+    """Filtra y nombra las entidades de un Doc de spaCy (Persona_N, Lugar_N, ...)"""
+    entidades = {}
+
+    # Contadores para entidades múltiples
+    contadores = {
+        'PER': 1,   # Personas
+        'LOC': 1,   # Lugares
+        'ORG': 1,   # Organizaciones
+        'MISC': 1   # Misceláneos
+    }
+
+    for ent in doc.ents:
+        tipo = ent.label_
+        valor = ent.text.strip()
+
+        # Filtrar basura del OCR
+        # Rechazar entidades que son claramente errores
+        if len(valor) < 3:
+            continue
+
+        # Rechazar entidades con demasiados caracteres especiales
+        caracteres_especiales = len(re.findall(r'[^a-zA-Z0-9\s]', valor))
+        if caracteres_especiales > len(valor) / 3:
+            continue
+
+        # Rechazar entidades que son solo números o símbolos
+        if re.match(r'^[0-9\s\-._]+$', valor):
+            continue
+
+        # Rechazar fragmentos inútiles
+        if any(basura.lower() in valor.lower() for basura in PALABRAS_BASURA):
+            continue
+
+        # Mapear tipos de entidades a nombres amigables
+        if tipo == 'PER':  # Persona
+            # Solo agregar si parece un nombre real (al menos 2 palabras)
+            if len(valor.split()) >= 2:
+                clave = f'Persona_{contadores["PER"]}'
+                entidades[clave] = valor
+                contadores['PER'] += 1
+
+        elif tipo == 'LOC':  # Lugar/Ubicación
+            clave = f'Lugar_{contadores["LOC"]}'
+            entidades[clave] = valor
+            contadores['LOC'] += 1
+
+        elif tipo == 'ORG':  # Organización
+            # Solo si tiene al menos 2 palabras o es sigla reconocible
+            if len(valor.split()) >= 2 or (len(valor) >= 3 and valor.isupper()):
+                clave = f'Organizacion_{contadores["ORG"]}'
+                entidades[clave] = valor
+                contadores['ORG'] += 1
+
+        elif tipo == 'MISC':  # Otros
+            clave = f'Entidad_{contadores["MISC"]}'
+            entidades[clave] = valor
+            contadores['MISC'] += 1
+
+    # Limitar a las primeras 10 de cada tipo para no saturar
+    entidades_filtradas = {}
+    for key, value in entidades.items():
+        # Extraer el número del contador
+        partes = key.rsplit('_', 1)
+        if len(partes) == 2 and partes[1].isdigit():
+            if int(partes[1]) <= MAX_ENTIDADES_POR_TIPO:
+                entidades_filtradas[key] = value
+
+    return entidades_filtradas
+
+
+def extraer_entidades_lote(textos, tamano_lote=TAMANO_LOTE_NER):
+    """
+    NER de varios documentos en una sola pasada por nlp.pipe.
+
+    Returns:
+        List[dict]: entidades de cada texto, en el mismo orden ({} si se saltó o no hay spaCy)
+    """
+    resultados = [{} for _ in textos]
+    nlp = obtener_nlp()
+    if nlp is None:
+        return resultados
+
+    # Solo los textos con contenido de lenguaje natural pasan por el modelo
+    indices = [i for i, texto in enumerate(textos) if texto and not es_texto_numerico(texto)]
+    if not indices:
+        return resultados
+
+    try:
+        docs = nlp.pipe((textos[i][:MAX_CARACTERES_NER] for i in indices), batch_size=tamano_lote)
+        for i, doc in zip(indices, docs):
+            resultados[i] = entidades_de_doc(doc)
+    except Exception as e:
+        print(f"⚠️ Error en NER: {e}")
+    return resultados
+
+
+def extraer_entidades(texto):
+    """NER de un solo documento (ver extraer_entidades_lote)"""
+    return extraer_entidades_lote([texto])[0]
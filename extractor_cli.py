@@ -0,0 +1,266 @@
+"""
+🖥️ EXTRACTOR MAESTRO - EJECUCIÓN POR LÍNEA DE COMANDOS
+=======================================================
+Procesa carpetas, patrones glob o archivos ZIP sin abrir Streamlit, con la
+estrategia elegida y un pool de procesos. Los resultados se escriben a medida
+que cada archivo termina (JSONL, CSV o Parquet), así un lote largo que se corta
+conserva todo lo procesado hasta ese momento.
+
+Uso:
+    python extractor_cli.py facturas/ -o resultados.jsonl
+    python extractor_cli.py "scans/**/*.pdf" lote.zip -e RAPIDO -o salida.csv -p 8
+    python extractor_cli.py pendientes/ -o noche.parquet --max-paginas 5
+    python extractor_cli.py facturas/ -o r.jsonl --servidor http://127.0.0.1:8765
+"""
+
+import argparse
+import csv
+import glob
+import json
+import sys
+import time
+import zipfile
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from extractor_maestro import extraer_lote
+# extractor_maestro agrega ayudas/ al path
+from fuente_zip import EXTENSIONES_VALIDAS, FuenteZip
+
+ESTRATEGIAS = ["AUTO", "RAPIDO", "BALANCEADO", "PRECISO", "AZURE"]
+FORMATOS = {'.jsonl': 'jsonl', '.csv': 'csv', '.parquet': 'parquet'}
+
+# Columnas de la salida tabular (CSV/Parquet); los campos extraídos van como JSON
+COLUMNAS = ['archivo', 'estado', 'tiempo_s', 'error', 'campos']
+
+
+# ============================================
+# ENTRADAS
+# ============================================
+
+def _desde_zip(ruta: Path) -> Iterator[Tuple[str, bytes]]:
+    """Entradas de un ZIP leídas de a una (mismo filtro que la app, ver fuente_zip)"""
+    with FuenteZip(ruta) as fuente:
+        for archivo in fuente:
+            yield f"{ruta.name}::{archivo.ruta}", archivo.getvalue()
+
+
+def _rutas_de(entrada: str, recursivo: bool) -> List[Path]:
+    """Expande una entrada (carpeta, glob o archivo) a rutas ordenadas"""
+    ruta = Path(entrada)
+    if ruta.is_dir():
+        patron = '**/*' if recursivo else '*'
+        return sorted(p for p in ruta.glob(patron) if p.is_file())
+    if ruta.is_file():
+        return [ruta]
+    return sorted(Path(p) for p in glob.glob(entrada, recursive=True) if Path(p).is_file())
+
+
+def iterar_documentos(entradas: List[str], recursivo: bool = True) -> Iterator[Tuple[str, bytes]]:
+    """
+    Genera (nombre, bytes) para cada documento de las entradas, bajo demanda.
+    Los ZIP se abren y se recorren entrada por entrada.
+    """
+    vistos = set()
+    for entrada in entradas:
+        rutas = _rutas_de(entrada, recursivo)
+        if not rutas:
+            print(f"⚠️  Sin archivos para: {entrada}", file=sys.stderr)
+        for ruta in rutas:
+            clave = ruta.resolve()
+            if clave in vistos:
+                continue
+            vistos.add(clave)
+
+            if ruta.suffix.lower() == '.zip':
+                try:
+                    yield from _desde_zip(ruta)
+                except zipfile.BadZipFile as e:
+                    print(f"⚠️  ZIP inválido {ruta}: {e}", file=sys.stderr)
+            elif ruta.suffix.lower() in EXTENSIONES_VALIDAS:
+                yield str(ruta), ruta.read_bytes()
+
+
+# ============================================
+# SALIDAS (escritura incremental)
+# ============================================
+
+def _fila(resultado: Dict) -> Dict:
+    """Convierte un resultado del lote en una fila plana"""
+    return {
+        'archivo': resultado['nombre'],
+        'estado': resultado['tipo'],
+        'tiempo_s': round(float(resultado.get('tiempo') or 0.0), 3),
+        'error': resultado.get('error', ''),
+        'campos': json.dumps(resultado.get('datos', {}), ensure_ascii=False, default=str),
+    }
+
+
+class EscritorResultados:
+    """Escribe cada resultado apenas llega, en JSONL, CSV o Parquet"""
+
+    # Filas por grupo en Parquet (cada grupo queda en disco al completarse)
+    FILAS_POR_GRUPO_PARQUET = 50
+
+    def __init__(self, ruta: Path, formato: str):
+        self.ruta = ruta
+        self.formato = formato
+        self._archivo = None
+        self._csv = None
+        self._parquet = None
+        self._pendientes = []
+
+        if formato == 'parquet':
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise SystemExit("❌ Para Parquet instala pyarrow: pip install pyarrow")
+            self._pa = pa
+            self._esquema = pa.schema([
+                ('archivo', pa.string()), ('estado', pa.string()), ('tiempo_s', pa.float64()),
+                ('error', pa.string()), ('campos', pa.string())
+            ])
+            self._parquet = pq.ParquetWriter(str(ruta), self._esquema)
+        elif formato == 'csv':
+            self._archivo = open(ruta, 'w', encoding='utf-8-sig', newline='')
+            self._csv = csv.DictWriter(self._archivo, fieldnames=COLUMNAS)
+            self._csv.writeheader()
+        else:
+            self._archivo = open(ruta, 'w', encoding='utf-8')
+
+    def escribir(self, resultado: Dict):
+        if self.formato == 'jsonl':
+            registro = {
+                'archivo': resultado['nombre'],
+                'estado': resultado['tipo'],
+                'tiempo_s': round(float(resultado.get('tiempo') or 0.0), 3),
+                'error': resultado.get('error'),
+                'datos': resultado.get('datos'),
+            }
+            self._archivo.write(json.dumps(registro, ensure_ascii=False, default=str) + '\n')
+            self._archivo.flush()
+        elif self.formato == 'csv':
+            self._csv.writerow(_fila(resultado))
+            self._archivo.flush()
+        else:
+            self._pendientes.append(_fila(resultado))
+            if len(self._pendientes) >= self.FILAS_POR_GRUPO_PARQUET:
+                self._volcar_parquet()
+
+    def _volcar_parquet(self):
+        if self._pendientes:
+            tabla = self._pa.Table.from_pylist(self._pendientes, schema=self._esquema)
+            self._parquet.write_table(tabla)
+            self._pendientes = []
+
+    def cerrar(self):
+        if self._parquet is not None:
+            self._volcar_parquet()
+            self._parquet.close()
+        if self._archivo is not None:
+            self._archivo.close()
+
+
+# ============================================
+# EJECUCIÓN
+# ============================================
+
+def ejecutar(
+    entradas: List[str],
+    salida: Path,
+    estrategia: str = "AUTO",
+    procesos: Optional[int] = None,
+    dpi: int = 200,
+    max_paginas: Optional[int] = None,
+    recursivo: bool = True,
+    servidor: Optional[str] = None
+) -> Dict:
+    """
+    Procesa todos los documentos de las entradas y escribe los resultados en `salida`.
+    Con `servidor` (URL de servidor_extraccion.py) los documentos se envían al
+    servidor, que ya tiene los modelos cargados, en lugar del pool local.
+
+    Returns:
+        Estadísticas: {'total', 'ok', 'errores', 'segundos', 'docs_por_minuto'}
+    """
+    formato = FORMATOS.get(salida.suffix.lower())
+    if formato is None:
+        raise SystemExit(f"❌ Formato de salida no soportado: {salida.suffix} (usa .jsonl, .csv o .parquet)")
+
+    escritor = EscritorResultados(salida, formato)
+    inicio = time.time()
+    total = ok = errores = 0
+
+    try:
+        documentos = iterar_documentos(entradas, recursivo)
+        if servidor:
+            from servidor_extraccion import ClienteExtraccion
+            resultados = ClienteExtraccion(servidor).extraer_lote(
+                documentos, en_vuelo=procesos or 4, estrategia=estrategia, dpi=dpi, max_paginas=max_paginas
+            )
+        else:
+            resultados = extraer_lote(documentos, estrategia=estrategia, max_procesos=procesos,
+                                      dpi=dpi, max_paginas=max_paginas)
+        for _, resultado in resultados:
+            escritor.escribir(resultado)
+            total += 1
+            if resultado['tipo'] == 'error':
+                errores += 1
+                print(f"❌ {resultado['nombre']}: {resultado['error']}", file=sys.stderr)
+            else:
+                ok += 1
+
+            transcurrido = time.time() - inicio
+            print(f"[{total}] {resultado['nombre']} ({resultado.get('tiempo', 0.0):.1f}s) | "
+                  f"{total / transcurrido * 60:.1f} docs/min", flush=True)
+    finally:
+        escritor.cerrar()
+
+    segundos = time.time() - inicio
+    return {
+        'total': total,
+        'ok': ok,
+        'errores': errores,
+        'segundos': segundos,
+        'docs_por_minuto': (total / segundos * 60) if segundos > 0 else 0.0,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Extracción de documentos por lotes (sin interfaz)",
+    )
+    parser.add_argument('entradas', nargs='+', help="Carpetas, patrones glob, archivos o ZIPs")
+    parser.add_argument('-o', '--salida', required=True, type=Path,
+                        help="Archivo de resultados (.jsonl, .csv o .parquet)")
+    parser.add_argument('-e', '--estrategia', default="AUTO", choices=ESTRATEGIAS, type=str.upper)
+    parser.add_argument('-p', '--procesos', type=int, default=None,
+                        help="Procesos en paralelo (por defecto: núcleos disponibles, máx. 4; "
+                             "ver LOTES_MAX_PROCESOS)")
+    parser.add_argument('--dpi', type=int, default=200, help="Resolución de rasterizado para PDFs")
+    parser.add_argument('--max-paginas', type=int, default=None, help="Páginas por PDF (por defecto: todas)")
+    parser.add_argument('--no-recursivo', dest='recursivo', action='store_false',
+                        help="No entrar en subcarpetas")
+    parser.add_argument('--servidor', default=None, metavar='URL',
+                        help="Enviar a un servidor_extraccion.py ya iniciado (http://... o unix://...)")
+    args = parser.parse_args(argv)
+
+    print(f"🚀 Estrategia {args.estrategia} → {args.salida}")
+    if args.servidor:
+        print(f"🛰️  Usando servidor {args.servidor}")
+    stats = ejecutar(args.entradas, args.salida, args.estrategia, args.procesos,
+                     args.dpi, args.max_paginas, args.recursivo, args.servidor)
+
+    print("\n📊 Resumen")
+    print(f"   Documentos:  {stats['total']} ({stats['ok']} ok, {stats['errores']} con error)")
+    print(f"   Tiempo:      {stats['segundos']:.1f}s")
+    print(f"   Throughput:  {stats['docs_por_minuto']:.1f} docs/min")
+    if stats['total']:
+        print(f"   Promedio:    {stats['segundos'] / stats['total']:.2f}s por documento")
+
+    return 1 if stats['errores'] and not stats['ok'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -17,22 +17,38 @@ Estrategias disponibles:
 6. AUTO: Selección inteligente según tipo de documento
 """
 
+import atexit
+import importlib.util
 import os
 import sys
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional, Union
+from typing import Dict, Iterable, List, Tuple, Optional, Union
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from io import BytesIO
 from PIL import Image
-import pandas as pd
+
+# Los módulos del núcleo (app.py, motores_ocr.py) viven en ayudas/
+sys.path.insert(0, str(Path(__file__).resolve().parent / "ayudas"))
 
 # Importar módulos locales
 try:
+    from motores_ocr import precalentar_motores
+    from pdf_texto import extraer_capa_texto
+    from procesamiento_lotes import ejecutar_en_procesos
+    from servicio_ner import extraer_entidades_lote
+    from cache_ocr import huella_contenido
     from app import (
         ocr_imagen, 
         ocr_pdf_bytes, 
+        iterar_paginas_pdf,
         extraer_datos,
         extraer_tabla_con_easyocr,
+        leer_cajas_ocr,
+        leer_cajas_easyocr,
+        preprocesar_imagen_para_tablas,
+        redimensionar_para_ocr,
         cargar_memoria,
         guardar_memoria
     )
@@ -44,61 +60,199 @@ except ImportError as e:
 AZURE_DISPONIBLE = False
 try:
     from config import AZURE_ENDPOINT, AZURE_KEY
-    from azure.core.credentials import AzureKeyCredential
-    from azure.ai.formrecognizer import DocumentAnalysisClient
-    AZURE_DISPONIBLE = True
+    # El SDK se importa al crear el cliente (obtener_cliente_azure), no al arrancar
+    AZURE_DISPONIBLE = importlib.util.find_spec('azure.ai.formrecognizer') is not None
 except ImportError:
+    pass
+if not AZURE_DISPONIBLE:
     print("ℹ️  Azure Document Intelligence no disponible (falta instalación o config.py)")
 
 
+# Segundos máximos por motor en COMPARAR (los motores que se pasan se reportan como error)
+TIMEOUT_MOTOR_COMPARAR = float(os.environ.get('TIMEOUT_MOTOR_COMPARAR', '120'))
+
+# Cliente Azure compartido por el proceso (None = sin crear, False = no disponible)
+_cliente_azure = None
+_candado_azure = threading.Lock()
+
+
+def obtener_cliente_azure():
+    """
+    Retorna el cliente de Azure Document Intelligence del proceso (creado una vez,
+    así sus conexiones HTTP se reutilizan entre documentos), o None si Azure no
+    está instalado o configurado.
+    """
+    global _cliente_azure
+    if _cliente_azure is not None:
+        return _cliente_azure or None
+    
+    with _candado_azure:
+        if _cliente_azure is None:
+            _cliente_azure = False
+            if AZURE_DISPONIBLE and AZURE_ENDPOINT and AZURE_KEY:
+                try:
+                    from azure.core.credentials import AzureKeyCredential
+                    from azure.ai.formrecognizer import DocumentAnalysisClient
+                    _cliente_azure = DocumentAnalysisClient(
+                        endpoint=AZURE_ENDPOINT,
+                        credential=AzureKeyCredential(AZURE_KEY)
+                    )
+                    print("✅ Cliente Azure Document Intelligence inicializado")
+                except Exception as e:
+                    print(f"⚠️  Error inicializando Azure: {e}")
+    return _cliente_azure or None
+
+
+class ContextoDocumento:
+    """
+    Todo lo que se lee de una imagen durante una extracción, calculado una sola vez.
+    
+    Las estrategias se encadenan (AUTO clasifica con Tesseract y luego delega en
+    BALANCEADO, PaddleOCR o EasyOCR; los métodos caen a Tesseract si fallan). Cada
+    etapa lee de aquí el texto, las versiones preprocesadas o las cajas con
+    coordenadas en vez de volver a hacer OCR de la misma imagen.
+    
+    Es seguro entre hilos (COMPARAR corre los motores a la vez): si dos etapas piden
+    el mismo dato, la segunda espera a que termine la primera en lugar de recalcularlo.
+    """
+    
+    def __init__(self, imagen: Image.Image, modo_ocr: Optional[str] = None):
+        self.imagen = imagen
+        self.modo_ocr = modo_ocr
+        self._valores = {}
+        self._candados = {}
+        self._candado = threading.Lock()
+    
+    def _memo(self, nombre: str, calcular):
+        """Retorna el valor `nombre`, calculándolo con `calcular()` la primera vez"""
+        if nombre in self._valores:
+            return self._valores[nombre]
+        with self._candado:
+            candado = self._candados.setdefault(nombre, threading.Lock())
+        with candado:
+            if nombre not in self._valores:
+                self._valores[nombre] = calcular()
+            return self._valores[nombre]
+    
+    @property
+    def huella(self) -> str:
+        """Hash del contenido de la imagen para las claves de caché OCR (se calcula una vez)"""
+        return self._memo('huella', lambda: huella_contenido(self.imagen))
+    
+    @property
+    def versiones(self) -> List[Tuple[str, Image.Image]]:
+        """Versiones preprocesadas (contraste, binarizadas, ...) de la imagen redimensionada"""
+        return self._memo('versiones', lambda: preprocesar_imagen_para_tablas(redimensionar_para_ocr(self.imagen)))
+    
+    @property
+    def texto(self) -> str:
+        """Texto de Tesseract (la mejor variante); las versiones solo se generan si no hay caché"""
+        return self._memo('texto', lambda: ocr_imagen(self.imagen, modo=self.modo_ocr, versiones=lambda: self.versiones,
+                                                      huella=self.huella))
+    
+    def datos_texto(self) -> Dict:
+        """Campos extraídos del texto de Tesseract (copia: cada estrategia puede agregar claves)"""
+        def _extraer():
+            resultado = extraer_datos(self.texto)
+            return resultado[0] if isinstance(resultado, tuple) else resultado
+        return dict(self._memo('datos_texto', _extraer))
+    
+    @property
+    def cajas(self) -> Dict:
+        """Cajas con coordenadas de PaddleOCR (o EasyOCR si Paddle no está): {'motor', 'elementos'}"""
+        return self._memo('cajas', lambda: leer_cajas_ocr(self.imagen, huella=self.huella))
+    
+    @property
+    def cajas_easyocr(self) -> List[Dict]:
+        """Cajas de EasyOCR; si `cajas` ya vino de EasyOCR se reutilizan"""
+        def _leer():
+            cajas = self._valores.get('cajas')
+            if cajas is not None and cajas['motor'] == 'EasyOCR':
+                return cajas['elementos']
+            return leer_cajas_easyocr(self.imagen, huella=self.huella)
+        return self._memo('cajas_easyocr', _leer)
+    
+    def tabla(self, num_columnas: int = 8) -> List[List[str]]:
+        """Filas de la tabla reconstruidas desde las cajas con coordenadas"""
+        return extraer_tabla_con_easyocr(self.imagen, num_columnas=num_columnas, cajas=self.cajas)
+
+
 class ExtractorMaestro:
     """
-    Clase unificada para extracción de documentos con múltiples estrategias
+    Clase unificada para extracción de documentos con múltiples estrategias.
+    Los métodos extraer_* aceptan una imagen o un ContextoDocumento; al encadenar
+    estrategias se pasa el contexto para no repetir OCR.
+    
+    Crearlo no carga nada: la memoria se lee del disco la primera vez que se usa y
+    el cliente Azure es el compartido del proceso (obtener_cliente_azure). Para
+    reutilizar una sola instancia por proceso usa obtener_extractor().
     """
     
-    def __init__(self):
-        self.memoria = cargar_memoria()
-        self.azure_client = None
-        
-        # Inicializar cliente Azure si está disponible
-        if AZURE_DISPONIBLE and AZURE_ENDPOINT and AZURE_KEY:
-            try:
-                self.azure_client = DocumentAnalysisClient(
-                    endpoint=AZURE_ENDPOINT,
-                    credential=AzureKeyCredential(AZURE_KEY)
-                )
-                print("✅ Cliente Azure Document Intelligence inicializado")
-            except Exception as e:
-                print(f"⚠️  Error inicializando Azure: {e}")
+    def __init__(self, modo_ocr: Optional[str] = None):
+        """
+        Args:
+            modo_ocr: cómo se prueban las variantes de Tesseract ("sondeo", "paralelo",
+                "completo"); None usa el modo por defecto de app.py
+        """
+        self.modo_ocr = modo_ocr
+        self._memoria = None
+        self._candado = threading.Lock()
+    
+    @property
+    def memoria(self) -> Dict:
+        """Memoria de aprendizaje (se carga del disco la primera vez que se pide)"""
+        if self._memoria is None:
+            with self._candado:
+                if self._memoria is None:
+                    self._memoria = cargar_memoria()
+        return self._memoria
+    
+    @property
+    def azure_client(self):
+        return obtener_cliente_azure()
+    
+    def cerrar(self):
+        """Libera la memoria cargada (el cliente Azure compartido se cierra con cerrar_extractores)"""
+        with self._candado:
+            self._memoria = None
+    
+    # Mismo nombre que los clientes de Azure y los archivos
+    close = cerrar
     
-    def extraer_con_tesseract(self, imagen: Image.Image) -> Tuple[Dict, float]:
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *_):
+        self.cerrar()
+        return False
+    
+    def contexto(self, imagen: Union[Image.Image, ContextoDocumento]) -> ContextoDocumento:
+        """Retorna el contexto de la imagen (lo crea si se pasó una imagen suelta)"""
+        if isinstance(imagen, ContextoDocumento):
+            return imagen
+        return ContextoDocumento(imagen, modo_ocr=self.modo_ocr)
+    
+    def extraer_con_tesseract(self, imagen: Union[Image.Image, ContextoDocumento]) -> Tuple[Dict, float]:
         """
         Extracción rápida con Tesseract
         Retorna: (datos_extraidos, tiempo_segundos)
         """
         inicio = time.time()
-        texto = ocr_imagen(imagen)
-        resultado = extraer_datos(texto)
-        
-        # Manejar tupla si extraer_datos retorna (datos, tablas)
-        if isinstance(resultado, tuple):
-            datos, _ = resultado
-        else:
-            datos = resultado
-            
+        datos = self.contexto(imagen).datos_texto()
         tiempo = time.time() - inicio
         return datos, tiempo
     
-    def extraer_con_paddleocr(self, imagen: Image.Image) -> Tuple[Dict, float]:
+    def extraer_con_paddleocr(self, imagen: Union[Image.Image, ContextoDocumento]) -> Tuple[Dict, float]:
         """
         Extracción con PaddleOCR para tablas complejas
         Retorna: (datos_extraidos, tiempo_segundos)
         """
         inicio = time.time()
+        ctx = self.contexto(imagen)
         
         try:
             # Usar extracción de tablas con coordenadas
-            tabla = extraer_tabla_con_easyocr(imagen, columnas_esperadas=8)
+            tabla = ctx.tabla(num_columnas=8)
             datos = {
                 "_tipo": "tabla_paddle",
                 "_filas": tabla if tabla else [],
@@ -107,28 +261,21 @@ class ExtractorMaestro:
         except Exception as e:
             print(f"⚠️  Error en PaddleOCR: {e}")
             # Fallback a Tesseract
-            return self.extraer_con_tesseract(imagen)
+            return self.extraer_con_tesseract(ctx)
         
         tiempo = time.time() - inicio
         return datos, tiempo
     
-    def extraer_con_easyocr(self, imagen: Image.Image) -> Tuple[Dict, float]:
+    def extraer_con_easyocr(self, imagen: Union[Image.Image, ContextoDocumento]) -> Tuple[Dict, float]:
         """
         Extracción precisa con EasyOCR
         Retorna: (datos_extraidos, tiempo_segundos)
         """
         inicio = time.time()
+        ctx = self.contexto(imagen)
         
         try:
-            import easyocr
-            reader = easyocr.Reader(['es', 'en'], gpu=False)
-            
-            # Convertir PIL a array numpy
-            import numpy as np
-            img_array = np.array(imagen)
-            
-            resultados = reader.readtext(img_array)
-            texto = "\n".join([texto for (bbox, texto, confianza) in resultados])
+            texto = "\n".join(caja['texto'] for caja in ctx.cajas_easyocr)
             
             resultado = extraer_datos(texto)
             if isinstance(resultado, tuple):
@@ -138,26 +285,27 @@ class ExtractorMaestro:
                 
         except Exception as e:
             print(f"⚠️  Error en EasyOCR: {e}")
-            return self.extraer_con_tesseract(imagen)
+            return self.extraer_con_tesseract(ctx)
         
         tiempo = time.time() - inicio
         return datos, tiempo
     
-    def extraer_con_azure(self, imagen: Image.Image) -> Tuple[Dict, float]:
+    def extraer_con_azure(self, imagen: Union[Image.Image, ContextoDocumento]) -> Tuple[Dict, float]:
         """
         Extracción de alta precisión con Azure Document Intelligence
         Retorna: (datos_extraidos, tiempo_segundos)
         """
+        ctx = self.contexto(imagen)
         if not self.azure_client:
             print("⚠️  Azure no está disponible. Usando Tesseract.")
-            return self.extraer_con_tesseract(imagen)
+            return self.extraer_con_tesseract(ctx)
         
         inicio = time.time()
         
         try:
             # Convertir imagen a bytes
             img_byte_arr = BytesIO()
-            imagen.save(img_byte_arr, format='PNG')
+            ctx.imagen.save(img_byte_arr, format='PNG')
             img_byte_arr.seek(0)
             
             # Analizar documento
@@ -203,30 +351,25 @@ class ExtractorMaestro:
             
         except Exception as e:
             print(f"⚠️  Error en Azure: {e}")
-            return self.extraer_con_tesseract(imagen)
+            return self.extraer_con_tesseract(ctx)
         
         tiempo = time.time() - inicio
         return datos, tiempo
     
-    def extraer_balanceado(self, imagen: Image.Image) -> Tuple[Dict, float]:
+    def extraer_balanceado(self, imagen: Union[Image.Image, ContextoDocumento]) -> Tuple[Dict, float]:
         """
         Estrategia balanceada: Tesseract para texto + PaddleOCR para tablas
         """
         inicio = time.time()
+        ctx = self.contexto(imagen)
         
         # Paso 1: Extracción rápida con Tesseract
-        texto = ocr_imagen(imagen)
-        resultado = extraer_datos(texto)
-        
-        if isinstance(resultado, tuple):
-            datos, _ = resultado
-        else:
-            datos = resultado
+        datos = ctx.datos_texto()
         
         # Paso 2: Si parece tener tabla, usar PaddleOCR
-        if self._parece_tener_tabla(texto):
+        if self._parece_tener_tabla(ctx.texto):
             try:
-                tabla = extraer_tabla_con_easyocr(imagen, columnas_esperadas=8)
+                tabla = ctx.tabla(num_columnas=8)
                 if tabla:
                     datos["_tabla_paddle"] = tabla
                     datos["_metodo"] = "Balanceado (Tesseract + PaddleOCR)"
@@ -236,79 +379,234 @@ class ExtractorMaestro:
         tiempo = time.time() - inicio
         return datos, tiempo
     
-    def extraer_auto(self, imagen: Image.Image, nombre_archivo: str = "") -> Tuple[Dict, float]:
+    def extraer_auto(self, imagen: Union[Image.Image, ContextoDocumento], nombre_archivo: str = "") -> Tuple[Dict, float]:
         """
-        Selección automática del mejor método según características del documento
+        Selección automática del mejor método según características del documento.
+        El texto de Tesseract usado para clasificar se reutiliza en la estrategia elegida.
         """
         inicio = time.time()
+        ctx = self.contexto(imagen)
         
         # Análisis rápido con Tesseract
-        texto = ocr_imagen(imagen)
+        texto = ctx.texto
         
         # Decisión inteligente
         if self._es_cartera_clientes(texto):
             # Documento de cartera → PaddleOCR (tablas)
             print("🔍 Detectado: Cartera de clientes → Usando PaddleOCR")
-            datos, _ = self.extraer_con_paddleocr(imagen)
+            datos, _ = self.extraer_con_paddleocr(ctx)
             
         elif self._es_formula_medica(texto):
             # Fórmula médica → Tesseract (texto estructurado)
             print("🔍 Detectado: Fórmula médica → Usando Tesseract")
-            resultado = extraer_datos(texto)
-            datos = resultado[0] if isinstance(resultado, tuple) else resultado
+            datos = ctx.datos_texto()
             
         elif self._es_documento_complejo(texto):
             # Documento complejo → Azure (si disponible) o EasyOCR
             if self.azure_client:
                 print("🔍 Detectado: Documento complejo → Usando Azure")
-                datos, _ = self.extraer_con_azure(imagen)
+                datos, _ = self.extraer_con_azure(ctx)
             else:
                 print("🔍 Detectado: Documento complejo → Usando EasyOCR")
-                datos, _ = self.extraer_con_easyocr(imagen)
+                datos, _ = self.extraer_con_easyocr(ctx)
         else:
             # Documento estándar → Balanceado
             print("🔍 Detectado: Documento estándar → Usando modo balanceado")
-            datos, _ = self.extraer_balanceado(imagen)
+            datos, _ = self.extraer_balanceado(ctx)
         
         tiempo = time.time() - inicio
         datos["_metodo_auto"] = "Selección automática"
         return datos, tiempo
     
-    def comparar_metodos(self, imagen: Image.Image) -> Dict[str, Tuple[Dict, float]]:
+    def motores_comparacion(self) -> Dict[str, callable]:
+        """Motores que participan en COMPARAR (Azure solo si hay cliente)"""
+        motores = {
+            "tesseract": self.extraer_con_tesseract,
+            "paddleocr": self.extraer_con_paddleocr,
+            "easyocr": self.extraer_con_easyocr,
+        }
+        if self.azure_client:
+            motores["azure"] = self.extraer_con_azure
+        return motores
+    
+    def comparar_metodos_en_paralelo(
+        self,
+        imagen: Union[Image.Image, ContextoDocumento],
+        timeout_motor: Optional[float] = None
+    ) -> Iterable[Tuple[str, Tuple[Dict, float]]]:
+        """
+        Ejecuta todos los motores a la vez y entrega cada resultado apenas termina.
+        
+        Tesseract corre como subproceso, PaddleOCR/EasyOCR liberan el GIL durante la
+        inferencia y Azure espera por red, así que un pool de hilos alcanza. Cada
+        motor tiene su propio candado (motores_ocr.bloqueo_motor), de modo que motores
+        distintos no se bloquean entre sí.
+        
+        Args:
+            timeout_motor: segundos máximos por motor (por defecto TIMEOUT_MOTOR_COMPARAR).
+                Un motor que se pasa se reporta con "_error" y no detiene a los demás.
+        
+        Yields:
+            (motor, (datos, tiempo_segundos)) en orden de finalización
+        """
+        ctx = self.contexto(imagen)
+        motores = self.motores_comparacion()
+        timeout_motor = timeout_motor or TIMEOUT_MOTOR_COMPARAR
+        
+        pool = ThreadPoolExecutor(max_workers=len(motores), thread_name_prefix="comparar")
+        try:
+            inicio = time.time()
+            pendientes = {pool.submit(metodo, ctx): nombre for nombre, metodo in motores.items()}
+            limite = inicio + timeout_motor
+            
+            while pendientes:
+                restante = limite - time.time()
+                if restante <= 0:
+                    # Los motores que no terminaron se reportan; sus hilos se abandonan
+                    for nombre in pendientes.values():
+                        yield nombre, ({"_error": f"Tiempo agotado ({timeout_motor:.0f}s)"}, timeout_motor)
+                    break
+                
+                listos, _ = wait(pendientes, timeout=restante, return_when=FIRST_COMPLETED)
+                for futuro in listos:
+                    nombre = pendientes.pop(futuro)
+                    try:
+                        yield nombre, futuro.result()
+                    except Exception as e:
+                        yield nombre, ({"_error": str(e)}, time.time() - inicio)
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+    
+    def comparar_metodos(
+        self,
+        imagen: Union[Image.Image, ContextoDocumento],
+        en_paralelo: bool = True,
+        timeout_motor: Optional[float] = None,
+        al_terminar_motor=None
+    ) -> Dict[str, Tuple[Dict, float]]:
         """
         Ejecuta múltiples métodos y retorna comparación
         Retorna: {"tesseract": (datos, tiempo), "paddle": (datos, tiempo), ...}
+        
+        Args:
+            en_paralelo: True corre los motores a la vez (tiempo total ≈ el motor más lento)
+            timeout_motor: segundos máximos por motor en modo paralelo
+            al_terminar_motor: función (motor, datos, tiempo) llamada apenas termina cada
+                motor, desde el hilo que llamó a comparar_metodos (sirve para actualizar la UI)
         """
         print("\n🔬 COMPARANDO MÉTODOS DE EXTRACCIÓN...")
         print("=" * 60)
         
+        # Un solo contexto: los fallbacks a Tesseract reutilizan su texto
+        ctx = self.contexto(imagen)
+        inicio = time.time()
+        
+        if en_paralelo:
+            ejecucion = self.comparar_metodos_en_paralelo(ctx, timeout_motor)
+        else:
+            ejecucion = ((nombre, metodo(ctx)) for nombre, metodo in self.motores_comparacion().items())
+        
         resultados = {}
+        for nombre, (datos, tiempo) in ejecucion:
+            resultados[nombre] = (datos, tiempo)
+            if "_error" in datos:
+                print(f"   ⚠️  {nombre}: {datos['_error']}")
+            else:
+                print(f"   ✅ {nombre}: completado en {tiempo:.2f}s")
+            if al_terminar_motor:
+                al_terminar_motor(nombre, datos, tiempo)
+        
+        tiempo_total = time.time() - inicio
+        suma_motores = sum(tiempo for _, tiempo in resultados.values())
+        print("\n" + "=" * 60)
+        print(f"✅ COMPARACIÓN COMPLETADA en {tiempo_total:.2f}s (suma de motores: {suma_motores:.2f}s)\n")
+        
+        # Mismo orden de motores siempre (tabla de la UI, hojas de Excel)
+        return {nombre: resultados[nombre] for nombre in self.motores_comparacion() if nombre in resultados}
+    
+    # ============================================
+    # DOCUMENTOS DE VARIAS PÁGINAS
+    # ============================================
+    
+    def metodo_estrategia(self, estrategia: str, nombre_archivo: str = ""):
+        """Retorna la función (imagen -> (datos, tiempo)) de la estrategia indicada"""
+        estrategias = {
+            "RAPIDO": self.extraer_con_tesseract,
+            "BALANCEADO": self.extraer_balanceado,
+            "PRECISO": self.extraer_con_easyocr,
+            "AZURE": self.extraer_con_azure,
+            "AUTO": lambda imagen: self.extraer_auto(imagen, nombre_archivo),
+        }
+        estrategia = estrategia.upper()
+        if estrategia not in estrategias:
+            print(f"⚠️  Estrategia '{estrategia}' no reconocida. Usando AUTO.")
+            estrategia = "AUTO"
+        return estrategias[estrategia]
+    
+    def extraer_paginas(
+        self,
+        paginas: Iterable[Tuple[int, Image.Image]],
+        estrategia: str = "AUTO",
+        nombre_archivo: str = "",
+        max_hilos: Optional[int] = None,
+        resultados_previos: Optional[List[Tuple[int, Dict]]] = None
+    ) -> Tuple[Dict, float]:
+        """
+        Ejecuta la estrategia sobre TODAS las páginas con un pool de hilos por página
+        y combina el resultado (campos clave-valor + filas de tablas concatenadas).
         
-        # Tesseract
-        print("\n⏱️  Ejecutando Tesseract...")
-        resultados["tesseract"] = self.extraer_con_tesseract(imagen)
-        print(f"   ✅ Completado en {resultados['tesseract'][1]:.2f}s")
+        Args:
+            paginas: iterable de (numero_pagina, imagen), p.ej. iterar_paginas_pdf(...)
+            estrategia: "RAPIDO", "BALANCEADO", "PRECISO", "AZURE", "AUTO"
+            max_hilos: páginas procesadas a la vez (por defecto núcleos disponibles, máx. 4)
+            resultados_previos: [(numero_pagina, datos)] ya extraídos sin OCR (capa de texto
+                nativa); se combinan con los de las páginas rasterizadas
         
-        # PaddleOCR
-        print("\n⏱️  Ejecutando PaddleOCR...")
-        resultados["paddleocr"] = self.extraer_con_paddleocr(imagen)
-        print(f"   ✅ Completado en {resultados['paddleocr'][1]:.2f}s")
+        Returns:
+            (datos_combinados, tiempo_segundos)
+        """
+        inicio = time.time()
+        metodo = self.metodo_estrategia(estrategia, nombre_archivo)
+        max_hilos = max_hilos or min(4, os.cpu_count() or 1)
         
-        # EasyOCR
-        print("\n⏱️  Ejecutando EasyOCR...")
-        resultados["easyocr"] = self.extraer_con_easyocr(imagen)
-        print(f"   ✅ Completado en {resultados['easyocr'][1]:.2f}s")
+        resultados = list(resultados_previos or [])
+        errores = {}
         
-        # Azure (si disponible)
-        if self.azure_client:
-            print("\n⏱️  Ejecutando Azure Document Intelligence...")
-            resultados["azure"] = self.extraer_con_azure(imagen)
-            print(f"   ✅ Completado en {resultados['azure'][1]:.2f}s")
+        def _procesar(numero, imagen):
+            try:
+                datos, _ = metodo(imagen)
+                return numero, datos
+            finally:
+                imagen.close()
         
-        print("\n" + "=" * 60)
-        print("✅ COMPARACIÓN COMPLETADA\n")
+        # Se mantienen a lo sumo 2 páginas por hilo en vuelo para no cargar todo el PDF en memoria
+        with ThreadPoolExecutor(max_workers=max_hilos) as pool:
+            pendientes = {}
+            for numero, imagen in paginas:
+                pendientes[pool.submit(_procesar, numero, imagen)] = numero
+                if len(pendientes) >= max_hilos * 2:
+                    listos, _ = wait(pendientes, return_when=FIRST_COMPLETED)
+                    for futuro in listos:
+                        self._recoger_pagina(futuro, pendientes.pop(futuro), resultados, errores)
+            
+            for futuro in list(pendientes):
+                self._recoger_pagina(futuro, pendientes.pop(futuro), resultados, errores)
         
-        return resultados
+        datos = combinar_resultados_paginas(sorted(resultados, key=lambda r: r[0]))
+        if errores:
+            datos["_errores_paginas"] = errores
+        
+        tiempo = time.time() - inicio
+        return datos, tiempo
+    
+    @staticmethod
+    def _recoger_pagina(futuro, numero, resultados, errores):
+        """Guarda el resultado de una página o su error (sin detener las demás)"""
+        try:
+            resultados.append(futuro.result())
+        except Exception as e:
+            print(f"⚠️  Error en página {numero}: {e}")
+            errores[numero] = str(e)
     
     # ============================================
     # MÉTODOS DE DETECCIÓN
@@ -339,55 +637,224 @@ class ExtractorMaestro:
         return len(texto) > 2000 or texto.count('\n') > 50
 
 
+def combinar_resultados_paginas(resultados: List[Tuple[int, Dict]]) -> Dict:
+    """
+    Combina los datos extraídos de cada página en un solo resultado.
+    
+    - Listas internas (_filas, _tabla_paddle, _tablas_azure, ...): se concatenan en orden de página
+    - Campos clave-valor: gana la primera página que lo trae; si otra página trae un valor
+      distinto se conserva como "campo (pág N)"
+    """
+    combinado = {}
+    for numero, datos in sorted(resultados, key=lambda r: r[0]):
+        for clave, valor in datos.items():
+            if isinstance(valor, list) and clave.startswith('_'):
+                combinado.setdefault(clave, []).extend(valor)
+            elif clave not in combinado or combinado[clave] in ('', None):
+                combinado[clave] = valor
+            elif combinado[clave] != valor and not clave.startswith('_'):
+                combinado[f"{clave} (pág {numero})"] = valor
+    
+    combinado["_paginas"] = len(resultados)
+    return combinado
+
+
+# Un ExtractorMaestro por modo_ocr para todo el proceso (ver obtener_extractor)
+_extractores = {}
+_candado_extractores = threading.Lock()
+
+
+def obtener_extractor(modo_ocr: Optional[str] = None) -> ExtractorMaestro:
+    """
+    Retorna el ExtractorMaestro del proceso para `modo_ocr` (se crea la primera vez).
+    Es seguro entre hilos: las extracciones no modifican el extractor.
+    """
+    extractor = _extractores.get(modo_ocr)
+    if extractor is None:
+        with _candado_extractores:
+            extractor = _extractores.get(modo_ocr)
+            if extractor is None:
+                extractor = _extractores[modo_ocr] = ExtractorMaestro(modo_ocr=modo_ocr)
+    return extractor
+
+
+def cerrar_extractores():
+    """Cierra los extractores del proceso y el cliente Azure compartido"""
+    global _cliente_azure
+    with _candado_extractores:
+        for extractor in _extractores.values():
+            extractor.cerrar()
+        _extractores.clear()
+    
+    with _candado_azure:
+        if _cliente_azure:
+            try:
+                _cliente_azure.close()
+            except Exception as e:
+                print(f"⚠️  Error cerrando cliente Azure: {e}")
+        _cliente_azure = None
+
+
+atexit.register(cerrar_extractores)
+
+
+def _es_pdf(ruta_o_documento) -> bool:
+    """Detecta si la entrada es un PDF (ruta .pdf o bytes con cabecera %PDF)"""
+    if isinstance(ruta_o_documento, (bytes, bytearray)):
+        return bytes(ruta_o_documento[:5]) == b"%PDF-"
+    if isinstance(ruta_o_documento, (str, Path)):
+        return Path(ruta_o_documento).suffix.lower() == ".pdf"
+    return False
+
+
 def extraer_documento(
-    ruta_o_imagen: Union[str, Path, Image.Image],
+    ruta_o_imagen: Union[str, Path, Image.Image, bytes],
     estrategia: str = "AUTO",
-    comparar: bool = False
+    comparar: bool = False,
+    modo_ocr: Optional[str] = None,
+    dpi: int = 200,
+    max_paginas: Optional[int] = None,
+    al_terminar_motor=None,
+    extractor: Optional[ExtractorMaestro] = None,
+    nombre: Optional[str] = None
 ) -> Union[Tuple[Dict, float], Dict[str, Tuple[Dict, float]]]:
     """
     Función principal de extracción
     
     Args:
-        ruta_o_imagen: Ruta al archivo o imagen PIL
+        ruta_o_imagen: Ruta al archivo (imagen o PDF), imagen PIL o bytes del archivo
         estrategia: "RAPIDO", "BALANCEADO", "PRECISO", "AZURE", "AUTO"
         comparar: Si True, ejecuta y compara múltiples métodos
+        modo_ocr: "sondeo" (por defecto), "paralelo" (menor latencia en cargas individuales)
+            o "completo"
+        dpi: resolución de rasterizado para PDFs
+        max_paginas: páginas del PDF a procesar (None = todas)
+        al_terminar_motor: solo con comparar=True; función (motor, datos, tiempo) llamada
+            apenas termina cada motor (los motores corren en paralelo)
+        extractor: ExtractorMaestro a usar; por defecto el del proceso
+            (obtener_extractor), así no se crea uno por documento
+        nombre: nombre del archivo para '_archivo' y la estrategia AUTO; por
+            defecto el de la ruta (con bytes o PIL, '..._sin_nombre')
     
     Returns:
         Si comparar=False: (datos_extraidos, tiempo_segundos)
         Si comparar=True: {"metodo": (datos, tiempo), ...}
     """
     
+    # Extractor del proceso (o el del llamador)
+    if extractor is None:
+        extractor = obtener_extractor(modo_ocr)
+    
+    # PDF: se procesan todas las páginas
+    if _es_pdf(ruta_o_imagen):
+        if isinstance(ruta_o_imagen, (str, Path)):
+            nombre = nombre or Path(ruta_o_imagen).name
+            pdf_bytes = Path(ruta_o_imagen).read_bytes()
+        else:
+            nombre = nombre or "documento_sin_nombre.pdf"
+            pdf_bytes = bytes(ruta_o_imagen)
+        
+        if comparar:
+            # La comparación de motores se hace sobre la primera página
+            print("ℹ️  COMPARAR usa solo la primera página del PDF")
+            paginas = iterar_paginas_pdf(pdf_bytes, dpi=dpi, max_paginas=max_paginas)
+            _, primera = next(paginas)
+            paginas.close()
+            return extractor.comparar_metodos(primera, al_terminar_motor=al_terminar_motor)
+        
+        # Páginas con texto nativo: extracción directa sin rasterizar ni OCR
+        paginas_nativas = [p for p in extraer_capa_texto(pdf_bytes, max_paginas=max_paginas) if p['nativa']]
+        # NER de todas las páginas nativas en un solo lote (nlp.pipe)
+        entidades = extraer_entidades_lote([p['texto'] for p in paginas_nativas])
+        nativas = []
+        for pagina, entidades_pagina in zip(paginas_nativas, entidades):
+            datos, _ = extraer_datos(pagina['texto'], nombre, elementos_coordenadas=pagina['elementos'],
+                                     entidades_ner=entidades_pagina)
+            datos['_metodo'] = 'Texto nativo PDF'
+            nativas.append((pagina['numero'], datos))
+        if nativas:
+            print(f"⚡ {len(nativas)} página(s) con texto nativo, sin OCR")
+        
+        # Solo las páginas escaneadas pasan por la estrategia OCR
+        paginas = iterar_paginas_pdf(pdf_bytes, dpi=dpi, max_paginas=max_paginas,
+                                     omitir=[numero for numero, _ in nativas])
+        return extractor.extraer_paginas(paginas, estrategia, nombre, resultados_previos=nativas)
+    
     # Cargar imagen
     if isinstance(ruta_o_imagen, (str, Path)):
         imagen = Image.open(ruta_o_imagen)
-        nombre = Path(ruta_o_imagen).name
+        nombre = nombre or Path(ruta_o_imagen).name
+    elif isinstance(ruta_o_imagen, (bytes, bytearray)):
+        imagen = Image.open(BytesIO(ruta_o_imagen))
+        nombre = nombre or "imagen_sin_nombre.jpg"
     else:
         imagen = ruta_o_imagen
-        nombre = "imagen_sin_nombre.jpg"
-    
-    # Crear extractor
-    extractor = ExtractorMaestro()
+        nombre = nombre or "imagen_sin_nombre.jpg"
     
     # Modo comparación
     if comparar:
-        return extractor.comparar_metodos(imagen)
+        return extractor.comparar_metodos(imagen, al_terminar_motor=al_terminar_motor)
     
     # Seleccionar estrategia
-    estrategia = estrategia.upper()
-    
-    if estrategia == "RAPIDO":
-        return extractor.extraer_con_tesseract(imagen)
-    elif estrategia == "BALANCEADO":
-        return extractor.extraer_balanceado(imagen)
-    elif estrategia == "PRECISO":
-        return extractor.extraer_con_easyocr(imagen)
-    elif estrategia == "AZURE":
-        return extractor.extraer_con_azure(imagen)
-    elif estrategia == "AUTO":
-        return extractor.extraer_auto(imagen, nombre)
-    else:
-        print(f"⚠️  Estrategia '{estrategia}' no reconocida. Usando AUTO.")
-        return extractor.extraer_auto(imagen, nombre)
+    return extractor.metodo_estrategia(estrategia, nombre)(imagen)
+
+
+def extraer_documento_lote(
+    nombre: str,
+    contenido: bytes,
+    estrategia: str = "AUTO",
+    comparar: bool = False,
+    dpi: int = 200,
+    max_paginas: Optional[int] = None
+) -> Dict:
+    """
+    Trabajo de un archivo de un lote (corre dentro del pool de procesos, ver
+    procesamiento_lotes.ejecutar_en_procesos). Recibe bytes para poder enviarse
+    por pickle y detecta por la cabecera si es PDF o imagen.
+    
+    Returns:
+        {'nombre', 'tipo': 'extraccion'|'comparacion', 'datos', 'tiempo'}
+    """
+    inicio = time.time()
+    resultado = extraer_documento(contenido, estrategia=estrategia, comparar=comparar, nombre=nombre,
+                                  dpi=dpi, max_paginas=max_paginas)
+    
+    if comparar:
+        return {'nombre': nombre, 'tipo': 'comparacion', 'datos': resultado, 'tiempo': time.time() - inicio}
+    
+    datos, tiempo = resultado
+    return {'nombre': nombre, 'tipo': 'extraccion', 'datos': datos, 'tiempo': tiempo}
+
+
+def extraer_lote(
+    archivos: Iterable[Tuple[str, bytes]],
+    estrategia: str = "AUTO",
+    comparar: bool = False,
+    max_procesos: Optional[int] = None,
+    dpi: int = 200,
+    max_paginas: Optional[int] = None
+):
+    """
+    Procesa un lote de archivos repartido en un pool de procesos.
+    
+    Args:
+        archivos: iterable de (nombre, bytes)
+        
+    Yields:
+        (indice, resultado) en orden de finalización; resultado tiene la forma de
+        extraer_documento_lote o {'nombre', 'tipo': 'error', 'error', 'tiempo'}
+    """
+    nombres = []
+    
+    def _tareas():
+        for nombre, contenido in archivos:
+            nombres.append(nombre)
+            yield (nombre, contenido, estrategia, comparar, dpi, max_paginas)
+    
+    for indice, resultado, error in ejecutar_en_procesos(extraer_documento_lote, _tareas(), max_procesos):
+        if error:
+            resultado = {'nombre': nombres[indice], 'tipo': 'error', 'error': error, 'tiempo': 0.0}
+        yield indice, resultado
 
 
 # ============================================
@@ -398,6 +865,8 @@ def exportar_comparacion_excel(resultados: Dict[str, Tuple[Dict, float]], ruta_s
     """
     Exporta resultados de comparación a Excel
     """
+    import pandas as pd
+    
     try:
         with pd.ExcelWriter(ruta_salida, engine='openpyxl') as writer:
             # Hoja de resumen
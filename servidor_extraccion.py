@@ -0,0 +1,512 @@
+"""
+🛰️ SERVIDOR DE EXTRACCIÓN LOCAL (MODELOS CALIENTES)
+====================================================
+Cada rerun de Streamlit y cada ejecución del CLI arrancaba en frío: motores
+OCR, spaCy y la memoria se cargaban de nuevo, y extraer_documento creaba un
+ExtractorMaestro (memoria + cliente Azure) en cada llamada.
+
+Este servidor es un proceso de larga vida que carga todo una sola vez al
+arrancar (PaddleOCR/EasyOCR, spaCy, Tesseract, memoria de aprendizaje, cliente
+Azure) y atiende trabajos por HTTP, en un puerto local o en un socket Unix:
+
+    GET  /salud                    estado del servidor y de los modelos
+    POST /trabajos?nombre=...      cuerpo = bytes del archivo → {'id': ...}
+         (opcionales: estrategia, comparar=1, modo_ocr, dpi, max_paginas)
+    GET  /trabajos/<id>            sondeo: estado y, al terminar, el resultado
+    GET  /trabajos/<id>/eventos    stream NDJSON: en_cola, inicio, motor
+                                   (COMPARAR, uno por motor), terminado/error
+
+El resultado tiene la forma de extractor_maestro.extraer_documento_lote:
+{'nombre', 'tipo': 'extraccion'|'comparacion'|'error', 'datos', 'tiempo'}.
+
+ClienteExtraccion (en este mismo módulo) lo usan app_maestro.py (variable de
+entorno EXTRACTOR_SERVIDOR) y extractor_cli.py (--servidor).
+
+Uso:
+    python servidor_extraccion.py                        # http://127.0.0.1:8765
+    python servidor_extraccion.py --socket /tmp/extractor.sock --trabajadores 4
+
+    from servidor_extraccion import ClienteExtraccion
+
+    cliente = ClienteExtraccion("http://127.0.0.1:8765")
+    resultado = cliente.extraer("factura.pdf", Path("factura.pdf").read_bytes())
+"""
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+from urllib.parse import parse_qs, quote, urlencode, urlsplit
+
+URL_POR_DEFECTO = "http://127.0.0.1:8765"
+# Trabajos que corren a la vez (los motores OCR tienen su propio candado)
+TRABAJADORES_POR_DEFECTO = int(os.environ.get('SERVIDOR_TRABAJADORES', '2'))
+# Trabajos terminados que se conservan para sondeo (los más viejos se descartan)
+MAX_TRABAJOS_GUARDADOS = 500
+# Tamaño máximo de un archivo enviado
+MAX_BYTES_TRABAJO = 200 * 1024 * 1024
+
+ESTADOS_FINALES = ('terminado', 'error')
+
+
+def _a_json(datos) -> bytes:
+    # Los resultados pueden traer numpy/Path/fechas: se serializan como texto
+    return json.dumps(datos, ensure_ascii=False, default=str).encode('utf-8')
+
+
+# ============================================
+# SERVIDOR
+# ============================================
+
+class ServicioExtraccion:
+    """Modelos calientes, cola de trabajos y sus eventos (sin nada de HTTP)"""
+
+    def __init__(self, trabajadores: int = TRABAJADORES_POR_DEFECTO):
+        self.trabajadores = max(1, trabajadores)
+        self._pool = ThreadPoolExecutor(max_workers=self.trabajadores, thread_name_prefix="extraccion")
+        self._trabajos = OrderedDict()
+        self._candado = threading.Lock()
+        self.modelos = {}
+        self.inicio = time.time()
+
+    # ---------- Precalentamiento ----------
+    def precalentar(self):
+        """Carga todo lo que un documento en frío pagaría en su primera extracción"""
+        from extractor_maestro import obtener_extractor, precalentar_motores
+        from servicio_ner import obtener_nlp
+
+        print("🔥 Precalentando motores...")
+        self.modelos.update(precalentar_motores())
+        self.modelos['spacy'] = obtener_nlp() is not None
+        try:
+            import pytesseract
+            self.modelos['tesseract'] = str(pytesseract.get_tesseract_version())
+        except Exception:
+            self.modelos['tesseract'] = False
+        extractor = obtener_extractor()
+        self.modelos['memoria'] = len(extractor.memoria.get('nombres_completos', {}))
+        self.modelos['azure'] = extractor.azure_client is not None
+        print(f"✅ Modelos listos: {self.modelos}")
+
+    # ---------- Trabajos ----------
+    def enviar(self, nombre: str, contenido: bytes, opciones: Dict) -> str:
+        """Encola un archivo; retorna el id del trabajo"""
+        id_trabajo = uuid.uuid4().hex
+        trabajo = {
+            'id': id_trabajo,
+            'nombre': nombre,
+            'estado': 'en_cola',
+            'opciones': opciones,
+            'creado': time.time(),
+            'resultado': None,
+            'eventos': [],
+            'condicion': threading.Condition(),
+        }
+        with self._candado:
+            self._trabajos[id_trabajo] = trabajo
+            self._descartar_viejos()
+        self._publicar(trabajo, {'evento': 'en_cola'})
+        self._pool.submit(self._ejecutar, trabajo, contenido)
+        return id_trabajo
+
+    def _descartar_viejos(self):
+        terminados = [i for i, t in self._trabajos.items() if t['estado'] in ESTADOS_FINALES]
+        for id_trabajo in terminados[:max(0, len(terminados) - MAX_TRABAJOS_GUARDADOS)]:
+            del self._trabajos[id_trabajo]
+
+    def _publicar(self, trabajo: Dict, evento: Dict):
+        evento = dict(evento, id=trabajo['id'], t=round(time.time() - trabajo['creado'], 3))
+        with trabajo['condicion']:
+            trabajo['eventos'].append(evento)
+            trabajo['condicion'].notify_all()
+
+    def _ejecutar(self, trabajo: Dict, contenido: bytes):
+        from extractor_maestro import extraer_documento
+
+        opciones = trabajo['opciones']
+        comparar = opciones.get('comparar', False)
+        trabajo['estado'] = 'procesando'
+        self._publicar(trabajo, {'evento': 'inicio'})
+        inicio = time.time()
+
+        def _motor_terminado(motor, datos, tiempo):
+            self._publicar(trabajo, {'evento': 'motor', 'motor': motor, 'datos': datos, 'tiempo': tiempo})
+
+        try:
+            resultado = extraer_documento(
+                contenido,
+                estrategia=opciones.get('estrategia', 'AUTO'),
+                comparar=comparar,
+                modo_ocr=opciones.get('modo_ocr'),
+                dpi=opciones.get('dpi', 200),
+                max_paginas=opciones.get('max_paginas'),
+                al_terminar_motor=_motor_terminado if comparar else None,
+                nombre=trabajo['nombre'],
+            )
+            if comparar:
+                trabajo['resultado'] = {'nombre': trabajo['nombre'], 'tipo': 'comparacion',
+                                        'datos': resultado, 'tiempo': time.time() - inicio}
+            else:
+                datos, tiempo = resultado
+                trabajo['resultado'] = {'nombre': trabajo['nombre'], 'tipo': 'extraccion',
+                                        'datos': datos, 'tiempo': tiempo}
+            trabajo['estado'] = 'terminado'
+        except Exception as e:
+            trabajo['resultado'] = {'nombre': trabajo['nombre'], 'tipo': 'error',
+                                    'error': str(e), 'tiempo': time.time() - inicio}
+            trabajo['estado'] = 'error'
+        self._publicar(trabajo, {'evento': trabajo['estado'], 'resultado': trabajo['resultado']})
+
+    def estado(self, id_trabajo: str) -> Optional[Dict]:
+        trabajo = self._trabajos.get(id_trabajo)
+        if trabajo is None:
+            return None
+        return {
+            'id': trabajo['id'],
+            'nombre': trabajo['nombre'],
+            'estado': trabajo['estado'],
+            'resultado': trabajo['resultado'],
+        }
+
+    def eventos(self, id_trabajo: str, espera_maxima: float = 3600) -> Iterator[Dict]:
+        """Todos los eventos del trabajo (los pasados y los que vayan llegando) hasta que termine"""
+        trabajo = self._trabajos.get(id_trabajo)
+        if trabajo is None:
+            return
+        enviados = 0
+        limite = time.time() + espera_maxima
+        while True:
+            with trabajo['condicion']:
+                while enviados == len(trabajo['eventos']) and time.time() < limite:
+                    trabajo['condicion'].wait(timeout=1.0)
+                nuevos = trabajo['eventos'][enviados:]
+            if not nuevos:
+                return
+            for evento in nuevos:
+                yield evento
+                if evento['evento'] in ESTADOS_FINALES:
+                    return
+            enviados += len(nuevos)
+
+    def salud(self) -> Dict:
+        estados = {}
+        for trabajo in list(self._trabajos.values()):
+            estados[trabajo['estado']] = estados.get(trabajo['estado'], 0) + 1
+        return {
+            'estado': 'ok',
+            'pid': os.getpid(),
+            'segundos_activo': round(time.time() - self.inicio, 1),
+            'trabajadores': self.trabajadores,
+            'modelos': self.modelos,
+            'trabajos': estados,
+        }
+
+    def cerrar(self):
+        from extractor_maestro import cerrar_extractores
+
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        cerrar_extractores()
+
+
+class ManejadorExtraccion(BaseHTTPRequestHandler):
+    """Rutas HTTP sobre ServicioExtraccion (self.server.servicio)"""
+
+    server_version = "ServidorExtraccion/1.0"
+
+    def address_string(self):
+        # En socket Unix client_address no es (host, puerto)
+        return self.client_address[0] if isinstance(self.client_address, tuple) else 'unix'
+
+    def log_message(self, formato, *args):
+        if self.server.verboso:
+            super().log_message(formato, *args)
+
+    def _responder(self, codigo: int, datos):
+        cuerpo = _a_json(datos)
+        self.send_response(codigo)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def _ruta(self):
+        partes = urlsplit(self.path)
+        consulta = {clave: valores[-1] for clave, valores in parse_qs(partes.query).items()}
+        return [p for p in partes.path.split('/') if p], consulta
+
+    def do_GET(self):
+        ruta, _ = self._ruta()
+        servicio = self.server.servicio
+
+        if ruta == ['salud']:
+            return self._responder(200, servicio.salud())
+
+        if len(ruta) == 2 and ruta[0] == 'trabajos':
+            estado = servicio.estado(ruta[1])
+            if estado is None:
+                return self._responder(404, {'error': 'trabajo no encontrado'})
+            return self._responder(200, estado)
+
+        if len(ruta) == 3 and ruta[0] == 'trabajos' and ruta[2] == 'eventos':
+            if servicio.estado(ruta[1]) is None:
+                return self._responder(404, {'error': 'trabajo no encontrado'})
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/x-ndjson; charset=utf-8')
+            self.send_header('Cache-Control', 'no-cache')
+            self.end_headers()
+            try:
+                for evento in servicio.eventos(ruta[1]):
+                    self.wfile.write(_a_json(evento) + b'\n')
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            return
+
+        self._responder(404, {'error': 'ruta no encontrada'})
+
+    def do_POST(self):
+        ruta, consulta = self._ruta()
+        if ruta != ['trabajos']:
+            return self._responder(404, {'error': 'ruta no encontrada'})
+
+        largo = int(self.headers.get('Content-Length') or 0)
+        if largo <= 0:
+            return self._responder(400, {'error': 'cuerpo vacío: envía los bytes del archivo'})
+        if largo > MAX_BYTES_TRABAJO:
+            return self._responder(413, {'error': f'archivo mayor a {MAX_BYTES_TRABAJO} bytes'})
+        contenido = self.rfile.read(largo)
+
+        try:
+            opciones = {
+                'estrategia': consulta.get('estrategia', 'AUTO').upper(),
+                'comparar': consulta.get('comparar', '0').lower() in ('1', 'true', 'si', 'sí'),
+                'modo_ocr': consulta.get('modo_ocr') or None,
+                'dpi': int(consulta.get('dpi', 200)),
+                'max_paginas': int(consulta['max_paginas']) if consulta.get('max_paginas') else None,
+            }
+        except ValueError as e:
+            return self._responder(400, {'error': f'parámetro inválido: {e}'})
+
+        id_trabajo = self.server.servicio.enviar(consulta.get('nombre', 'documento'), contenido, opciones)
+        self._responder(202, {'id': id_trabajo, 'estado': 'en_cola'})
+
+
+class _ServidorUnix(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def crear_servidor(servicio: ServicioExtraccion, host: str = "127.0.0.1", puerto: int = 8765,
+                   ruta_socket: Optional[str] = None, verboso: bool = False):
+    """Servidor HTTP (TCP local o socket Unix) que atiende con `servicio`"""
+    if ruta_socket:
+        if os.path.exists(ruta_socket):
+            os.unlink(ruta_socket)
+        servidor = _ServidorUnix(ruta_socket, ManejadorExtraccion)
+    else:
+        servidor = ThreadingHTTPServer((host, puerto), ManejadorExtraccion)
+        servidor.daemon_threads = True
+    servidor.servicio = servicio
+    servidor.verboso = verboso
+    return servidor
+
+
+# ============================================
+# CLIENTE
+# ============================================
+
+class _ConexionUnix(http.client.HTTPConnection):
+    def __init__(self, ruta_socket: str, timeout: Optional[float] = None):
+        super().__init__('localhost', timeout=timeout)
+        self.ruta_socket = ruta_socket
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            self.sock.settimeout(self.timeout)
+        self.sock.connect(self.ruta_socket)
+
+
+class ClienteExtraccion:
+    """
+    Cliente del servidor de extracción.
+
+    Args:
+        url: "http://host:puerto" o "unix:///ruta/al/socket"
+        timeout: segundos por petición (el stream de eventos no tiene límite)
+    """
+
+    def __init__(self, url: str = URL_POR_DEFECTO, timeout: float = 30):
+        self.url = url
+        self.timeout = timeout
+        partes = urlsplit(url)
+        self._ruta_socket = partes.path if partes.scheme == 'unix' else None
+        self._host = partes.hostname or '127.0.0.1'
+        self._puerto = partes.port or 8765
+
+    def _conexion(self, timeout: Optional[float]):
+        if self._ruta_socket:
+            return _ConexionUnix(self._ruta_socket, timeout=timeout)
+        return http.client.HTTPConnection(self._host, self._puerto, timeout=timeout)
+
+    def _peticion(self, metodo: str, ruta: str, cuerpo: Optional[bytes] = None) -> Dict:
+        conexion = self._conexion(self.timeout)
+        try:
+            conexion.request(metodo, ruta, body=cuerpo,
+                             headers={'Content-Type': 'application/octet-stream'} if cuerpo else {})
+            respuesta = conexion.getresponse()
+            datos = json.loads(respuesta.read().decode('utf-8'))
+            if respuesta.status >= 400:
+                raise RuntimeError(f"Servidor de extracción: {datos.get('error', respuesta.status)}")
+            return datos
+        finally:
+            conexion.close()
+
+    # ---------- Endpoints ----------
+    def salud(self) -> Dict:
+        return self._peticion('GET', '/salud')
+
+    def disponible(self) -> bool:
+        try:
+            return self.salud().get('estado') == 'ok'
+        except (OSError, RuntimeError, ValueError):
+            return False
+
+    def enviar(self, nombre: str, contenido: bytes, estrategia: str = "AUTO", comparar: bool = False,
+               modo_ocr: Optional[str] = None, dpi: int = 200, max_paginas: Optional[int] = None) -> str:
+        """Envía un archivo; retorna el id del trabajo"""
+        parametros = {'nombre': nombre, 'estrategia': estrategia, 'comparar': int(comparar), 'dpi': dpi}
+        if modo_ocr:
+            parametros['modo_ocr'] = modo_ocr
+        if max_paginas:
+            parametros['max_paginas'] = max_paginas
+        return self._peticion('POST', f"/trabajos?{urlencode(parametros)}", bytes(contenido))['id']
+
+    def estado(self, id_trabajo: str) -> Dict:
+        return self._peticion('GET', f"/trabajos/{quote(id_trabajo)}")
+
+    def eventos(self, id_trabajo: str) -> Iterator[Dict]:
+        """Eventos del trabajo a medida que ocurren, hasta 'terminado' o 'error'"""
+        conexion = self._conexion(None)
+        try:
+            conexion.request('GET', f"/trabajos/{quote(id_trabajo)}/eventos")
+            respuesta = conexion.getresponse()
+            if respuesta.status >= 400:
+                raise RuntimeError(f"Servidor de extracción: {respuesta.read().decode('utf-8')}")
+            for linea in respuesta:
+                if linea.strip():
+                    yield json.loads(linea.decode('utf-8'))
+        finally:
+            conexion.close()
+
+    # ---------- Conveniencia ----------
+    def extraer(self, nombre: str, contenido: bytes, al_terminar_motor=None, **opciones) -> Dict:
+        """
+        Envía y espera el resultado (forma de extraer_documento_lote). Con
+        comparar=True, al_terminar_motor(motor, datos, tiempo) se llama apenas
+        el servidor termina cada motor.
+        """
+        id_trabajo = self.enviar(nombre, contenido, **opciones)
+        for evento in self.eventos(id_trabajo):
+            if evento['evento'] == 'motor' and al_terminar_motor:
+                al_terminar_motor(evento['motor'], evento['datos'], evento['tiempo'])
+            elif evento['evento'] in ESTADOS_FINALES:
+                return _resultado_local(evento['resultado'])
+        # El stream se cortó: el trabajo sigue en el servidor
+        return _resultado_local(self.esperar(id_trabajo))
+
+    def esperar(self, id_trabajo: str, intervalo: float = 0.5) -> Dict:
+        while True:
+            estado = self.estado(id_trabajo)
+            if estado['estado'] in ESTADOS_FINALES:
+                return estado['resultado']
+            time.sleep(intervalo)
+
+    def extraer_lote(self, archivos: Iterable[Tuple[str, bytes]], en_vuelo: int = 4,
+                     intervalo: float = 0.2, **opciones) -> Iterator[Tuple[int, Dict]]:
+        """
+        Misma interfaz que extractor_maestro.extraer_lote: (indice, resultado) en
+        orden de finalización. Mantiene a lo sumo `en_vuelo` archivos enviados
+        sin terminar, así que lee el iterable de a poco.
+        """
+        archivos = iter(archivos)
+        pendientes = {}
+        indice = 0
+        agotado = False
+        while pendientes or not agotado:
+            while not agotado and len(pendientes) < en_vuelo:
+                siguiente = next(archivos, None)
+                if siguiente is None:
+                    agotado = True
+                    break
+                nombre, contenido = siguiente
+                try:
+                    pendientes[self.enviar(nombre, contenido, **opciones)] = indice
+                except (OSError, RuntimeError) as e:
+                    yield indice, {'nombre': nombre, 'tipo': 'error', 'error': str(e), 'tiempo': 0.0}
+                indice += 1
+
+            terminados = 0
+            for id_trabajo in list(pendientes):
+                estado = self.estado(id_trabajo)
+                if estado['estado'] in ESTADOS_FINALES:
+                    terminados += 1
+                    yield pendientes.pop(id_trabajo), _resultado_local(estado['resultado'])
+            if pendientes and not terminados:
+                time.sleep(intervalo)
+
+
+def _resultado_local(resultado: Dict) -> Dict:
+    """COMPARAR llega como {motor: [datos, tiempo]} por JSON: se vuelve a tuplas"""
+    if resultado and resultado.get('tipo') == 'comparacion':
+        resultado['datos'] = {motor: tuple(valor) for motor, valor in resultado['datos'].items()}
+    return resultado
+
+
+# ============================================
+# EJECUCIÓN
+# ============================================
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Servidor local de extracción con modelos precargados")
+    parser.add_argument('--host', default="127.0.0.1", help="Interfaz TCP (por defecto solo local)")
+    parser.add_argument('--puerto', type=int, default=8765)
+    parser.add_argument('--socket', dest='ruta_socket', default=None,
+                        help="Atender en un socket Unix en lugar de TCP")
+    parser.add_argument('--trabajadores', type=int, default=TRABAJADORES_POR_DEFECTO,
+                        help="Documentos procesados a la vez")
+    parser.add_argument('--sin-precalentar', dest='precalentar', action='store_false',
+                        help="No cargar los modelos al arrancar")
+    parser.add_argument('-v', '--verboso', action='store_true', help="Registrar cada petición")
+    args = parser.parse_args(argv)
+
+    servicio = ServicioExtraccion(args.trabajadores)
+    if args.precalentar:
+        servicio.precalentar()
+
+    servidor = crear_servidor(servicio, args.host, args.puerto, args.ruta_socket, args.verboso)
+    direccion = f"unix://{args.ruta_socket}" if args.ruta_socket else f"http://{args.host}:{args.puerto}"
+    print(f"🛰️  Servidor de extracción en {direccion} ({args.trabajadores} trabajadores)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Deteniendo servidor...")
+    finally:
+        servidor.server_close()
+        servicio.cerrar()
+        if args.ruta_socket and os.path.exists(args.ruta_socket):
+            os.unlink(args.ruta_socket)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())